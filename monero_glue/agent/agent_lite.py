@@ -50,9 +50,13 @@ DEFAULT_MONERO_BIP44 = [
 ]  # parse_path(monero.DEFAULT_BIP32_PATH)
 
 
-def get_rsig_type(us_bulletproof, num_outputs):
+def get_rsig_type(us_bulletproof, num_outputs, use_bp_plus=False):
     if not us_bulletproof:
         return 0  # Borromean
+    elif use_bp_plus:
+        if num_outputs > 16:
+            raise ValueError("BP+ padded can support only 16 outputs")
+        return 4  # BP+ padded
     elif num_outputs > 16:
         return 2  # Multioutputs
     else:
@@ -68,7 +72,7 @@ def generate_rsig_batch_sizes(rsig_type, num_outputs):
             batches.append(1)
             amount_batched += 1
 
-        elif rsig_type == 3:  # BP padded
+        elif rsig_type == 3 or rsig_type == 4:  # BP padded, BP+ padded
             if num_outputs > 16:
                 raise ValueError(
                     "BP padded can support only BULLETPROOF_MAX_OUTPUTS statements"
@@ -350,6 +354,11 @@ class Agent(object):
         )
         self.ct.tx.unlock_time = tx.unlock_time
 
+        # CLSAG transactions (RctType 5) are not supported by the serialization,
+        # CLSAG signatures are available on the mlsag2 level only.
+        if common.defattr(tx, "use_clsag", False):
+            raise ValueError("CLSAG transactions are not supported")
+
         # Rsig
         num_outputs = len(tsx_data.outputs)
         use_bp = common.defattr(tx, "use_bulletproofs", False)
@@ -587,7 +596,7 @@ class Agent(object):
                 raise ValueError("Borromean cannot batch outputs")
 
             mask = crypto.decodeint(self.ct.rsig_gamma[idx])
-            C, a, R = ring_ct.prove_range_mem(dst.amount, mask)
+            C, a, R, _ = ring_ct.prove_range_auto(dst.amount, mask, decode=True)
             rsig_data.rsig = tmisc.dump_msg(R)
             self.ct.tx_out_rsigs.append(R)
 
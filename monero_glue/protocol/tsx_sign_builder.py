@@ -426,6 +426,13 @@ class TTransactionBuilder(object):
 
         # Rsig data
         self.rsig_type = tsx_data.rsig_data.rsig_type
+        if self.rsig_type == 4:
+            # BP+ transactions (RctType 6) are not supported by the serialization
+            raise misc.TrezorError("Bulletproof+ range proofs not supported")
+        if (tsx_data.hard_fork or 0) >= monero.HF_VERSION_CLSAG:
+            # CLSAG transactions (RctType 5) need v2 ecdh info and deterministic
+            # output masks, not supported by the builder nor the serialization
+            raise misc.TrezorError("CLSAG transactions not supported")
         self.rsig_grp = tsx_data.rsig_data.grouping
         self.rsig_offload = self.rsig_type > 0 and self.output_count > 2
         self.use_bulletproof = self.rsig_type > 0
@@ -901,15 +908,7 @@ class TTransactionBuilder(object):
         return alpha, crypto.gen_c(alpha, in_amount)
 
     def _check_out_commitment(self, amount, mask, C):
-        self.assrt(
-            crypto.point_eq(
-                C,
-                crypto.point_add(
-                    crypto.scalarmult_base(mask), crypto.scalarmult_h(amount)
-                ),
-            ),
-            "OutC fail",
-        )
+        self.assrt(crypto.point_eq(C, crypto.gen_c(mask, amount)), "OutC fail")
 
     def _check_bproof(self, batch_size, rsig, masks):
         if len(rsig.V) < batch_size:
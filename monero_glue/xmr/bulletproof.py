@@ -7,6 +7,11 @@
 #
 #
 
+import hashlib
+import mmap
+import os
+import struct
+
 from monero_glue.compat import gc, log
 from monero_glue.compat.utils import memcpy as _memcpy
 from monero_glue.xmr import crypto
@@ -27,6 +32,9 @@ INV_EIGHT = b"\x79\x2f\xdc\xe2\x29\xe5\x06\x61\xd0\xda\x1c\x7d\xb3\x9d\xd3\x07\x
 MINUS_ONE = b"\xec\xd3\xf5\x5c\x1a\x63\x12\x58\xd6\x9c\xf7\xa2\xde\xf9\xde\x14\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x10"
 MINUS_INV_EIGHT = b"\x74\xa4\x19\x7a\xf0\x7d\x0b\xf7\x05\xc2\xda\x25\x2b\x5c\x0b\x0d\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x0a"
 
+# Monero G point (basepoint)
+XMR_G = b"\x58\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66\x66"
+
 # Monero H point
 XMR_H = b"\x8b\x65\x59\x70\x15\x37\x99\xaf\x2a\xea\xdc\x9f\xf1\xad\xd0\xea\x6c\x72\x51\xd5\x41\x54\xcf\xa9\x2c\x17\x3a\x0d\xd3\x9c\x1f\x94"
 XMR_HP = crypto.xmr_H()
@@ -43,6 +51,33 @@ BP_TWO_N = b"\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x0
 # ip12 = inner_product(oneN, twoN);
 BP_IP12 = b"\xff\xff\xff\xff\xff\xff\xff\xff\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
 
+# Multiexp evaluation mode.
+# HW devices cannot afford memory for bucket-based multiexp algorithms, multiexp terms
+# are evaluated one by one there (low memory mode). Host uses Pippenger algorithm
+# with the number of simultaneously held points bounded by PIPPENGER_MEM_CAP.
+MULTIEXP_LOW_MEM = False
+PIPPENGER_MEM_CAP = 1 << 14
+STRAUS_WINDOW = 4
+
+# Host multiexp algorithm crossover points per EC backend (ec_picker.EC_BACKEND_*):
+#   (naive_max, straus_max): naive for n <= naive_max terms, Straus for n <= straus_max,
+#   Pippenger above. Measured by multiexp_calibrate(), x86_64, CPython 3.11:
+#   0 (Python): Straus from 1 term, Pippenger from 32-64 terms (within the noise).
+#   2 (libsodium): naive up to 4096 terms, 3.4x faster than Pippenger there,
+#     the windowed methods do the point additions over ctypes.
+# Trezor-crypto is not measured and uses the default, recalibrate with
+# multiexp_calibrate() and set_multiexp_crossover() where it is available.
+MULTIEXP_CROSSOVER = {0: (0, 32), 2: (1 << 30, 1 << 30)}
+MULTIEXP_CROSSOVER_DEFAULT = (0, 32)
+
+# Persistent generator table, see BpGenTable
+BP_GEN_TABLE_MAGIC = b"XMRBPGT\x00"
+BP_GEN_TABLE_VERSION = 1
+BP_GEN_TABLE_HEADER = "<8sIII4x32s"  # magic, version, flags, size, checksum
+BP_GEN_TABLE_HEADER_SIZE = 64
+BP_GEN_TABLE_FLAG_XY = 1  # decompressed affine coordinates section present
+BP_GEN_TABLE_ENV = "XMR_BP_GEN_TABLE"
+
 
 #
 # Rct keys operations
@@ -53,7 +88,7 @@ BP_IP12 = b"\xff\xff\xff\xff\xff\xff\xff\xff\x00\x00\x00\x00\x00\x00\x00\x00\x00
 tmp_bf_0 = bytearray(32)
 tmp_bf_1 = bytearray(32)
 tmp_bf_2 = bytearray(32)
-tmp_bf_exp = bytearray(11 + 32 + 4)
+tmp_bf_exp = bytearray(16 + 32 + 4)
 tmp_bf_exp_mv = memoryview(tmp_bf_exp)
 
 tmp_pt_1 = crypto.new_point()
@@ -132,6 +167,27 @@ def invert(dst, x):
     return dst
 
 
+def invert_batch(dst, xs):
+    """
+    Modular inversion of all elements mod curve order.
+    Uses Montgomery's trick, i.e., one modular inversion for the whole vector.
+
+    :param dst: KeyV
+    :param xs: KeyV or list of 32byte contracted scalars, all non-zero
+    :return:
+    """
+    dst = _ensure_dst_keyvect(dst, len(xs))
+    scs = [
+        crypto.decodeint_into_noreduce(crypto.new_scalar(), xs[i])
+        for i in range(len(xs))
+    ]
+    crypto.sc_inv_batch_into(scs, scs)
+    for i in range(len(scs)):
+        crypto.encodeint_into(tmp_bf_0, scs[i])
+        dst.read(i, tmp_bf_0)
+    return dst
+
+
 def scalarmult_key(dst, P, s):
     dst = _ensure_dst_key(dst)
     crypto.decodepoint_into(tmp_pt_1, P)
@@ -278,9 +334,8 @@ def hash_vct_to_scalar(dst, data):
     return dst
 
 
-def get_exponent(dst, base, idx):
+def get_exponent(dst, base, idx, salt=b"bulletproof"):
     dst = _ensure_dst_key(dst)
-    salt = b"bulletproof"
     idx_size = uvarint_size(idx)
     final_size = len(salt) + 32 + idx_size
     buff = tmp_bf_exp_mv
@@ -586,6 +641,165 @@ class KeyVZtwo(KeyVBase):
         return self.cur
 
 
+class ScalarVector(KeyVBase):
+    """
+    Vector of scalars kept in the backend native form (EdScalar / bignum256modm).
+    Bulk operations work on the native scalars directly, 32 byte encoding
+    happens only in to() / encode(), i.e., on the proof boundaries.
+
+    Indexing returns the native scalar, to() the encoded one, so the vector
+    can be used wherever KeyV is read.
+    """
+
+    def __init__(self, elems=64, scalars=None):
+        self.sc = (
+            scalars if scalars is not None else [crypto.sc_0() for _ in range(elems)]
+        )
+        super().__init__(len(self.sc))
+        self.cur = _ensure_dst_key()
+        self.tmp = crypto.new_scalar()
+
+    @classmethod
+    def decode(cls, src, reduce=False):
+        """
+        Decodes KeyV or list of 32 byte scalars
+        """
+        fnc = crypto.decodeint_into if reduce else crypto.decodeint_into_noreduce
+        getter = src.to if isinstance(src, KeyVBase) else src.__getitem__
+        return cls(
+            scalars=[fnc(crypto.new_scalar(), getter(i)) for i in range(len(src))]
+        )
+
+    @classmethod
+    def powers(cls, x, n):
+        """
+        Vector x^0, x^1, ..., x^{n-1}, x native scalar
+        """
+        res = cls(n)
+        if n > 0:
+            crypto.sc_init_into(res.sc[0], 1)
+        for i in range(1, n):
+            crypto.sc_mul_into(res.sc[i], res.sc[i - 1], x)
+        return res
+
+    def encode(self, dst=None):
+        dst = _ensure_dst_keyvect(dst, self.size)
+        for i in range(self.size):
+            crypto.encodeint_into(self.cur, self.sc[i])
+            dst.read(i, self.cur)
+        return dst
+
+    def __getitem__(self, item):
+        return self.sc[self.idxize(item)]
+
+    def __setitem__(self, key, value):
+        crypto.sc_0_into(self.tmp)
+        crypto.sc_add_into(self.sc[self.idxize(key)], value, self.tmp)
+
+    def to(self, idx, buff=None, offset=0):
+        buff = buff if buff else self.cur
+        crypto.encodeint_into(buff, self.sc[self.idxize(idx)], offset)
+        return buff
+
+    def read(self, idx, buff, offset=0):
+        crypto.decodeint_into_noreduce(self.sc[self.idxize(idx)], buff, offset)
+
+    def resize(self, nsize, chop=False, realloc=False):
+        if nsize < self.size:
+            self.sc = self.sc[:nsize]
+        else:
+            self.sc += [crypto.sc_0() for _ in range(nsize - self.size)]
+        self.size = nsize
+        return self
+
+    def view(self, start, stop):
+        """
+        Sub-vector sharing the scalars with this vector
+        """
+        return ScalarVector(scalars=self.sc[start:stop])
+
+    def slice_view(self, start, stop):
+        return self.view(start, stop)
+
+    def _dst(self, dst):
+        return dst if dst is not None else ScalarVector(self.size)
+
+    def add(self, other, dst=None):
+        dst = self._dst(dst)
+        for i in range(self.size):
+            crypto.sc_add_into(dst.sc[i], self.sc[i], other.sc[i])
+        return dst
+
+    def sub(self, other, dst=None):
+        dst = self._dst(dst)
+        for i in range(self.size):
+            crypto.sc_sub_into(dst.sc[i], self.sc[i], other.sc[i])
+        return dst
+
+    def hadamard(self, other, dst=None):
+        dst = self._dst(dst)
+        for i in range(self.size):
+            crypto.sc_mul_into(dst.sc[i], self.sc[i], other.sc[i])
+        return dst
+
+    def add_scalar(self, x, dst=None):
+        dst = self._dst(dst)
+        for i in range(self.size):
+            crypto.sc_add_into(dst.sc[i], self.sc[i], x)
+        return dst
+
+    def scale(self, x, dst=None):
+        dst = self._dst(dst)
+        for i in range(self.size):
+            crypto.sc_mul_into(dst.sc[i], self.sc[i], x)
+        return dst
+
+    def fold(self, a, b):
+        """
+        In place v[i] = a * v[i] + b * v[h + i], the vector is halved
+        """
+        h = self.size // 2
+        for i in range(h):
+            crypto.sc_mul_into(self.tmp, self.sc[h + i], b)
+            crypto.sc_muladd_into(self.sc[i], self.sc[i], a, self.tmp)
+        return self.resize(h)
+
+    def inner_product(self, other, dst_sc=None):
+        if self.size != other.size:
+            raise ValueError("Incompatible sizes of a and b")
+        dst_sc = crypto.sc_0_into(dst_sc) if dst_sc is not None else crypto.sc_0()
+        for i in range(self.size):
+            crypto.sc_muladd_into(dst_sc, self.sc[i], other.sc[i], dst_sc)
+        return dst_sc
+
+    def sum(self, dst_sc=None):
+        dst_sc = crypto.sc_0_into(dst_sc) if dst_sc is not None else crypto.sc_0()
+        for i in range(self.size):
+            crypto.sc_add_into(dst_sc, dst_sc, self.sc[i])
+        return dst_sc
+
+
+def _vect_buff(v):
+    """
+    Contiguous buffer of packed 32 B elements backing the vector,
+    None if the vector is computed on demand.
+    """
+    if isinstance(v, KeyV):
+        return v.mv[: 32 * v.size]
+    if isinstance(v, KeyVConst):
+        return bytes(v.elem) * v.size
+    if isinstance(v, KeyVSliced):
+        buff = _vect_buff(v.wrapped)
+        if buff is not None:
+            return buff[32 * v.offset : 32 * (v.offset + v.size)]
+    return None
+
+
+def _vect_buffs(*vs):
+    buffs = [_vect_buff(x) for x in vs]
+    return None if None in buffs else buffs
+
+
 def _ensure_dst_keyvect(dst=None, size=None):
     if dst is None:
         dst = KeyV(elems=size)
@@ -602,22 +816,28 @@ def const_vector(val, elems=BP_N, copy=True):
 def vector_exponent_custom(A, B, a, b, dst=None):
     dst = _ensure_dst_key(dst)
     crypto.identity_into(tmp_pt_2)
+    native = isinstance(a, ScalarVector) and isinstance(b, ScalarVector)
 
     for i in range(len(a)):
-        crypto.decodeint_into_noreduce(tmp_sc_1, a.to(i))
+        if native:
+            sa, sb = a[i], b[i]
+        else:
+            sa = crypto.decodeint_into_noreduce(tmp_sc_1, a.to(i))
+            sb = crypto.decodeint_into_noreduce(tmp_sc_2, b.to(i))
         crypto.decodepoint_into(tmp_pt_3, A.to(i))
-        crypto.decodeint_into_noreduce(tmp_sc_2, b.to(i))
         crypto.decodepoint_into(tmp_pt_4, B.to(i))
-        crypto.add_keys3_into(tmp_pt_1, tmp_sc_1, tmp_pt_3, tmp_sc_2, tmp_pt_4)
+        crypto.add_keys3_into(tmp_pt_1, sa, tmp_pt_3, sb, tmp_pt_4)
         crypto.point_add_into(tmp_pt_2, tmp_pt_2, tmp_pt_1)
         gc_iter(i)
     crypto.encodepoint_into(dst, tmp_pt_2)
     return dst
 
 
-def vector_powers(x, n, dst=None, dynamic=False, **kwargs):
+def vector_powers(x, n, dst=None, dynamic=False, native=False, **kwargs):
     if dynamic:
         return KeyVPowers(n, x, **kwargs)
+    if native:
+        return ScalarVector.powers(crypto.decodeint(x), n)
     dst = _ensure_dst_keyvect(dst, n)
     if n == 0:
         return dst
@@ -658,8 +878,16 @@ def inner_product(a, b, dst=None):
     if len(a) != len(b):
         raise ValueError("Incompatible sizes of a and b")
     dst = _ensure_dst_key(dst)
-    crypto.sc_init_into(tmp_sc_1, 0)
+    if isinstance(a, ScalarVector) and isinstance(b, ScalarVector):
+        crypto.encodeint_into(dst, a.inner_product(b, tmp_sc_1))
+        return dst
+
+    buffs = _vect_buffs(a, b)
+    if buffs:
+        crypto.encodeint_into(dst, crypto.sc_inner_product_vect(*buffs))
+        return dst
 
+    crypto.sc_init_into(tmp_sc_1, 0)
     for i in range(len(a)):
         crypto.decodeint_into_noreduce(tmp_sc_2, a.to(i))
         crypto.decodeint_into_noreduce(tmp_sc_3, b.to(i))
@@ -671,7 +899,15 @@ def inner_product(a, b, dst=None):
 
 
 def hadamard(a, b, dst=None):
+    if isinstance(a, ScalarVector) and isinstance(b, ScalarVector):
+        return a.hadamard(b, dst)
+
     dst = _ensure_dst_keyvect(dst, len(a))
+    buffs = _vect_buffs(dst, a, b)
+    if buffs:
+        crypto.sc_mul_vect(*buffs)
+        return dst
+
     for i in range(len(a)):
         sc_mul(tmp_bf_1, a.to(i), b.to(i))
         dst.read(i, tmp_bf_1)
@@ -700,6 +936,15 @@ def hadamard_fold(v, a, b, into=None, into_offset=0):
     crypto.decodeint_into_noreduce(tmp_sc_2, b)
     into = into if into else v
 
+    buffs = _vect_buffs(v, into)
+    if buffs:
+        vb, ib = buffs
+        dst = ib[32 * into_offset : 32 * (into_offset + h)]
+        crypto.add_keys3_vect(
+            dst, tmp_sc_1, vb[: 32 * h], tmp_sc_2, vb[32 * h : 64 * h]
+        )
+        return into
+
     for i in range(h):
         crypto.decodepoint_into(tmp_pt_1, v.to(i))
         crypto.decodepoint_into(tmp_pt_2, v.to(h + i))
@@ -715,13 +960,27 @@ def scalar_fold(v, a, b, into=None, into_offset=0):
     """
     ln = len(v); h = ln // 2
     v[i] = v[i] * a + v[h+i] * b)
+
+    ScalarVector is folded in place and halved, into is ignored.
     :return:
     """
     h = len(v) // 2
     crypto.decodeint_into_noreduce(tmp_sc_1, a)
     crypto.decodeint_into_noreduce(tmp_sc_2, b)
+    if isinstance(v, ScalarVector):
+        return v.fold(tmp_sc_1, tmp_sc_2)
+
     into = into if into else v
 
+    buffs = _vect_buffs(v, into)
+    if buffs:
+        vb, ib = buffs
+        dst = ib[32 * into_offset : 32 * (into_offset + h)]
+        tmp = crypto.sc_scale_vect(bytearray(32 * h), vb[32 * h : 64 * h], tmp_sc_2)
+        crypto.sc_scale_vect(dst, vb[: 32 * h], tmp_sc_1)
+        crypto.sc_add_vect(dst, dst, tmp)
+        return into
+
     for i in range(h):
         crypto.decodeint_into_noreduce(tmp_sc_3, v.to(i))
         crypto.decodeint_into_noreduce(tmp_sc_4, v.to(h + i))
@@ -741,8 +1000,14 @@ def cross_inner_product(l0, r0, l1, r1):
     t1   = t1_1 + t1_2, t2   = l1 . r1
     """
     sc_t1_1, sc_t1_2, sc_t2 = alloc_scalars(3)
-    cl0, cr0, cl1, cr1 = alloc_scalars(4)
+    if all(isinstance(v, ScalarVector) for v in (l0, r0, l1, r1)):
+        l0.inner_product(r1, sc_t1_1)
+        l1.inner_product(r0, sc_t1_2)
+        l1.inner_product(r1, sc_t2)
+        crypto.sc_add_into(sc_t1_1, sc_t1_1, sc_t1_2)
+        return crypto.encodeint(sc_t1_1), crypto.encodeint(sc_t2)
 
+    cl0, cr0, cl1, cr1 = alloc_scalars(4)
     for i in range(len(l0)):
         crypto.decodeint_into_noreduce(cl0, l0.to(i))
         crypto.decodeint_into_noreduce(cr0, r0.to(i))
@@ -770,6 +1035,11 @@ def vector_gen(dst, size, op):
 
 def vector_add(a, b, dst=None):
     dst = _ensure_dst_keyvect(dst, len(a))
+    buffs = _vect_buffs(dst, a, b)
+    if buffs:
+        crypto.sc_add_vect(*buffs)
+        return dst
+
     for i in range(len(a)):
         sc_add(tmp_bf_1, a.to(i), b.to(i))
         dst.read(i, tmp_bf_1)
@@ -779,6 +1049,11 @@ def vector_add(a, b, dst=None):
 
 def vector_subtract(a, b, dst=None):
     dst = _ensure_dst_keyvect(dst, len(a))
+    buffs = _vect_buffs(dst, a, b)
+    if buffs:
+        crypto.sc_sub_vect(*buffs)
+        return dst
+
     for i in range(len(a)):
         sc_sub(tmp_bf_1, a.to(i), b.to(i))
         dst.read(i, tmp_bf_1)
@@ -788,6 +1063,12 @@ def vector_subtract(a, b, dst=None):
 
 def vector_scalar(a, x, dst=None):
     dst = _ensure_dst_keyvect(dst, len(a))
+    buffs = _vect_buffs(dst, a)
+    if buffs:
+        crypto.decodeint_into_noreduce(tmp_sc_1, x)
+        crypto.sc_scale_vect(buffs[0], buffs[1], tmp_sc_1)
+        return dst
+
     for i in range(len(a)):
         sc_mul(dst[i], a[i], x)
         gc_iter(i)
@@ -796,6 +1077,12 @@ def vector_scalar(a, x, dst=None):
 
 def vector_scalar2(a, x, dst=None):
     dst = _ensure_dst_keyvect(dst, len(a))
+    buffs = _vect_buffs(dst, a)
+    if buffs:
+        crypto.decodeint_into_noreduce(tmp_sc_1, x)
+        crypto.scalarmult_vect(buffs[0], buffs[1], tmp_sc_1)
+        return dst
+
     for i in range(len(a)):
         scalarmult_key(dst[i], a[i], x)
         gc_iter(i)
@@ -850,6 +1137,43 @@ def vector_z_two(N, logN, M, zpow, twoN, zero_twos=None, dynamic=False, **kwargs
     return zero_twos
 
 
+def challenge_products(w, winv, rounds, dst=None, native=False):
+    r"""
+    Inner product challenge products for all 2^rounds generator indices:
+      dst[i] = \prod_j (w[j] if bit (rounds - 1 - j) of i is set else winv[j])
+
+    Each product is computed from the previous level with a single multiplication.
+    Products for complementary indices, i.e., dst[~i], swap w and winv.
+
+    :param w: round challenges
+    :param winv: inverted round challenges
+    :param rounds:
+    :param dst:
+    :param native: returns ScalarVector of the products, dst is ignored
+    :return:
+    """
+    MN = 1 << rounds
+    cache = [None] * MN
+    cache[0] = crypto.decodeint(winv.to(0))
+    cache[1] = crypto.decodeint(w.to(0))
+
+    for j in range(1, rounds):
+        crypto.decodeint_into_noreduce(tmp_sc_1, w.to(j))
+        crypto.decodeint_into_noreduce(tmp_sc_2, winv.to(j))
+        for s in range((1 << (j + 1)) - 1, 0, -2):
+            cache[s] = crypto.sc_mul(cache[s >> 1], tmp_sc_1)
+            cache[s - 1] = crypto.sc_mul(cache[s >> 1], tmp_sc_2)
+
+    if native:
+        return ScalarVector(scalars=cache)
+
+    dst = _ensure_dst_keyvect(dst, MN)
+    for i in range(MN):
+        crypto.encodeint_into(tmp_bf_0, cache[i])
+        dst.read(i, tmp_bf_0)
+    return dst
+
+
 def hash_cache_mash(dst, hash_cache, *args):
     dst = _ensure_dst_key(dst)
     ctx = crypto.get_keccak()
@@ -911,6 +1235,212 @@ def init_constants(ln=64):
     return Gi, GiB, Hi, HiB, oneN, oneNB, twoN, twoNB, ip12, ip12B
 
 
+class BpGenTable(object):
+    """
+    Persistent Gi / Hi generator table, memory mapped from a file.
+    Saves get_exponent() (keccak + hash_to_point) for generators
+    above the BP_GI_PRE / BP_HI_PRE prefix, e.g., in freshly started workers.
+
+    File layout, little endian:
+     - header: magic, version, flags, size, sha256 checksum, padded to 64 B
+     - Gi, size * 32 B, encoded points
+     - Hi, size * 32 B, encoded points
+     - optionally Gi, Hi decompressed (affine x || y, size * 64 B each),
+       decoding of the generators in multiexp is then skipped.
+
+    Gi, Hi are zero-copy KeyV over the mapping.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.size = 0
+        self.flags = 0
+        self.Gi = None
+        self.Hi = None
+        self.fh = None
+        self.mm = None
+        self.mv = None
+        self.xy_index = None
+
+    @staticmethod
+    def generate(path, size=BP_M * BP_N, with_xy=True):
+        """
+        Computes the generators and writes the table file atomically.
+
+        :param path:
+        :param size: number of Gi (and Hi) generators
+        :param with_xy: store also decompressed generators
+        :return:
+        """
+        Gi = KeyV(size)
+        Hi = KeyV(size)
+        Gpre = KeyV(buffer=BP_GI_PRE, const=True)
+        Hpre = KeyV(buffer=BP_HI_PRE, const=True)
+        for i in range(size):
+            if i < len(Gpre):
+                Gi.read(i, Gpre[i])
+                Hi.read(i, Hpre[i])
+            else:
+                get_exponent(Gi[i], XMR_H, i * 2 + 1)
+                get_exponent(Hi[i], XMR_H, i * 2)
+
+        body = bytearray(Gi.d)
+        body += Hi.d
+        flags = 0
+        if with_xy:
+            flags |= BP_GEN_TABLE_FLAG_XY
+            for vct in (Gi, Hi):
+                for i in range(size):
+                    body += crypto.point_enc_to_xy(vct[i])
+
+        checksum = BpGenTable._checksum(flags, size, body)
+        header = struct.pack(
+            BP_GEN_TABLE_HEADER,
+            BP_GEN_TABLE_MAGIC,
+            BP_GEN_TABLE_VERSION,
+            flags,
+            size,
+            checksum,
+        )
+        header += b"\x00" * (BP_GEN_TABLE_HEADER_SIZE - len(header))
+
+        tmp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp_path, "wb") as fh:
+            fh.write(header)
+            fh.write(body)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _checksum(flags, size, body):
+        h = hashlib.sha256(struct.pack("<III", BP_GEN_TABLE_VERSION, flags, size))
+        h.update(body)
+        return h.digest()
+
+    def load(self, path=None, verify=True):
+        """
+        Maps the table file.
+
+        :param path:
+        :param verify: verifies checksum of the whole table
+        :return:
+        """
+        self.path = path if path else self.path
+        self.fh = open(self.path, "rb")
+        try:
+            self.mm = mmap.mmap(self.fh.fileno(), 0, access=mmap.ACCESS_READ)
+            self.mv = memoryview(self.mm)
+            self._parse(verify)
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def _parse(self, verify):
+        hsize = struct.calcsize(BP_GEN_TABLE_HEADER)
+        if len(self.mv) < BP_GEN_TABLE_HEADER_SIZE:
+            raise ValueError("Generator table too short")
+
+        magic, version, flags, size, checksum = struct.unpack(
+            BP_GEN_TABLE_HEADER, self.mv[:hsize]
+        )
+        if magic != BP_GEN_TABLE_MAGIC:
+            raise ValueError("Invalid generator table magic")
+        if version != BP_GEN_TABLE_VERSION:
+            raise ValueError("Unsupported generator table version: %s" % version)
+
+        point_size = 32 + (64 if flags & BP_GEN_TABLE_FLAG_XY else 0)
+        if len(self.mv) != BP_GEN_TABLE_HEADER_SIZE + 2 * size * point_size:
+            raise ValueError("Invalid generator table size")
+
+        body = self.mv[BP_GEN_TABLE_HEADER_SIZE:]
+        if verify and self._checksum(flags, size, body) != checksum:
+            raise ValueError("Generator table checksum mismatch")
+
+        self.flags = flags
+        self.size = size
+        self.Gi = KeyV(buffer=body[: size * 32], const=True)
+        self.Hi = KeyV(buffer=body[size * 32 : 2 * size * 32], const=True)
+
+    def close(self):
+        """
+        Closes the mapping. If vectors from the table are still referenced
+        the mapping is released when they are collected.
+        """
+        self.Gi = None
+        self.Hi = None
+        self.xy_index = None
+        self.mv = None
+        if self.mm is not None:
+            try:
+                self.mm.close()
+            except BufferError:
+                pass
+            self.mm = None
+        if self.fh is not None:
+            self.fh.close()
+            self.fh = None
+
+    def has_xy(self):
+        return bool(self.flags & BP_GEN_TABLE_FLAG_XY)
+
+    def decodepoint(self, pt):
+        """
+        Decodes the point from the decompressed section if pt is a generator
+        from the table, returns None otherwise.
+
+        :param pt: encoded point
+        :return:
+        """
+        if not self.has_xy():
+            return None
+        if self.xy_index is None:
+            self.xy_index = {}
+            for i in range(2 * self.size):
+                off = BP_GEN_TABLE_HEADER_SIZE + i * 32
+                self.xy_index[bytes(self.mv[off : off + 32])] = i
+
+        idx = self.xy_index.get(bytes(pt[:32]))
+        if idx is None:
+            return None
+        off = BP_GEN_TABLE_HEADER_SIZE + 2 * self.size * 32 + idx * 64
+        return crypto.decodepoint_xy(self.mv, off)
+
+
+_gen_table = None
+
+
+def set_gen_table(table):
+    """
+    Sets the generator table used by newly created BulletProofBuilder
+    and multiexp point decoding. None disables.
+
+    :param table: BpGenTable or None
+    :return:
+    """
+    global _gen_table
+    _gen_table = table
+
+
+def get_gen_table():
+    """
+    Returns the generator table. Loaded from the file specified
+    by the XMR_BP_GEN_TABLE environment variable on the first call.
+    """
+    global _gen_table
+    if _gen_table is None and os.environ.get(BP_GEN_TABLE_ENV):
+        _gen_table = BpGenTable().load(os.environ[BP_GEN_TABLE_ENV])
+    return _gen_table
+
+
+def _decodepoint(pt):
+    table = get_gen_table()
+    if table is not None:
+        res = table.decodepoint(pt)
+        if res is not None:
+            return res
+    return crypto.decodepoint(pt)
+
+
 class MultiExpEval(object):
     """
     MultiExp object similar to MultiExp array of [(scalar, point), ]
@@ -920,6 +1450,8 @@ class MultiExpEval(object):
 
     Moreover, Monero needs speed for very fast verification for blockchain verification which is not
     priority in this use case.
+
+    Host (non low memory mode) evaluates multiexp with Pippenger, see multiexp_pippenger().
     """
 
     def __init__(self, size=None):
@@ -1108,8 +1640,357 @@ class MergedMultiExp(MultiExpEval):
         return dst
 
 
-def multiexp(dst=None, data=None, GiHi=False):
-    return data.eval(dst, GiHi)
+def _multiexp_terms(data):
+    """
+    Iterates (scalar, point) pairs of the multiexp holder
+    """
+    if isinstance(data, MergedMultiExp):
+        for sub in data.exps:
+            yield from _multiexp_terms(sub)
+        return
+
+    for i in range(len(data)):
+        yield data[i]
+
+
+def _pippenger_window(n, mem_cap=None):
+    """
+    Bucket window size for n terms, thresholds from Monero get_pippenger_c().
+    Window is bounded so 2^c buckets take at most half of mem_cap points.
+    """
+    c = 9
+    for cc, lim in (
+        (2, 13),
+        (3, 29),
+        (4, 83),
+        (5, 185),
+        (6, 465),
+        (7, 1180),
+        (8, 2295),
+    ):
+        if n <= lim:
+            c = cc
+            break
+
+    while mem_cap and c > 1 and (1 << c) > mem_cap // 2:
+        c -= 1
+    return c
+
+
+def _pippenger_chunk(scalars, points, c):
+    r"""
+    Bucket method: res = \sum_i scalars[i] * points[i]
+    Scalars are integers, points are decoded. Returns None for identity.
+    """
+    nbits = max(x.bit_length() for x in scalars)
+    nbuckets = 1 << c
+    mask = nbuckets - 1
+    res = None
+
+    for w in range((nbits + c - 1) // c - 1, -1, -1):
+        if res is not None:
+            for _ in range(c):
+                res = crypto.point_double(res)
+
+        shift = w * c
+        buckets = [None] * nbuckets
+        for i in range(len(scalars)):
+            d = (scalars[i] >> shift) & mask
+            if d == 0:
+                continue
+            buckets[d] = (
+                points[i]
+                if buckets[d] is None
+                else crypto.point_add(buckets[d], points[i])
+            )
+
+        # \sum_d d * buckets[d] by running sums
+        running = None
+        wsum = None
+        for d in range(nbuckets - 1, 0, -1):
+            if buckets[d] is not None:
+                running = (
+                    buckets[d]
+                    if running is None
+                    else crypto.point_add(running, buckets[d])
+                )
+            if running is not None:
+                wsum = running if wsum is None else crypto.point_add(wsum, running)
+
+        if wsum is not None:
+            res = wsum if res is None else crypto.point_add(res, wsum)
+        del (buckets, running, wsum)
+
+    return res
+
+
+def multiexp_pippenger(dst, data, mem_cap=None):
+    """
+    Evaluates multiexp with Pippenger bucket algorithm.
+    Host only, memory hungry: all points of a chunk are held decoded.
+
+    :param dst: destination key
+    :param data: multiexp holder, iterates (scalar, point) pairs, encoded
+    :param mem_cap: maximal number of points held in the memory at once, terms
+                    above the cap are evaluated in consecutive chunks
+    :return:
+    """
+    dst = _ensure_dst_key(dst)
+    mem_cap = mem_cap if mem_cap else PIPPENGER_MEM_CAP
+    acc = crypto.identity()
+    scalars, points = [], []
+
+    def flush():
+        r = _pippenger_chunk(scalars, points, _pippenger_window(len(points), mem_cap))
+        if r is not None:
+            crypto.point_add_into(acc, acc, r)
+        del scalars[:], points[:]
+
+    for sci, pti in _multiexp_terms(data):
+        x = int.from_bytes(sci[:32], "little")
+        if x == 0:
+            continue
+
+        scalars.append(x)
+        points.append(_decodepoint(pti))
+        if len(points) + (1 << _pippenger_window(len(points), mem_cap)) >= mem_cap:
+            flush()
+
+    if points:
+        flush()
+
+    crypto.encodepoint_into(dst, acc)
+    return dst
+
+
+def multiexp_straus(dst, data, window=None):
+    """
+    Evaluates multiexp with Straus algorithm (interleaved fixed windows).
+    Table of 2^w - 1 multiples is held for each point, doublings are shared.
+    Suitable for smaller multiexps.
+
+    :param dst: destination key
+    :param data: multiexp holder, iterates (scalar, point) pairs, encoded
+    :param window: window size in bits, STRAUS_WINDOW by default
+    :return:
+    """
+    dst = _ensure_dst_key(dst)
+    w = window if window else STRAUS_WINDOW
+    mask = (1 << w) - 1
+    scalars, tables = [], []
+
+    for sci, pti in _multiexp_terms(data):
+        x = int.from_bytes(sci[:32], "little")
+        if x == 0:
+            continue
+
+        pt = _decodepoint(pti)
+        tbl = [pt]
+        for _ in range(mask - 1):
+            tbl.append(crypto.point_add(tbl[-1], pt))
+        scalars.append(x)
+        tables.append(tbl)
+
+    res = None
+    nbits = max(x.bit_length() for x in scalars) if scalars else 0
+    for win in range((nbits + w - 1) // w - 1, -1, -1):
+        if res is not None:
+            for _ in range(w):
+                res = crypto.point_double(res)
+
+        shift = win * w
+        for i in range(len(scalars)):
+            d = (scalars[i] >> shift) & mask
+            if d:
+                res = (
+                    tables[i][d - 1]
+                    if res is None
+                    else crypto.point_add(res, tables[i][d - 1])
+                )
+
+    crypto.encodepoint_into(dst, res if res is not None else crypto.identity())
+    return dst
+
+
+def multiexp_naive(dst, data):
+    """
+    Evaluates multiexp term by term
+    """
+    dst = _ensure_dst_key(dst)
+    acc = crypto.identity()
+    for sci, pti in _multiexp_terms(data):
+        crypto.decodeint_into_noreduce(tmp_sc_1, sci)
+        crypto.decodepoint_into(tmp_pt_2, pti)
+        crypto.scalarmult_into(tmp_pt_3, tmp_pt_2, tmp_sc_1)
+        crypto.point_add_into(acc, acc, tmp_pt_3)
+    crypto.encodepoint_into(dst, acc)
+    return dst
+
+
+def multiexp_crossover(backend_id=None):
+    """
+    Returns (naive_max, straus_max) multiexp crossover points for the EC backend,
+    the active one by default.
+    """
+    if backend_id is None:
+        backend_id = crypto.get_backend().backend_id()
+    return MULTIEXP_CROSSOVER.get(backend_id, MULTIEXP_CROSSOVER_DEFAULT)
+
+
+def set_multiexp_crossover(backend_id, naive_max, straus_max):
+    """
+    Stores multiexp crossover points for the backend, e.g., from multiexp_calibrate()
+    """
+    MULTIEXP_CROSSOVER[backend_id] = (naive_max, straus_max)
+
+
+def multiexp_calibrate(sizes=(1, 2, 4, 8, 16, 32, 64, 128, 256), reps=1, store=True):
+    """
+    Benchmarks naive, Straus and Pippenger multiexp on the active backend
+    and derives the crossover points.
+
+    :param sizes: numbers of terms to measure
+    :param reps: repetitions per measurement
+    :param store: stores the crossover points for the active backend
+    :return: (naive_max, straus_max), {size: (t_naive, t_straus, t_pippenger)}
+    """
+    import time
+
+    fncs = (multiexp_naive, multiexp_straus, multiexp_pippenger)
+    timings = {}
+    for n in sizes:
+        muex = MultiExp(
+            scalars=[crypto.encodeint(crypto.random_scalar()) for _ in range(n)],
+            points=[
+                crypto.encodepoint(crypto.scalarmult_base(crypto.random_scalar()))
+                for _ in range(n)
+            ],
+        )
+
+        cur = []
+        for fnc in fncs:
+            tstart = time.perf_counter()
+            for _ in range(reps):
+                fnc(None, muex)
+            cur.append((time.perf_counter() - tstart) / reps)
+        timings[n] = tuple(cur)
+
+    naive_max, straus_max = 0, 0
+    for n in sorted(timings):
+        tn, ts, tp = timings[n]
+        if tn <= min(ts, tp):
+            naive_max = n
+        if ts <= tp:
+            straus_max = n
+    straus_max = max(naive_max, straus_max)
+
+    if store:
+        set_multiexp_crossover(crypto.get_backend().backend_id(), naive_max, straus_max)
+    return (naive_max, straus_max), timings
+
+
+def multiexp(dst=None, data=None, GiHi=False, low_mem=None, mem_cap=None):
+    r"""
+    Evaluates multiexp \sum_i scalar_i * point_i
+
+    Host mode picks naive, Straus or Pippenger algorithm by the number of terms
+    and crossover points for the active EC backend, see multiexp_crossover().
+
+    :param dst: destination key
+    :param data: multiexp holder
+    :param GiHi: data points are the Gi, Hi generators
+    :param low_mem: low memory mode (HW device), terms evaluated one by one.
+                    MULTIEXP_LOW_MEM if None.
+    :param mem_cap: memory cap for the host evaluation, see multiexp_pippenger()
+    :return:
+    """
+    low_mem = MULTIEXP_LOW_MEM if low_mem is None else low_mem
+    if low_mem or isinstance(data, MultiExpSequential):
+        return data.eval(dst, GiHi)  # sequential holder is already evaluated
+
+    naive_max, straus_max = multiexp_crossover()
+    if len(data) <= naive_max:
+        return multiexp_naive(dst, data)
+    elif len(data) <= straus_max:
+        return multiexp_straus(dst, data)
+    return multiexp_pippenger(dst, data, mem_cap)
+
+
+class BpVerifyAcc(object):
+    """
+    Weighted aggregates of the batch verification
+    """
+
+    def __init__(self, maxMN, is_single=False, low_mem=False):
+        self.maxMN = maxMN
+        self.muex_all = MultiExp() if not low_mem else None
+        self.z1 = init_key(ZERO)
+        self.z3 = init_key(ZERO)
+        self.m_z4 = vector_dup(ZERO, maxMN) if not is_single else None
+        self.m_z5 = vector_dup(ZERO, maxMN) if not is_single else None
+        self.m_y0 = init_key(ZERO)
+        self.y1 = init_key(ZERO)
+        self.muex_acc = init_key(ONE)
+
+    def eval_muex(self, mem_cap=None):
+        """
+        Evaluates collected multiexp terms to muex_acc
+        """
+        if self.muex_all is not None and len(self.muex_all) > 0:
+            add_keys(
+                self.muex_acc,
+                self.muex_acc,
+                multiexp(None, self.muex_all, False, False, mem_cap),
+            )
+            self.muex_all = MultiExp()
+        return self
+
+    def merge(self, other):
+        """
+        Adds aggregates of the other accumulator, terms have to be evaluated.
+        """
+        sc_add(self.z1, self.z1, other.z1)
+        sc_add(self.z3, self.z3, other.z3)
+        sc_add(self.m_y0, self.m_y0, other.m_y0)
+        sc_add(self.y1, self.y1, other.y1)
+        for i in range(self.maxMN):
+            sc_add(self.m_z4[i], self.m_z4[i], other.m_z4[i])
+            sc_add(self.m_z5[i], self.m_z5[i], other.m_z5[i])
+        add_keys(self.muex_acc, self.muex_acc, other.muex_acc)
+        return self
+
+    def to_tuple(self):
+        """
+        Picklable representation, terms have to be evaluated.
+        """
+        return (
+            bytes(self.z1),
+            bytes(self.z3),
+            bytes(self.m_y0),
+            bytes(self.y1),
+            bytes(self.m_z4.d),
+            bytes(self.m_z5.d),
+            bytes(self.muex_acc),
+        )
+
+    @staticmethod
+    def from_tuple(data, maxMN):
+        acc = BpVerifyAcc(maxMN, False)
+        acc.z1, acc.z3, acc.m_y0, acc.y1 = [init_key(x) for x in data[:4]]
+        acc.m_z4 = KeyV(maxMN, buffer=bytearray(data[4]))
+        acc.m_z5 = KeyV(maxMN, buffer=bytearray(data[5]))
+        acc.muex_acc = init_key(data[6])
+        return acc
+
+
+def _verify_batch_worker(proofs, maxMN, proof_v8=False):
+    """
+    Process pool worker of BulletProofBuilder.verify_batch_parallel()
+    """
+    bpi = BulletProofBuilder()
+    bpi.gc_fnc = None
+    acc = bpi._verify_batch_acc(proofs, maxMN, False, proof_v8)
+    return acc.eval_muex(bpi.multiexp_mem_cap).to_tuple()
 
 
 class BulletProofBuilder(object):
@@ -1117,13 +1998,22 @@ class BulletProofBuilder(object):
         self.use_det_masks = True
         self.proof_sec = None
 
-        self.Gprec = KeyV(buffer=BP_GI_PRE, const=True)
-        self.Hprec = KeyV(buffer=BP_HI_PRE, const=True)
+        gen_table = get_gen_table()
+        if gen_table is not None:
+            self.Gprec = gen_table.Gi
+            self.Hprec = gen_table.Hi
+        else:
+            self.Gprec = KeyV(buffer=BP_GI_PRE, const=True)
+            self.Hprec = KeyV(buffer=BP_HI_PRE, const=True)
         self.oneN = const_vector(ONE, 64)
         self.twoN = KeyV(buffer=BP_TWO_N, const=True)
         self.ip12 = BP_IP12
         self.fnc_det_mask = None
 
+        # Multiexp evaluation, see multiexp()
+        self.low_mem = MULTIEXP_LOW_MEM
+        self.multiexp_mem_cap = None
+
         self.tmp_sc_1 = crypto.new_scalar()
         self.tmp_det_buff = bytearray(64 + 1 + 4)
 
@@ -1315,21 +2205,37 @@ class BulletProofBuilder(object):
             return (0,)
 
         # Polynomial construction by coefficients
-        zMN = const_vector(z, MN)
-        l0 = _ensure_dst_keyvect(None, MN)
-        vector_subtract(aL, zMN, l0)
-        l1 = sL
-        self.gc(13)
-
-        # This computes the ugly sum/concatenation from PAPER LINE 65
-        # r0 = aR + z
-        r0 = vector_add(aR, zMN)
-        del (zMN)
-        self.gc(14)
+        # Host mode keeps the vectors as native scalars (ScalarVector),
+        # the low memory mode mirrors the device and works on encoded keys.
+        native = not self.low_mem
+        if native:
+            sc_z = crypto.decodeint(z)
+            l0 = ScalarVector.decode(aL)
+            l0.add_scalar(crypto.sc_sub(crypto.sc_0(), sc_z), l0)
+            l1 = ScalarVector.decode(sL)
+            sR = ScalarVector.decode(sR)
+
+            # r0 = aR + z
+            r0 = ScalarVector.decode(aR)
+            r0.add_scalar(sc_z, r0)
+            self.gc(14)
+
+        else:
+            zMN = const_vector(z, MN)
+            l0 = _ensure_dst_keyvect(None, MN)
+            vector_subtract(aL, zMN, l0)
+            l1 = sL
+            self.gc(13)
+
+            # This computes the ugly sum/concatenation from PAPER LINE 65
+            # r0 = aR + z
+            r0 = vector_add(aR, zMN)
+            del (zMN)
+            self.gc(14)
 
         # r0 = r0 \odot yMN => r0[i]  = r0[i] * y^i
         # r1 = sR \odot yMN => r1[i]  = sR[i] * y^i
-        yMN = vector_powers(y, MN, dynamic=False)
+        yMN = vector_powers(y, MN, dynamic=False, native=native)
         hadamard(r0, yMN, dst=r0)
         self.gc(15)
 
@@ -1337,18 +2243,24 @@ class BulletProofBuilder(object):
         zpow = vector_powers(z, M + 2)
         twoN = self._two_aux(MN)
         zero_twos = vector_z_two(N, logN, M, zpow, twoN, dynamic=True, raw=True)
-        vector_gen(
-            r0,
-            len(r0),
-            lambda i, d: crypto.encodeint_into(
-                d,
-                crypto.sc_add_into(
-                    tmp_sc_1,
-                    zero_twos[i],  # noqa: F821
-                    crypto.decodeint_into_noreduce(tmp_sc_2, r0.to(i)),  # noqa: F821
+        if native:
+            for i in range(MN):
+                crypto.sc_add_into(r0[i], r0[i], zero_twos[i])
+        else:
+            vector_gen(
+                r0,
+                len(r0),
+                lambda i, d: crypto.encodeint_into(
+                    d,
+                    crypto.sc_add_into(
+                        tmp_sc_1,
+                        zero_twos[i],  # noqa: F821
+                        crypto.decodeint_into_noreduce(
+                            tmp_sc_2, r0.to(i)  # noqa: F821
+                        ),
+                    ),
                 ),
-            ),
-        )
+            )
 
         del (zero_twos, twoN)
         self.gc(15)
@@ -1409,20 +2321,27 @@ class BulletProofBuilder(object):
 
         # PAPER LINES 54-57
         # l = l0 \odot x*l1, has to evaluated as it becomes aprime in the loop
-        l = vector_gen(
-            l0,
-            len(l0),
-            lambda i, d: sc_add(d, d, sc_mul(tmp_bf_1, l1.to(i), x)),  # noqa: F821
-        )
+        if native:
+            sc_x = crypto.decodeint(x)
+            l = l0.add(l1.scale(sc_x, l1), l0)
+        else:
+            l = vector_gen(
+                l0,
+                len(l0),
+                lambda i, d: sc_add(d, d, sc_mul(tmp_bf_1, l1.to(i), x)),  # noqa: F821
+            )
         del (l0, l1, sL)
         self.gc(19)
 
         # r = r0 \odot x*r1, has to evaluated as it becomes bprime in the loop
-        r = vector_gen(
-            r0,
-            len(r0),
-            lambda i, d: sc_add(d, d, sc_mul(tmp_bf_1, r1.to(i), x)),  # noqa: F821
-        )
+        if native:
+            r = r0.add(r1.scale(sc_x, r1), r0)
+        else:
+            r = vector_gen(
+                r0,
+                len(r0),
+                lambda i, d: sc_add(d, d, sc_mul(tmp_bf_1, r1.to(i), x)),  # noqa: F821
+            )
         t = inner_product(l, r)
         del (r1, r0)
         self.gc(19)
@@ -1528,11 +2447,13 @@ class BulletProofBuilder(object):
 
             # PAPER LINES 28-29
             scalar_fold(aprime, w_round, winv, Gprime, nprime)
-            aprime.realloc_init_from(nprime, Gprime, nprime, round < 2)
+            if not native:
+                aprime.realloc_init_from(nprime, Gprime, nprime, round < 2)
             self.gc(29)
 
             scalar_fold(bprime, winv, w_round, Gprime, nprime)
-            bprime.realloc_init_from(nprime, Gprime, nprime, round < 2)
+            if not native:
+                bprime.realloc_init_from(nprime, Gprime, nprime, round < 2)
             self.gc(30)
 
             # Finally resize Gprime which was buffer for all ops
@@ -1566,11 +2487,64 @@ class BulletProofBuilder(object):
     def verify_batch(self, proofs, single_optim=True, proof_v8=False):
         """
         BP batch verification
+        In the low memory mode multiexps are evaluated term by term.
+        Otherwise all multiexp terms of all proofs are collected and evaluated at once.
+
         :param proofs:
         :param single_optim: single proof memory optimization
         :param proof_v8: previous testnet version
         :return:
         """
+        maxMN = self._verify_batch_max_mn(proofs)
+        is_single = len(proofs) == 1 and single_optim and self.low_mem  # ph4
+        acc = self._verify_batch_acc(proofs, maxMN, is_single, proof_v8)
+        return self._verify_batch_final(acc, maxMN, is_single)
+
+    def verify_batch_parallel(
+        self, proofs, workers=None, executor=None, proof_v8=False
+    ):
+        """
+        BP batch verification, proofs are split to chunks processed
+        in a process pool. Each worker reconstructs the challenges and accumulates
+        weighted aggregates of its chunk, evaluating its own multiexp.
+        The final check is evaluated in this process, with the same
+        result as verify_batch().
+
+        Workers load the generator table from XMR_BP_GEN_TABLE if set.
+
+        :param proofs:
+        :param workers: number of chunks / processes, os.cpu_count() by default
+        :param executor: concurrent.futures executor to use, new ProcessPoolExecutor if None
+        :param proof_v8: previous testnet version
+        :return:
+        """
+        maxMN = self._verify_batch_max_mn(proofs)
+        workers = workers if workers else (os.cpu_count() or 1)
+        nchunks = max(1, min(workers, len(proofs)))
+        chunks = [proofs[i::nchunks] for i in range(nchunks)]
+
+        own_executor = executor is None
+        if own_executor:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(max_workers=nchunks)
+
+        try:
+            futures = [
+                executor.submit(_verify_batch_worker, chunk, maxMN, proof_v8)
+                for chunk in chunks
+            ]
+            acc = BpVerifyAcc(maxMN, False)
+            for fut in futures:
+                acc.merge(BpVerifyAcc.from_tuple(fut.result(), maxMN))
+
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        return self._verify_batch_final(acc, maxMN, False)
+
+    def _verify_batch_max_mn(self, proofs):
         max_length = 0
         for proof in proofs:
             self.assrt(is_reduced(proof.taux), "Input scalar not in range")
@@ -1584,49 +2558,119 @@ class BulletProofBuilder(object):
             max_length = max(max_length, len(proof.L))
 
         self.assrt(max_length < 32, "At least one proof is too large")
+        return 1 << max_length
+
+    def _verify_challenges(self, proof):
+        """
+        Reconstructs the Fiat-Shamir challenges of the proof
+        :return: (logM, y, z, x, x_ip, w)
+        """
+        M = 1
+        logM = 0
+        while M <= BP_M and M < len(proof.V):
+            logM += 1
+            M = 1 << logM
+
+        self.assrt(len(proof.L) == BP_LOG_N + logM, "Proof is not the expected size")
+
+        hash_cache = hash_vct_to_scalar(None, proof.V)
+        y = hash_cache_mash(None, hash_cache, proof.A, proof.S)
+        self.assrt(y != ZERO, "y == 0")
+        z = hash_to_scalar(None, y)
+        copy_key(hash_cache, z)
+        self.assrt(z != ZERO, "z == 0")
+
+        x = hash_cache_mash(None, hash_cache, z, proof.T1, proof.T2)
+        self.assrt(x != ZERO, "x == 0")
+        x_ip = hash_cache_mash(None, hash_cache, x, proof.taux, proof.mu, proof.t)
+        self.assrt(x_ip != ZERO, "x_ip == 0")
+
+        # Compute the number of rounds for the inner product
+        rounds = logM + BP_LOG_N
+        self.assrt(rounds > 0, "Zero rounds")
+
+        # PAPER LINES 21-22
+        # The inner product challenges are computed per round
+        w = _ensure_dst_keyvect(None, rounds)
+        for i in range(rounds):
+            hash_cache_mash(tmp_bf_0, hash_cache, proof.L[i], proof.R[i])
+            w.read(i, tmp_bf_0)
+            self.assrt(w[i] != ZERO, "w[i] == 0")
+
+        del (hash_cache)
+        self.gc(60)
+        return logM, y, z, x, x_ip, w
+
+    def _verify_batch_acc(self, proofs, maxMN, is_single, proof_v8=False):
+        """
+        Accumulates weighted aggregates of the proofs.
+        In the host mode the multiexp terms are left in acc.muex_all.
 
-        maxMN = 1 << max_length
+        :return: BpVerifyAcc
+        """
         logN = 6
         N = 1 << logN
         tmp = _ensure_dst_key()
 
         # setup weighted aggregates
-        is_single = len(proofs) == 1 and single_optim  # ph4
-        z1 = init_key(ZERO)
-        z3 = init_key(ZERO)
-        m_z4 = vector_dup(ZERO, maxMN) if not is_single else None
-        m_z5 = vector_dup(ZERO, maxMN) if not is_single else None
-        m_y0 = init_key(ZERO)
-        y1 = init_key(ZERO)
-        muex_acc = init_key(ONE)
+        acc = BpVerifyAcc(maxMN, is_single, self.low_mem)
+        muex_all = acc.muex_all
+        z1 = acc.z1
+        z3 = acc.z3
+        m_z4 = acc.m_z4
+        m_z5 = acc.m_z5
+        m_y0 = acc.m_y0
+        y1 = acc.y1
+        muex_acc = acc.muex_acc
 
         Gprec = self._gprec_aux(maxMN)
         Hprec = self._hprec_aux(maxMN)
 
-        for proof in proofs:
-            M = 1
-            logM = 0
-            while M <= BP_M and M < len(proof.V):
-                logM += 1
-                M = 1 << logM
+        # Host mode accumulates the generator scalars as native scalars
+        native = not self.low_mem and not is_single
+        if native:
+            sc_m_z4 = ScalarVector.decode(m_z4)
+            sc_m_z5 = ScalarVector.decode(m_z5)
+            sc_g, sc_h, sc_tmp = alloc_scalars(3)
+
+        # Host mode reconstructs the challenges of all proofs first so y and w
+        # of the whole batch are inverted with a single modular inversion.
+        # Low memory mode holds and inverts the challenges of one proof at a time.
+        challenges, inverted = None, None
+        if not self.low_mem:
+            challenges = [self._verify_challenges(proof) for proof in proofs]
+            to_invert = []
+            for logM, y, z, x, x_ip, w in challenges:
+                to_invert.append(y)
+                to_invert += [w[i] for i in range(logM + logN)]
+            inverted = invert_batch(None, to_invert)
+            del (to_invert)
+            self.gc(61)
+
+        inv_offset = 0
+        for proof_idx, proof in enumerate(proofs):
+            if challenges is not None:
+                logM, y, z, x, x_ip, w = challenges[proof_idx]
+                challenges[proof_idx] = None
+            else:
+                logM, y, z, x, x_ip, w = self._verify_challenges(proof)
 
-            self.assrt(len(proof.L) == 6 + logM, "Proof is not the expected size")
+            M = 1 << logM
             MN = M * N
+            rounds = logM + logN
             weight_y = crypto.encodeint(crypto.random_scalar())
             weight_z = crypto.encodeint(crypto.random_scalar())
 
-            # Reconstruct the challenges
-            hash_cache = hash_vct_to_scalar(None, proof.V)
-            y = hash_cache_mash(None, hash_cache, proof.A, proof.S)
-            self.assrt(y != ZERO, "y == 0")
-            z = hash_to_scalar(None, y)
-            copy_key(hash_cache, z)
-            self.assrt(z != ZERO, "z == 0")
-
-            x = hash_cache_mash(None, hash_cache, z, proof.T1, proof.T2)
-            self.assrt(x != ZERO, "x == 0")
-            x_ip = hash_cache_mash(None, hash_cache, x, proof.taux, proof.mu, proof.t)
-            self.assrt(x_ip != ZERO, "x_ip == 0")
+            winv = _ensure_dst_keyvect(None, rounds)
+            if challenges is not None:
+                yinv = inverted.to(inv_offset, _ensure_dst_key())
+                for i in range(rounds):
+                    winv.read(i, inverted.to(inv_offset + 1 + i))
+                inv_offset += 1 + rounds
+            else:
+                yinv = invert(None, y)
+                for i in range(rounds):
+                    winv.read(i, invert(tmp_bf_0, w[i]))
 
             # PAPER LINE 61
             sc_mulsub(m_y0, proof.taux, weight_y, m_y0)
@@ -1648,10 +2692,10 @@ class BulletProofBuilder(object):
             if not proof_v8:
                 weight_y8 = sc_mul(None, weight_y, EIGHT)
 
-            muex = MultiExpSequential(points=[pt for pt in proof.V])
+            muex = muex_all if muex_all is not None else MultiExpSequential()
             for j in range(len(proof.V)):
                 sc_mul(tmp, zpow[j + 2], weight_y8)
-                muex.add_scalar(init_key(tmp))
+                muex.add_pair(init_key(tmp), proof.V[j])
 
             sc_mul(tmp, x, weight_y8)
             muex.add_pair(init_key(tmp), proof.T1)
@@ -1670,111 +2714,205 @@ class BulletProofBuilder(object):
             sc_mul(tmp, x, weight_z8)
             muex.add_pair(init_key(tmp), proof.S)
 
-            multiexp(tmp, muex, False)
-            add_keys(muex_acc, muex_acc, tmp)
+            if muex is not muex_all:
+                multiexp(tmp, muex, False, self.low_mem)
+                add_keys(muex_acc, muex_acc, tmp)
             del (muex)
 
-            # Compute the number of rounds for the inner product
-            rounds = logM + logN
-            self.assrt(rounds > 0, "Zero rounds")
-
-            # PAPER LINES 21-22
-            # The inner product challenges are computed per round
-            w = _ensure_dst_keyvect(None, rounds)
-            for i in range(rounds):
-                hash_cache_mash(tmp_bf_0, hash_cache, proof.L[i], proof.R[i])
-                w.read(i, tmp_bf_0)
-                self.assrt(w[i] != ZERO, "w[i] == 0")
-
             # Basically PAPER LINES 24-25
             # Compute the curvepoints from G[i] and H[i]
-            yinvpow = init_key(ONE)
-            ypow = init_key(ONE)
-            yinv = invert(None, y)
-            self.gc(61)
-
-            winv = _ensure_dst_keyvect(None, rounds)
-            for i in range(rounds):
-                invert(tmp_bf_0, w.to(i))
-                winv.read(i, tmp_bf_0)
-                self.gc(62)
-
-            g_scalar = _ensure_dst_key()
-            h_scalar = _ensure_dst_key()
             twoN = self._two_aux(N)
-            for i in range(MN):
-                copy_key(g_scalar, proof.a)
-                sc_mul(h_scalar, proof.b, yinvpow)
-
-                for j in range(rounds - 1, -1, -1):
-                    J = len(w) - j - 1
+            if native:
+                # Challenge products for all indices, MN scalars
+                chprod = challenge_products(w, winv, rounds, native=True)
+                self._verify_gh_scalars(
+                    proof,
+                    chprod,
+                    MN,
+                    N,
+                    y,
+                    yinv,
+                    z,
+                    zpow,
+                    twoN,
+                    weight_z,
+                    sc_m_z4,
+                    sc_m_z5,
+                    sc_g,
+                    sc_h,
+                    sc_tmp,
+                )
+                del (chprod)
 
-                    if (i & (1 << j)) == 0:
-                        sc_mul(g_scalar, g_scalar, winv.to(J))
-                        sc_mul(h_scalar, h_scalar, w.to(J))
+            else:
+                # Low memory mode recomputes the challenge product
+                # for each index from all round challenges.
+                yinvpow = init_key(ONE)
+                ypow = init_key(ONE)
+                g_scalar = _ensure_dst_key()
+                h_scalar = _ensure_dst_key()
+
+                for i in range(MN):
+                    copy_key(g_scalar, proof.a)
+                    sc_mul(h_scalar, proof.b, yinvpow)
+
+                    for j in range(rounds - 1, -1, -1):
+                        J = len(w) - j - 1
+
+                        if (i & (1 << j)) == 0:
+                            sc_mul(g_scalar, g_scalar, winv.to(J))
+                            sc_mul(h_scalar, h_scalar, w.to(J))
+                        else:
+                            sc_mul(g_scalar, g_scalar, w.to(J))
+                            sc_mul(h_scalar, h_scalar, winv.to(J))
+
+                    # Adjust the scalars using the exponents from PAPER LINE 62
+                    sc_add(g_scalar, g_scalar, z)
+                    self.assrt(2 + i // N < len(zpow), "invalid zpow index")
+                    self.assrt(i % N < len(twoN), "invalid twoN index")
+                    sc_mul(tmp, zpow.to(2 + i // N), twoN.to(i % N))
+                    sc_muladd(tmp, z, ypow, tmp)
+                    sc_mulsub(h_scalar, tmp, yinvpow, h_scalar)
+
+                    if not is_single:  # ph4
+                        sc_mulsub(m_z4[i], g_scalar, weight_z, m_z4[i])
+                        sc_mulsub(m_z5[i], h_scalar, weight_z, m_z5[i])
                     else:
-                        sc_mul(g_scalar, g_scalar, w.to(J))
-                        sc_mul(h_scalar, h_scalar, winv.to(J))
-
-                # Adjust the scalars using the exponents from PAPER LINE 62
-                sc_add(g_scalar, g_scalar, z)
-                self.assrt(2 + i // N < len(zpow), "invalid zpow index")
-                self.assrt(i % N < len(twoN), "invalid twoN index")
-                sc_mul(tmp, zpow.to(2 + i // N), twoN.to(i % N))
-                sc_muladd(tmp, z, ypow, tmp)
-                sc_mulsub(h_scalar, tmp, yinvpow, h_scalar)
-
-                if not is_single:  # ph4
-                    sc_mulsub(m_z4[i], g_scalar, weight_z, m_z4[i])
-                    sc_mulsub(m_z5[i], h_scalar, weight_z, m_z5[i])
-                else:
-                    sc_mul(tmp, g_scalar, weight_z)
-                    sub_keys(muex_acc, muex_acc, scalarmult_key(tmp, Gprec.to(i), tmp))
-
-                    sc_mul(tmp, h_scalar, weight_z)
-                    sub_keys(muex_acc, muex_acc, scalarmult_key(tmp, Hprec.to(i), tmp))
-
-                if i != MN - 1:
-                    sc_mul(yinvpow, yinvpow, yinv)
-                    sc_mul(ypow, ypow, y)
-                if i & 15 == 0:
-                    self.gc(62)
-
-            del (g_scalar, h_scalar, twoN)
+                        sc_mul(tmp, g_scalar, weight_z)
+                        sub_keys(
+                            muex_acc, muex_acc, scalarmult_key(tmp, Gprec.to(i), tmp)
+                        )
+
+                        sc_mul(tmp, h_scalar, weight_z)
+                        sub_keys(
+                            muex_acc, muex_acc, scalarmult_key(tmp, Hprec.to(i), tmp)
+                        )
+
+                    if i != MN - 1:
+                        sc_mul(yinvpow, yinvpow, yinv)
+                        sc_mul(ypow, ypow, y)
+                    if i & 15 == 0:
+                        self.gc(62)
+                del (g_scalar, h_scalar)
+
+            del (twoN)
             self.gc(63)
 
             sc_muladd(z1, proof.mu, weight_z, z1)
-            muex = MultiExpSequential(
-                point_fnc=lambda i, d: proof.L[i // 2]
-                if i & 1 == 0
-                else proof.R[i // 2]
-            )
+            muex = muex_all if muex_all is not None else MultiExpSequential()
             for i in range(rounds):
                 sc_mul(tmp, w[i], w[i])
                 sc_mul(tmp, tmp, weight_z8)
-                muex.add_scalar(tmp)
+                muex.add_pair(init_key(tmp), proof.L[i])
                 sc_mul(tmp, winv[i], winv[i])
                 sc_mul(tmp, tmp, weight_z8)
-                muex.add_scalar(tmp)
+                muex.add_pair(init_key(tmp), proof.R[i])
 
-            acc = multiexp(None, muex, False)
-            add_keys(muex_acc, muex_acc, acc)
+            if muex is not muex_all:
+                multiexp(tmp, muex, False, self.low_mem)
+                add_keys(muex_acc, muex_acc, tmp)
 
             sc_mulsub(tmp, proof.a, proof.b, proof.t)
             sc_mul(tmp, tmp, x_ip)
             sc_muladd(z3, tmp, weight_z, z3)
 
-        sc_sub(tmp, m_y0, z1)
-        z3p = sc_sub(None, z3, y1)
+        if native:
+            sc_m_z4.encode(m_z4)
+            sc_m_z5.encode(m_z5)
+        del (challenges, inverted)
+        return acc
+
+    def _verify_gh_scalars(
+        self,
+        proof,
+        chprod,
+        MN,
+        N,
+        y,
+        yinv,
+        z,
+        zpow,
+        twoN,
+        weight_z,
+        m_z4,
+        m_z5,
+        g_scalar,
+        h_scalar,
+        tmp,
+    ):
+        """
+        Host mode generator scalars of the proof, PAPER LINES 24-25 and 62,
+        computed on native scalars and subtracted from m_z4, m_z5.
 
-        check2 = crypto.encodepoint(
-            crypto.ge_double_scalarmult_base_vartime(
-                crypto.decodeint(z3p), crypto.xmr_H(), crypto.decodeint(tmp)
+        :param chprod: ScalarVector of the challenge products
+        :param m_z4: ScalarVector
+        :param m_z5: ScalarVector
+        """
+        sc_a = crypto.decodeint(proof.a)
+        sc_b = crypto.decodeint(proof.b)
+        sc_y = crypto.decodeint(y)
+        sc_yinv = crypto.decodeint(yinv)
+        sc_z = crypto.decodeint(z)
+        sc_wz = crypto.decodeint(weight_z)
+        sc_zpow = ScalarVector.decode(zpow)
+        sc_two = ScalarVector.decode(twoN)
+        yinvpow = crypto.sc_init(1)
+        ypow = crypto.sc_init(1)
+
+        for i in range(MN):
+            crypto.sc_mul_into(g_scalar, sc_a, chprod[i])
+            crypto.sc_mul_into(h_scalar, sc_b, yinvpow)
+            crypto.sc_mul_into(h_scalar, h_scalar, chprod[(~i) & (MN - 1)])
+
+            # Adjust the scalars using the exponents from PAPER LINE 62
+            crypto.sc_add_into(g_scalar, g_scalar, sc_z)
+            self.assrt(2 + i // N < len(sc_zpow), "invalid zpow index")
+            self.assrt(i % N < len(sc_two), "invalid twoN index")
+            crypto.sc_mul_into(tmp, sc_zpow[2 + i // N], sc_two[i % N])
+            crypto.sc_muladd_into(tmp, sc_z, ypow, tmp)
+            crypto.sc_mulsub_into(h_scalar, tmp, yinvpow, h_scalar)
+
+            crypto.sc_mulsub_into(m_z4[i], g_scalar, sc_wz, m_z4[i])
+            crypto.sc_mulsub_into(m_z5[i], h_scalar, sc_wz, m_z5[i])
+
+            if i != MN - 1:
+                crypto.sc_mul_into(yinvpow, yinvpow, sc_yinv)
+                crypto.sc_mul_into(ypow, ypow, sc_y)
+
+    def _verify_batch_final(self, acc, maxMN, is_single):
+        """
+        Final check of the accumulated aggregates
+        """
+        tmp = _ensure_dst_key()
+        muex_all = acc.muex_all
+        m_z4 = acc.m_z4
+        m_z5 = acc.m_z5
+        muex_acc = acc.muex_acc
+        Gprec = self._gprec_aux(maxMN)
+        Hprec = self._hprec_aux(maxMN)
+
+        sc_sub(tmp, acc.m_y0, acc.z1)
+        z3p = sc_sub(None, acc.z3, acc.y1)
+
+        if muex_all is not None:
+            muex_all.add_pair(z3p, XMR_H)
+            muex_all.add_pair(init_key(tmp), XMR_G)
+        else:
+            check2 = crypto.encodepoint(
+                crypto.ge_double_scalarmult_base_vartime(
+                    crypto.decodeint(z3p), crypto.xmr_H(), crypto.decodeint(tmp)
+                )
             )
-        )
-        add_keys(muex_acc, muex_acc, check2)
+            add_keys(muex_acc, muex_acc, check2)
 
-        if not is_single:  # ph4
+        if muex_all is not None:
+            for i in range(maxMN):
+                muex_all.add_pair(m_z4[i], init_key(Gprec.to(i)))
+                muex_all.add_pair(m_z5[i], init_key(Hprec.to(i)))
+            muex = multiexp(None, muex_all, False, False, self.multiexp_mem_cap)
+            add_keys(muex_acc, muex_acc, muex)
+
+        elif not is_single:  # ph4
             muex = MultiExpSequential(
                 point_fnc=lambda i, d: Gprec.to(i // 2)
                 if i & 1 == 0
@@ -1788,3 +2926,140 @@ class BulletProofBuilder(object):
         if muex_acc != ONE:
             raise ValueError("Verification failure at step 2")
         return True
+
+
+def _prove_worker_init(mem_limit=None):
+    """
+    Process pool initializer of BulletProofProvingService.
+    Bounds the address space of the worker process.
+    """
+    if mem_limit:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (mem_limit, mem_limit))
+
+
+def _prove_batch_worker(amounts, masks, use_det_masks, fnc_det_mask, proof_v8):
+    """
+    Process pool worker of BulletProofProvingService, masks are encoded
+    """
+    bpi = BulletProofBuilder()
+    bpi.use_det_masks = use_det_masks
+    bpi.fnc_det_mask = fnc_det_mask
+    bpi.gc_fnc = None
+    proof = bpi.prove_batch(
+        [crypto.sc_init(x) for x in amounts],
+        [crypto.decodeint(x) for x in masks],
+        proof_v8,
+    )
+
+    # detach from KeyV buffers, memoryviews are not picklable
+    for fld in ("A", "S", "T1", "T2", "taux", "mu", "a", "b", "t"):
+        setattr(proof, fld, bytes(getattr(proof, fld)))
+    for fld in ("V", "L", "R"):
+        setattr(proof, fld, [bytes(x) for x in getattr(proof, fld)])
+    return proof
+
+
+class BulletProofProvingService(object):
+    """
+    Proves many (amounts, masks) jobs concurrently in a process pool.
+    Each job is one aggregated proof, i.e., BulletProofBuilder.prove_batch(amounts, masks).
+    Proofs are returned in the submission order.
+
+    Memory is bounded by the number of jobs in flight (max_pending),
+    worker address space limit (worker_mem_limit, POSIX only) and worker
+    recycling after max_tasks_per_worker jobs (Python 3.11+).
+
+    Deterministic masks (_det_mask) work as in BulletProofBuilder, custom
+    fnc_det_mask has to be picklable, e.g., a module level function.
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        executor=None,
+        max_pending=None,
+        worker_mem_limit=None,
+        max_tasks_per_worker=None,
+        use_det_masks=True,
+        fnc_det_mask=None,
+        proof_v8=False,
+    ):
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        self.max_pending = max_pending if max_pending else 2 * self.workers
+        self.use_det_masks = use_det_masks
+        self.fnc_det_mask = fnc_det_mask
+        self.proof_v8 = proof_v8
+        self.own_executor = executor is None
+        self.executor = executor
+        if self.own_executor:
+            from concurrent.futures import ProcessPoolExecutor
+
+            kwargs = {}
+            if max_tasks_per_worker:
+                kwargs["max_tasks_per_child"] = max_tasks_per_worker
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_prove_worker_init,
+                initargs=(worker_mem_limit,),
+                **kwargs
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self.own_executor and self.executor is not None:
+            self.executor.shutdown()
+        self.executor = None
+
+    def submit(self, amounts, masks):
+        """
+        Submits one proving job
+
+        :param amounts: list of integer amounts
+        :param masks: list of mask scalars
+        :return: future of the Bulletproof
+        """
+        if len(amounts) != len(masks):
+            raise ValueError("|amounts| != |masks|")
+        if len(amounts) == 0 or len(amounts) > BP_M:
+            raise ValueError("Invalid number of amounts")
+        return self.executor.submit(
+            _prove_batch_worker,
+            list(amounts),
+            [crypto.encodeint(x) for x in masks],
+            self.use_det_masks,
+            self.fnc_det_mask,
+            self.proof_v8,
+        )
+
+    def map(self, jobs):
+        """
+        Proves the jobs, yields proofs in the submission order.
+        At most max_pending jobs are in flight.
+
+        :param jobs: iterable of (amounts, masks)
+        :return:
+        """
+        pending = []
+        for amounts, masks in jobs:
+            if len(pending) >= self.max_pending:
+                yield pending.pop(0).result()
+            pending.append(self.submit(amounts, masks))
+
+        while pending:
+            yield pending.pop(0).result()
+
+    def prove_all(self, jobs):
+        """
+        Proves the jobs, returns list of proofs in the submission order
+
+        :param jobs: iterable of (amounts, masks)
+        :return:
+        """
+        return list(self.map(jobs))
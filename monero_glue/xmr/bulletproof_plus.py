@@ -0,0 +1,602 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+#
+# Bulletproofs+, adapted from Monero C++ code
+# https://eprint.iacr.org/2020/735.pdf
+#
+# Proof elements are stored multiplied by 8^{-1} as in Monero.
+#
+
+from monero_glue.compat import gc
+from monero_glue.xmr import crypto
+from monero_glue.xmr.bulletproof import (
+    BP_IP12,
+    BP_LOG_N,
+    BP_M,
+    BP_N,
+    EIGHT,
+    INV_EIGHT,
+    ONE,
+    XMR_G,
+    XMR_H,
+    ZERO,
+    KeyV,
+    MultiExp,
+    ScalarVector,
+    _ensure_dst_key,
+    add_keys,
+    add_keys2,
+    challenge_products,
+    copy_key,
+    get_exponent,
+    hadamard_fold,
+    hash_cache_mash,
+    hash_to_scalar,
+    hash_vct_to_scalar,
+    init_key,
+    invert_batch,
+    is_reduced,
+    multiexp,
+    scalarmult_base,
+    scalarmult_key,
+    sc_add,
+    sc_mul,
+    sc_muladd,
+    sc_sub,
+    vector_exponent_custom,
+)
+from monero_serialize import xmrserialize as x, xmrtypes
+
+BP_PLUS_SALT = b"bulletproof_plus"
+BP_PLUS_TRANSCRIPT = b"bulletproof_plus_transcript"
+
+
+class BulletproofPlus(x.MessageType):
+    __slots__ = ["V", "A", "A1", "B", "r1", "s1", "d1", "L", "R"]
+    MFIELDS = [
+        ("A", xmrtypes.ECKey),
+        ("A1", xmrtypes.ECKey),
+        ("B", xmrtypes.ECKey),
+        ("r1", xmrtypes.ECKey),
+        ("s1", xmrtypes.ECKey),
+        ("d1", xmrtypes.ECKey),
+        ("L", xmrtypes.KeyV),
+        ("R", xmrtypes.KeyV),
+    ]
+
+    async def boost_serialize(self, ar, version=None):
+        await ar.message_fields(self, [("V", xmrtypes.KeyV)] + self.MFIELDS)
+        return self
+
+
+_initial_transcript = None
+_gi_plus = None
+_hi_plus = None
+
+
+def initial_transcript():
+    """
+    Initial Fiat-Shamir transcript, hash to point of the domain separator
+    """
+    global _initial_transcript
+    if _initial_transcript is None:
+        pt = crypto.hash_to_point(crypto.keccak_hash(BP_PLUS_TRANSCRIPT))
+        _initial_transcript = crypto.encodepoint(pt)
+    return _initial_transcript
+
+
+def init_exponents_plus(size):
+    """
+    Gi, Hi generators with at least size elements.
+    Generators are computed on the first use and cached.
+
+    :param size:
+    :return: Gi, Hi
+    """
+    global _gi_plus, _hi_plus
+    cur = len(_gi_plus) if _gi_plus is not None else 0
+    if cur >= size:
+        return _gi_plus, _hi_plus
+
+    Gi = KeyV(size)
+    Hi = KeyV(size)
+    for i in range(size):
+        if i < cur:
+            Gi.read(i, _gi_plus[i])
+            Hi.read(i, _hi_plus[i])
+        else:
+            get_exponent(Hi[i], XMR_H, i * 2, BP_PLUS_SALT)
+            get_exponent(Gi[i], XMR_H, i * 2 + 1, BP_PLUS_SALT)
+
+    _gi_plus, _hi_plus = Gi, Hi
+    return Gi, Hi
+
+
+def weighted_inner_product(a, b, y, dst_sc=None):
+    r"""
+    Weighted inner product \sum_i a[i] * b[i] * y^{i + 1}
+
+    :param a: ScalarVector
+    :param b: ScalarVector
+    :param y: native scalar
+    :return: native scalar
+    """
+    if len(a) != len(b):
+        raise ValueError("Incompatible sizes of a and b")
+    dst_sc = crypto.sc_0_into(dst_sc) if dst_sc is not None else crypto.sc_0()
+    ypow = crypto.sc_init(1)
+    tmp = crypto.new_scalar()
+    for i in range(len(a)):
+        crypto.sc_mul_into(ypow, ypow, y)
+        crypto.sc_mul_into(tmp, a.sc[i], b.sc[i])
+        crypto.sc_muladd_into(dst_sc, tmp, ypow, dst_sc)
+    return dst_sc
+
+
+def compute_LR(y, G, H, a, b, c, d, dst=None):
+    r"""
+    \sum_i (a[i] * y / 8) G[i] + (b[i] / 8) H[i] + (c / 8) H + (d / 8) G
+    a, b are ScalarVectors, y, c, d native scalars, G, H KeyV.
+    """
+    inv8 = crypto.sc_inv_eight()
+    ay8 = a.scale(crypto.sc_mul(y, inv8))
+    b8 = b.scale(inv8)
+    muex = MultiExp()
+    for i in range(len(a)):
+        muex.add_pair(init_key(ay8.to(i)), init_key(G.to(i)))
+        muex.add_pair(init_key(b8.to(i)), init_key(H.to(i)))
+    muex.add_pair(crypto.encodeint(crypto.sc_mul(c, inv8)), XMR_H)
+    muex.add_pair(crypto.encodeint(crypto.sc_mul(d, inv8)), XMR_G)
+    return multiexp(dst, muex, False, False)
+
+
+class BulletProofPlusBuilder(object):
+    """
+    Bulletproofs+ range proof, host oriented: full vectors are kept in memory.
+    """
+
+    def __init__(self):
+        self.gc_fnc = gc.collect
+        self.gc_trace = None
+
+    def gc(self, *args):
+        if self.gc_trace:
+            self.gc_trace(*args)
+        if self.gc_fnc:
+            self.gc_fnc()
+
+    def assrt(self, cond, msg=None, *args, **kwargs):
+        if not cond:
+            raise ValueError(msg)
+
+    def prove(self, sv, gamma):
+        return self.prove_batch([sv], [gamma])
+
+    def prove_batch(self, sv, gamma):
+        """
+        Aggregated BP+ range proof of the amounts sv with masks gamma
+
+        :param sv: amount scalars
+        :param gamma: mask scalars
+        :return: BulletproofPlus
+        """
+        self.assrt(len(sv) == len(gamma), "|sv| != |gamma|")
+        self.assrt(len(sv) > 0, "sv empty")
+        self.assrt(len(sv) <= BP_M, "Too many amounts")
+
+        sv = [crypto.encodeint(x) for x in sv]
+        gamma = [crypto.encodeint(x) for x in gamma]
+
+        M, logM = 1, 0
+        while M <= BP_M and M < len(sv):
+            logM += 1
+            M = 1 << logM
+        MN = M * BP_N
+
+        V = KeyV(len(sv))
+        for i in range(len(sv)):
+            add_keys2(V[i], gamma[i], sv[i], XMR_H)
+            scalarmult_key(V[i], V[i], INV_EIGHT)
+
+        # aL[j * N + i] = bit i of sv[j], aR = aL - 1
+        aL = ScalarVector(MN)
+        aR = ScalarVector(MN)
+        minus_one = crypto.sc_sub(crypto.sc_0(), crypto.sc_init(1))
+        for j in range(M):
+            for i in range(BP_N):
+                if j < len(sv) and (sv[j][i // 8] >> (i % 8)) & 1:
+                    crypto.sc_init_into(aL.sc[j * BP_N + i], 1)
+                else:
+                    aR[j * BP_N + i] = minus_one
+        self.gc(1)
+
+        while True:
+            proof = self._prove_batch_main(V, gamma, aL, aR, logM, M)
+            if proof is not None:
+                return proof
+
+    def _prove_batch_main(self, V, gamma, aL, aR, logM, M):
+        """
+        Single proving attempt, None if any of the challenges is zero
+        """
+        MN = M * BP_N
+        logMN = logM + BP_LOG_N
+        Gi, Hi = init_exponents_plus(MN)
+        inv8 = crypto.sc_inv_eight()
+
+        transcript = init_key(initial_transcript())
+        hash_cache_mash(None, transcript, hash_vct_to_scalar(None, V))
+
+        # A = aL/8 * Gi + aR/8 * Hi + alpha/8 * G
+        alpha = crypto.random_scalar()
+        A = vector_exponent_custom(Gi, Hi, aL.scale(inv8), aR.scale(inv8))
+        add_keys(
+            A, A, scalarmult_base(None, crypto.encodeint(crypto.sc_mul(alpha, inv8)))
+        )
+        self.gc(2)
+
+        # Challenges
+        y = hash_cache_mash(None, transcript, A)
+        if y == ZERO:
+            return None
+        z = hash_to_scalar(None, y)
+        copy_key(transcript, z)
+        if z == ZERO:
+            return None
+        y = crypto.decodeint(y)
+        z = crypto.decodeint(z)
+        z_squared = crypto.sc_mul(z, z)
+
+        # Windowed vector d[j * N + i] = z^{2(j + 1)} 2^i
+        two = crypto.sc_init(2)
+        d = ScalarVector(MN)
+        d[0] = z_squared
+        for i in range(1, BP_N):
+            crypto.sc_mul_into(d.sc[i], d.sc[i - 1], two)
+        for j in range(1, M):
+            for i in range(BP_N):
+                crypto.sc_mul_into(
+                    d.sc[j * BP_N + i], d.sc[(j - 1) * BP_N + i], z_squared
+                )
+
+        y_powers = ScalarVector.powers(y, MN + 2)
+
+        # aL1 = aL - z, aR1 = aR + z + d o y^{MN - i}
+        aprime = ScalarVector(MN)
+        bprime = ScalarVector(MN)
+        for i in range(MN):
+            crypto.sc_sub_into(aprime.sc[i], aL.sc[i], z)
+            crypto.sc_mul_into(bprime.sc[i], d.sc[i], y_powers.sc[MN - i])
+            crypto.sc_add_into(bprime.sc[i], bprime.sc[i], z)
+            crypto.sc_add_into(bprime.sc[i], bprime.sc[i], aR.sc[i])
+        del (d)
+
+        # alpha1 = alpha + \sum_j z^{2(j + 1)} y^{MN + 1} gamma[j]
+        alpha1 = alpha
+        temp = crypto.sc_init(1)
+        tmp = crypto.new_scalar()
+        for j in range(len(gamma)):
+            crypto.sc_mul_into(temp, temp, z_squared)
+            crypto.sc_mul_into(tmp, y_powers.sc[MN + 1], crypto.decodeint(gamma[j]))
+            crypto.sc_muladd_into(alpha1, temp, tmp, alpha1)
+        self.gc(3)
+
+        # Inner product rounds
+        y_inv = crypto.sc_inv(y)
+        y_inv_powers = ScalarVector.powers(y_inv, MN)
+        Gprime = KeyV(MN)
+        Hprime = KeyV(MN)
+        for i in range(MN):
+            Gprime.read(i, Gi.to(i))
+            Hprime.read(i, Hi.to(i))
+
+        L = KeyV(logMN)
+        R = KeyV(logMN)
+        nprime = MN
+        rnd = 0
+        while nprime > 1:
+            nprime //= 2
+            a1, a2 = aprime.view(0, nprime), aprime.view(nprime, 2 * nprime)
+            b1, b2 = bprime.view(0, nprime), bprime.view(nprime, 2 * nprime)
+
+            cL = weighted_inner_product(a1, b2, y)
+            cR = weighted_inner_product(a2.scale(y_powers.sc[nprime]), b1, y)
+
+            dL = crypto.random_scalar()
+            dR = crypto.random_scalar()
+            compute_LR(
+                y_inv_powers.sc[nprime],
+                Gprime.slice_view(nprime, 2 * nprime),
+                Hprime.slice_view(0, nprime),
+                a1,
+                b2,
+                cL,
+                dL,
+                L[rnd],
+            )
+            compute_LR(
+                y_powers.sc[nprime],
+                Gprime.slice_view(0, nprime),
+                Hprime.slice_view(nprime, 2 * nprime),
+                a2,
+                b1,
+                cR,
+                dR,
+                R[rnd],
+            )
+            del (a1, a2, b1, b2)
+
+            e = hash_cache_mash(None, transcript, L[rnd], R[rnd])
+            if e == ZERO:
+                return None
+            e = crypto.decodeint(e)
+            e_inv = crypto.sc_inv(e)
+
+            hadamard_fold(
+                Gprime,
+                crypto.encodeint(e_inv),
+                crypto.encodeint(crypto.sc_mul(y_inv_powers.sc[nprime], e)),
+            )
+            hadamard_fold(Hprime, crypto.encodeint(e), crypto.encodeint(e_inv))
+            Gprime.resize(nprime, realloc=True)
+            Hprime.resize(nprime, realloc=True)
+            aprime.fold(e, crypto.sc_mul(e_inv, y_powers.sc[nprime]))
+            bprime.fold(e_inv, e)
+
+            crypto.sc_mul_into(tmp, e, e)
+            crypto.sc_muladd_into(alpha1, dL, tmp, alpha1)
+            crypto.sc_mul_into(tmp, e_inv, e_inv)
+            crypto.sc_muladd_into(alpha1, dR, tmp, alpha1)
+            rnd += 1
+            self.gc(4)
+
+        # Final round
+        r = crypto.random_scalar()
+        s = crypto.random_scalar()
+        d_ = crypto.random_scalar()
+        eta = crypto.random_scalar()
+
+        # A1 = r/8 Gprime + s/8 Hprime + d_/8 G + (r y b + s y a)/8 H
+        ry = crypto.sc_mul(r, y)
+        sy = crypto.sc_mul(s, y)
+        crypto.sc_mul_into(tmp, ry, bprime.sc[0])
+        crypto.sc_muladd_into(tmp, sy, aprime.sc[0], tmp)
+        muex = MultiExp()
+        muex.add_pair(crypto.encodeint(crypto.sc_mul(r, inv8)), init_key(Gprime[0]))
+        muex.add_pair(crypto.encodeint(crypto.sc_mul(s, inv8)), init_key(Hprime[0]))
+        muex.add_pair(crypto.encodeint(crypto.sc_mul(d_, inv8)), XMR_G)
+        muex.add_pair(crypto.encodeint(crypto.sc_mul(tmp, inv8)), XMR_H)
+        A1 = multiexp(None, muex, False, False)
+
+        # B = eta/8 G + (r y s)/8 H
+        crypto.sc_mul_into(tmp, ry, s)
+        B = add_keys2(
+            None,
+            crypto.encodeint(crypto.sc_mul(eta, inv8)),
+            crypto.encodeint(crypto.sc_mul(tmp, inv8)),
+            XMR_H,
+        )
+
+        e = hash_cache_mash(None, transcript, A1, B)
+        if e == ZERO:
+            return None
+        e = crypto.decodeint(e)
+        e_squared = crypto.sc_mul(e, e)
+
+        r1 = crypto.encodeint(crypto.sc_muladd(aprime.sc[0], e, r))
+        s1 = crypto.encodeint(crypto.sc_muladd(bprime.sc[0], e, s))
+        d1 = crypto.sc_muladd(d_, e, eta)
+        d1 = crypto.encodeint(crypto.sc_muladd(alpha1, e_squared, d1))
+
+        return BulletproofPlus(
+            V=[bytes(V[i]) for i in range(len(V))],
+            A=bytes(A),
+            A1=bytes(A1),
+            B=bytes(B),
+            r1=bytes(r1),
+            s1=bytes(s1),
+            d1=bytes(d1),
+            L=[bytes(L[i]) for i in range(len(L))],
+            R=[bytes(R[i]) for i in range(len(R))],
+        )
+
+    def verify(self, proof):
+        return self.verify_batch([proof])
+
+    def verify_batch(self, proofs):
+        """
+        BP+ batch verification, all multiexp terms of all proofs are
+        evaluated at once.
+
+        :param proofs:
+        :return:
+        """
+        max_length = 0
+        for proof in proofs:
+            self.assrt(is_reduced(proof.r1), "Input scalar not in range")
+            self.assrt(is_reduced(proof.s1), "Input scalar not in range")
+            self.assrt(is_reduced(proof.d1), "Input scalar not in range")
+            self.assrt(len(proof.V) >= 1, "V does not have at least one element")
+            self.assrt(len(proof.L) == len(proof.R), "|L| != |R|")
+            self.assrt(len(proof.L) > 0, "Empty proof")
+            max_length = max(max_length, len(proof.L))
+
+        self.assrt(max_length < 32, "At least one proof is too large")
+        maxMN = 1 << max_length
+        Gi, Hi = init_exponents_plus(maxMN)
+
+        # Reconstruct the challenges, invert y and round challenges at once
+        challenges = []
+        to_invert = []
+        for proof in proofs:
+            M, logM = 1, 0
+            while M <= BP_M and M < len(proof.V):
+                logM += 1
+                M = 1 << logM
+            self.assrt(
+                len(proof.L) == BP_LOG_N + logM, "Proof is not the expected size"
+            )
+            rounds = BP_LOG_N + logM
+
+            transcript = init_key(initial_transcript())
+            hash_cache_mash(None, transcript, hash_vct_to_scalar(None, proof.V))
+            y = hash_cache_mash(None, transcript, proof.A)
+            self.assrt(y != ZERO, "y == 0")
+            z = hash_to_scalar(None, y)
+            copy_key(transcript, z)
+            self.assrt(z != ZERO, "z == 0")
+
+            ch = KeyV(rounds)
+            for j in range(rounds):
+                hash_cache_mash(ch[j], transcript, proof.L[j], proof.R[j])
+                self.assrt(ch[j] != ZERO, "challenges[j] == 0")
+
+            e = hash_cache_mash(None, transcript, proof.A1, proof.B)
+            self.assrt(e != ZERO, "e == 0")
+
+            challenges.append((logM, y, z, e, ch))
+            to_invert.append(y)
+            to_invert += [ch[j] for j in range(rounds)]
+
+        inverted = invert_batch(None, to_invert)
+        del (to_invert)
+        self.gc(10)
+
+        muex = MultiExp()
+        G_scalar = init_key(ZERO)
+        H_scalar = init_key(ZERO)
+        Gi_scalars = ScalarVector(maxMN)
+        Hi_scalars = ScalarVector(maxMN)
+        tmp = _ensure_dst_key()
+        inv_offset = 0
+
+        for proof_idx, proof in enumerate(proofs):
+            logM, y, z, e, ch = challenges[proof_idx]
+            challenges[proof_idx] = None
+            M = 1 << logM
+            MN = M * BP_N
+            rounds = logM + BP_LOG_N
+
+            y_inv = inverted.to(inv_offset, _ensure_dst_key())
+            ch_inv = KeyV(rounds)
+            for j in range(rounds):
+                ch_inv.read(j, inverted.to(inv_offset + 1 + j))
+            inv_offset += 1 + rounds
+
+            weight = crypto.encodeint(crypto.random_scalar())
+            self.assrt(weight != ZERO, "weight == 0")
+            e_squared = sc_mul(None, e, e)
+            z_squared = sc_mul(None, z, z)
+            y_MN = init_key(y)
+            for _ in range(MN.bit_length() - 1):
+                sc_mul(y_MN, y_MN, y_MN)
+            y_MN_1 = sc_mul(None, y_MN, y)
+
+            # Proof points, stored multiplied by 8^{-1}
+            w8 = sc_mul(None, weight, EIGHT)
+            we2 = sc_mul(None, w8, e_squared)
+            muex.add_pair(sc_sub(None, ZERO, we2), proof.A)
+            muex.add_pair(sc_sub(None, ZERO, sc_mul(None, w8, e)), proof.A1)
+            muex.add_pair(sc_sub(None, ZERO, w8), proof.B)
+
+            sc_mul(tmp, we2, y_MN_1)
+            zpow = init_key(ONE)
+            for j in range(len(proof.V)):
+                sc_mul(zpow, zpow, z_squared)
+                muex.add_pair(sc_sub(None, ZERO, sc_mul(None, tmp, zpow)), proof.V[j])
+
+            for j in range(rounds):
+                sc_mul(tmp, ch[j], ch[j])
+                muex.add_pair(sc_sub(None, ZERO, sc_mul(None, we2, tmp)), proof.L[j])
+                sc_mul(tmp, ch_inv[j], ch_inv[j])
+                muex.add_pair(sc_sub(None, ZERO, sc_mul(None, we2, tmp)), proof.R[j])
+
+            # G: weight * d1
+            sc_muladd(G_scalar, weight, proof.d1, G_scalar)
+
+            # H: weight * (r1 y s1 - e^2 ((z - z^2) \sum_i y^i - z y^{MN + 1} \sum_i d[i]))
+            sum_y = init_key(ZERO)
+            ypow = init_key(ONE)
+            for i in range(MN):
+                sc_mul(ypow, ypow, y)
+                sc_add(sum_y, sum_y, ypow)
+
+            sum_d = init_key(ZERO)
+            zpow = init_key(ONE)
+            for j in range(M):
+                sc_mul(zpow, zpow, z_squared)
+                sc_add(sum_d, sum_d, zpow)
+            sc_mul(sum_d, sum_d, BP_IP12)  # 2^64 - 1
+
+            sc_sub(tmp, z, z_squared)
+            sc_mul(tmp, tmp, sum_y)
+            term = sc_mul(None, z, y_MN_1)
+            sc_mul(term, term, sum_d)
+            sc_sub(tmp, tmp, term)
+            sc_mul(tmp, tmp, e_squared)
+            sc_mul(term, proof.r1, y)
+            sc_mul(term, term, proof.s1)
+            sc_sub(tmp, term, tmp)
+            sc_muladd(H_scalar, weight, tmp, H_scalar)
+
+            # Gi: weight * (r1 e chprod[i] y^{-i} + e^2 z)
+            # Hi: weight * (s1 e chprod[~i] - e^2 (z + d[i] y^{MN - i}))
+            chprod = challenge_products(ch, ch_inv, rounds)
+            w_sc = crypto.decodeint(weight)
+            e2_sc = crypto.decodeint(e_squared)
+            z_sc = crypto.decodeint(z)
+            z2_sc = crypto.decodeint(z_squared)
+            yinv_sc = crypto.decodeint(y_inv)
+            g_base = crypto.sc_mul(
+                crypto.sc_mul(w_sc, crypto.decodeint(proof.r1)), crypto.decodeint(e)
+            )
+            h_base = crypto.sc_mul(
+                crypto.sc_mul(w_sc, crypto.decodeint(proof.s1)), crypto.decodeint(e)
+            )
+            we2z = crypto.sc_mul(crypto.sc_mul(w_sc, e2_sc), z_sc)
+            we2 = crypto.sc_mul(w_sc, e2_sc)
+            yinv_pow = crypto.sc_init(1)
+            y_pow = crypto.decodeint(y_MN)  # y^{MN - i}
+            d_blk = z2_sc  # z^{2(j + 1)} for the block j
+            d_sc = d_blk
+            two = crypto.sc_init(2)
+            cp = crypto.new_scalar()
+            tsc = crypto.new_scalar()
+
+            for i in range(MN):
+                if i > 0 and i % BP_N == 0:
+                    d_sc = crypto.sc_mul(d_blk, z2_sc)
+                    d_blk = d_sc
+                elif i > 0:
+                    d_sc = crypto.sc_mul(d_sc, two)
+
+                crypto.decodeint_into_noreduce(cp, chprod.to(i))
+                crypto.sc_mul_into(tsc, g_base, cp)
+                crypto.sc_mul_into(tsc, tsc, yinv_pow)
+                crypto.sc_add_into(tsc, tsc, we2z)
+                crypto.sc_add_into(Gi_scalars.sc[i], Gi_scalars.sc[i], tsc)
+
+                crypto.decodeint_into_noreduce(cp, chprod.to((~i) & (MN - 1)))
+                crypto.sc_mul_into(tsc, h_base, cp)
+                crypto.sc_sub_into(tsc, tsc, we2z)
+                crypto.sc_mul_into(cp, d_sc, y_pow)
+                crypto.sc_mul_into(cp, cp, we2)
+                crypto.sc_sub_into(tsc, tsc, cp)
+                crypto.sc_add_into(Hi_scalars.sc[i], Hi_scalars.sc[i], tsc)
+
+                crypto.sc_mul_into(yinv_pow, yinv_pow, yinv_sc)
+                if i != MN - 1:
+                    y_pow = crypto.sc_mul(y_pow, yinv_sc)
+            del (chprod)
+            self.gc(11)
+
+        muex.add_pair(G_scalar, XMR_G)
+        muex.add_pair(H_scalar, XMR_H)
+        for i in range(maxMN):
+            muex.add_pair(init_key(Gi_scalars.to(i)), init_key(Gi.to(i)))
+            muex.add_pair(init_key(Hi_scalars.to(i)), init_key(Hi.to(i)))
+
+        if multiexp(None, muex, False, False) != ONE:
+            raise ValueError("Verification failure")
+        return True
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+#
+# Batched Keccak-f[1600] over many independent messages, NumPy required.
+# N states live in a (25, N) uint64 array, lane x + 5 * y is the row A[x + 5 * y],
+# i.e., one numpy operation processes the lane of all N states.
+# Padding is the original Keccak one (as keccak2.Keccak256, cn_fast_hash).
+#
+
+import numpy as np
+
+from .keccak2 import RotationConstants, RoundConstants, multirate_padding
+
+RATE = 136  # Keccak-256 rate in bytes
+RATE_LANES = RATE // 8
+DIGEST_LANES = 4
+
+_RC = [np.uint64(x) for x in RoundConstants]
+_ONE = np.uint64(1)
+_SIXTY_THREE = np.uint64(63)
+
+# rho and pi: lane x + 5y is rotated by r and moved to lane y + 5 * ((2x + 3y) % 5)
+_RHO_PI = [
+    (
+        x + 5 * y,
+        y + 5 * ((2 * x + 3 * y) % 5),
+        np.uint64(RotationConstants[y][x]),
+        np.uint64(64 - RotationConstants[y][x]),
+    )
+    for y in range(5)
+    for x in range(5)
+]
+
+
+def keccak_f_many(A):
+    """
+    Keccak-f[1600] permutation of all states, in place
+    :param A: (25, N) uint64 array
+    :return: A
+    """
+    n = A.shape[1]
+    B = np.empty_like(A)
+    C = np.empty((5, n), dtype=np.uint64)
+    D = np.empty((5, n), dtype=np.uint64)
+    T = np.empty(n, dtype=np.uint64)
+    A3 = A.reshape(5, 5, n)  # [y][x]
+    B3 = B.reshape(5, 5, n)
+
+    for rc in _RC:
+        # theta
+        np.bitwise_xor(A3[0], A3[1], out=C)
+        C ^= A3[2]
+        C ^= A3[3]
+        C ^= A3[4]
+        for x in range(5):
+            c1 = C[(x + 1) % 5]
+            np.left_shift(c1, _ONE, out=D[x])
+            np.right_shift(c1, _SIXTY_THREE, out=T)
+            D[x] |= T
+            D[x] ^= C[(x - 1) % 5]
+        A3 ^= D
+
+        # rho and pi
+        for src, dst, left, right in _RHO_PI:
+            if not left:
+                B[dst] = A[src]
+                continue
+            np.left_shift(A[src], left, out=B[dst])
+            np.right_shift(A[src], right, out=T)
+            B[dst] |= T
+
+        # chi, C is reused for the column x of all rows
+        for x in range(5):
+            np.invert(B3[:, (x + 1) % 5], out=C)
+            C &= B3[:, (x + 2) % 5]
+            np.bitwise_xor(B3[:, x], C, out=A3[:, x])
+
+        # iota
+        A[0] ^= rc
+    return A
+
+
+def _pad(msg):
+    msg = bytes(msg)
+    return msg + bytes(multirate_padding(len(msg) % RATE, RATE))
+
+
+def keccak_256_many(msgs):
+    """
+    Keccak-256 digests of all messages.
+    Messages with the same number of blocks are absorbed together.
+    :param msgs: list of bytes-like
+    :return: list of 32 B digests
+    """
+    res = [None] * len(msgs)
+    groups = {}
+    for idx, msg in enumerate(msgs):
+        padded = _pad(msg)
+        groups.setdefault(len(padded) // RATE, []).append((idx, padded))
+
+    for blocks, items in groups.items():
+        n = len(items)
+        data = np.frombuffer(b"".join(x[1] for x in items), dtype="<u8")
+        data = data.reshape(n, blocks, RATE_LANES).astype(np.uint64)
+        A = np.zeros((25, n), dtype=np.uint64)
+        for blk in range(blocks):
+            A[:RATE_LANES] ^= data[:, blk].T
+            keccak_f_many(A)
+
+        digests = np.ascontiguousarray(A[:DIGEST_LANES].T).astype("<u8").tobytes()
+        for i, (idx, _) in enumerate(items):
+            res[idx] = digests[i * 32 : (i + 1) * 32]
+    return res
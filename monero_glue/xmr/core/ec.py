@@ -9,6 +9,11 @@ from . import ec_picker
 logger = logging.getLogger(__name__)
 backend = ec_picker.get_ec_backend()
 
+if backend == ec_picker.EC_BACKEND_AUTO:
+    from monero_glue.xmr.core import ec_auto
+
+    backend = ec_auto.select_backend()
+    logger.debug("EC backend selected: %s" % backend)
 
 if backend == ec_picker.EC_BACKEND_PY:
     from monero_glue.xmr.core.ec_py import *
@@ -24,5 +29,16 @@ elif backend == ec_picker.EC_BACKEND_TREZOR:
 
         from monero_glue.xmr.core.ec_py import *
 
+elif backend == ec_picker.EC_BACKEND_SODIUM:
+    try:
+        from monero_glue.xmr.core.ec_sodium import *
+
+    except Exception as e:
+        logger.warning("Libsodium backend not usable: %s" % e)
+        if ec_picker.get_ec_backend_force():
+            raise
+
+        from monero_glue.xmr.core.ec_py import *
+
 else:
     raise ValueError("Unknown EC backend: %s" % backend)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+#
+# EC backend auto-selection. All importable backends are benchmarked on a fixed
+# workload and checked against ec_py, the fastest correct one wins.
+# The decision is cached in a JSON file keyed by python / library versions.
+#
+
+import ctypes as ct
+import hashlib
+import importlib
+import json
+import logging
+import os
+import platform
+import time
+
+from . import ec_picker
+
+logger = logging.getLogger(__name__)
+
+BACKEND_MODULES = {
+    ec_picker.EC_BACKEND_PY: "monero_glue.xmr.core.ec_py",
+    ec_picker.EC_BACKEND_TREZOR: "monero_glue.xmr.core.ec_trezor",
+    ec_picker.EC_BACKEND_SODIUM: "monero_glue.xmr.core.ec_sodium",
+}
+
+WORKLOAD_REPS = 10
+CACHE_ENV = "EC_BACKEND_CACHE"
+CACHE_PATH = os.path.join("~", ".cache", "monero_agent", "ec_backend.json")
+
+_selection = None
+
+
+def _load_backends():
+    """
+    Imports all usable backends
+    :return: dict backend id -> module
+    """
+    res = {}
+    for bid, name in sorted(BACKEND_MODULES.items()):
+        try:
+            res[bid] = importlib.import_module(name)
+        except ImportError as e:
+            logger.debug("EC backend %s not available: %s" % (bid, e))
+        except Exception as e:
+            logger.info("EC backend %s not usable: %s" % (bid, e))
+    return res
+
+
+def _file_digest(path):
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()[:16]
+
+
+def backend_version(bid, mod):
+    """
+    Version string of the backend implementation and its native library
+    """
+    parts = [_file_digest(mod.__file__)]
+    if bid == ec_picker.EC_BACKEND_SODIUM:
+        mod.lib.sodium_version_string.restype = ct.c_char_p
+        parts.append(mod.lib.sodium_version_string().decode("ascii"))
+    elif bid == ec_picker.EC_BACKEND_TREZOR:
+        try:
+            import pkg_resources
+
+            dist = pkg_resources.get_distribution("py_trezor_crypto_ph4")
+            parts.append(dist.version)
+        except Exception:
+            pass
+    return "/".join(parts)
+
+
+def cache_key(backends):
+    """
+    Cache key, changes with python, platform or any backend version
+    :param backends: dict backend id -> module
+    :return:
+    """
+    versions = sorted(
+        "%s:%s" % (bid, backend_version(bid, mod)) for bid, mod in backends.items()
+    )
+    env = [
+        platform.python_implementation(),
+        platform.python_version(),
+        platform.machine(),
+    ]
+    return "|".join(env + versions)
+
+
+def _workload_inputs(mod):
+    def scalar(idx):
+        return mod.decodeint(hashlib.sha512(b"ec_auto%d" % idx).digest()[:32])
+
+    a, b = scalar(0), scalar(1)
+    return a, b, mod.scalarmult_base(b), hashlib.sha256(b"ec_auto").digest()
+
+
+def _workload(mod, inputs):
+    """
+    Fixed workload, returns encoded results for the cross-backend check
+    """
+    a, b, P, buf = inputs
+    return [
+        mod.encodepoint(mod.scalarmult_base(a)),
+        mod.encodepoint(mod.scalarmult(P, a)),
+        mod.encodepoint(mod.hash_to_point(buf)),
+        mod.encodeint(mod.sc_mul(a, b)),
+    ]
+
+
+def benchmark_backend(mod, reps=WORKLOAD_REPS):
+    """
+    Measures the fixed workload on the backend module
+    :param mod: backend module
+    :param reps:
+    :return: dict operation -> seconds per call (minimum over reps)
+    """
+    a, b, P, buf = _workload_inputs(mod)
+    ops = [
+        ("scalarmult_base", lambda: mod.scalarmult_base(a)),
+        ("scalarmult", lambda: mod.scalarmult(P, a)),
+        ("hash_to_point", lambda: mod.hash_to_point(buf)),
+        ("sc_mul", lambda: mod.sc_mul(a, b)),
+    ]
+
+    res = {}
+    for name, fnc in ops:
+        best = None
+        for _ in range(reps):
+            t0 = time.perf_counter()
+            fnc()
+            el = time.perf_counter() - t0
+            best = el if best is None else min(best, el)
+        res[name] = best
+    return res
+
+
+def calibrate(backends=None, reps=WORKLOAD_REPS):
+    """
+    Benchmarks and checks all usable backends
+    :param backends: dict backend id -> module, all importable by default
+    :param reps:
+    :return: selection dict: backend, timings, rejected, key
+    """
+    backends = backends if backends is not None else _load_backends()
+    ref_mod = backends.get(ec_picker.EC_BACKEND_PY)
+    if ref_mod is None:
+        ref_mod = importlib.import_module(BACKEND_MODULES[ec_picker.EC_BACKEND_PY])
+    ref = _workload(ref_mod, _workload_inputs(ref_mod))
+
+    timings = {}
+    rejected = {}
+    for bid, mod in sorted(backends.items()):
+        try:
+            if _workload(mod, _workload_inputs(mod)) != ref:
+                raise ValueError("results differ from the python backend")
+            timings[bid] = benchmark_backend(mod, reps)
+        except Exception as e:
+            logger.warning("EC backend %s rejected: %s" % (bid, e))
+            rejected[bid] = str(e)
+
+    if not timings:
+        raise ValueError("No usable EC backend")
+
+    best = min(timings, key=lambda x: sum(timings[x].values()))
+    return {
+        "backend": best,
+        "timings": timings,
+        "rejected": rejected,
+        "key": cache_key(backends),
+    }
+
+
+def get_cache_path():
+    return os.path.expanduser(os.getenv(CACHE_ENV, CACHE_PATH))
+
+
+def load_cache(path=None):
+    try:
+        with open(path or get_cache_path()) as fh:
+            return json.load(fh)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def save_cache(selection, path=None):
+    path = path or get_cache_path()
+    data = load_cache(path)
+    data[selection["key"]] = selection
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = "%s.%s.tmp" % (path, os.getpid())
+        with open(tmp, "w") as fh:
+            json.dump(data, fh, indent=2)
+        os.replace(tmp, path)
+    except (IOError, OSError) as e:
+        logger.warning("Could not store EC backend selection: %s" % e)
+
+
+def _from_json(sel):
+    """
+    JSON object keys are strings, converts backend ids back to ints
+    """
+    sel = dict(sel)
+    sel["timings"] = {int(k): v for k, v in sel["timings"].items()}
+    sel["rejected"] = {int(k): v for k, v in sel["rejected"].items()}
+    return sel
+
+
+def select_backend(recalibrate=False, path=None):
+    """
+    Returns the fastest correct backend id, calibrates on the first run
+    or when the key (versions) changes.
+
+    :param recalibrate: ignore the cached decision
+    :param path: cache file path
+    :return: backend id
+    """
+    global _selection
+    if _selection is not None and not recalibrate:
+        return _selection["backend"]
+
+    backends = _load_backends()
+    key = cache_key(backends)
+    cached = None if recalibrate else load_cache(path).get(key)
+
+    if cached is not None and cached.get("backend") in backends:
+        sel = _from_json(cached)
+        sel["cached"] = True
+    else:
+        sel = calibrate(backends)
+        save_cache(sel, path)
+        sel["cached"] = False
+
+    if not backends[sel["backend"]].get_backend().is_fast():
+        logger.warning("No fast EC backend usable, using %s" % sel["backend"])
+    _selection = sel
+    return sel["backend"]
+
+
+def get_selection():
+    """
+    Backend auto-selection result, None if the auto mode was not used.
+    Dict with keys: backend, timings (backend id -> op -> seconds),
+    rejected (backend id -> reason), key, cached
+    """
+    return _selection
@@ -188,6 +188,20 @@ def decode_modm(limbs):
     return n
 
 
+def point_enc_to_xy(b, offset=0):
+    """
+    Decompresses encoded point to affine coordinates,
+    returns 64 B: x || y, little endian.
+    Backend independent, used for precomputed point tables.
+
+    :param b:
+    :param offset:
+    :return:
+    """
+    P = ed25519_2.decodepoint(bytes(b[offset : offset + 32]))
+    return int(P[0]).to_bytes(32, "little") + int(P[1]).to_bytes(32, "little")
+
+
 #
 # Backend config
 #
@@ -201,6 +215,12 @@ class ECBackendBase(object):
     def __init__(self, *args, **kwargs):
         pass
 
+    def backend_id(self):
+        """
+        Backend identifier, ec_picker.EC_BACKEND_*
+        """
+        return None
+
     def has_rangeproof_borromean(self):
         return False
 
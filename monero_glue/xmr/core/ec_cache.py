@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+#
+# Bounded memoization of the expensive EC maps (hash_to_point).
+# Ring members and our own outputs repeat across transactions.
+#
+
+import collections
+import os
+import threading
+
+CACHE_SIZE_ENV = "EC_CACHE_SIZE"
+DEFAULT_CACHE_SIZE = 4096
+
+
+def get_default_size():
+    """
+    Cache size from the EC_CACHE_SIZE env var, 0 disables caching
+    """
+    return int(os.getenv(CACHE_SIZE_ENV, DEFAULT_CACHE_SIZE))
+
+
+class LruCache(object):
+    """
+    Thread-safe LRU cache with hit / miss statistics.
+    Values are shared between callers, must not be modified in place.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = get_default_size() if maxsize is None else maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """
+        Returns cached value or None, counts hits and misses
+        """
+        with self._lock:
+            val = self._data.get(key)
+            if val is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return val
+
+    def put(self, key, val):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = val
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, fnc, *args):
+        """
+        Cached value, computes fnc(*args) on a miss.
+        Computation runs outside the lock, concurrent misses may compute twice.
+        """
+        if self.maxsize <= 0:
+            return fnc(*args)
+        val = self.get(key)
+        if val is None:
+            val = fnc(*args)
+            self.put(key, val)
+        return val
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > max(0, maxsize):
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        :return: dict with hits, misses, size, maxsize
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
@@ -6,6 +6,8 @@ import os
 
 EC_BACKEND_PY = 0
 EC_BACKEND_TREZOR = 1
+EC_BACKEND_SODIUM = 2
+EC_BACKEND_AUTO = -1
 EC_BACKEND = EC_BACKEND_TREZOR
 EC_BACKEND_FORCE = 0
 
@@ -15,7 +17,7 @@ def get_ec_backend():
 
     env_back = os.getenv("EC_BACKEND")
     if env_back is not None:
-        return int(env_back)
+        return EC_BACKEND_AUTO if env_back == "auto" else int(env_back)
 
     return EC_BACKEND
 
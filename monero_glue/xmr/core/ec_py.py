@@ -6,6 +6,7 @@ import hashlib
 import hmac
 import struct
 
+from Crypto.Hash import keccak as _keccak
 from Crypto.Protocol.KDF import PBKDF2
 from Crypto.Random import get_random_bytes
 from Crypto.Random import random as rand
@@ -13,6 +14,7 @@ from Crypto.Random import random as rand
 from monero_glue.xmr.core.backend import ed25519ietf
 from monero_glue.xmr.core.backend.ed25519 import expmod
 from monero_glue.xmr.core.backend.ed25519_2 import inv
+from monero_glue.xmr.core import ec_picker
 from monero_glue.xmr.core.ec_base import *
 from monero_serialize import xmrserialize
 
@@ -29,8 +31,38 @@ def memcpy(dst, dst_off, src, src_off, len):
 
 _decodeint = ed25519.decodeint
 _encodeint = ed25519.encodeint
-_encodepoint = ed25519_2.encodepoint
-_decodepoint = ed25519_2.decodepoint
+
+
+def _encode_xy(x, y):
+    return (y | ((x & 1) << 255)).to_bytes(32, "little")
+
+
+def _encodepoint(P):
+    zi = pow(P[2], q - 2, q)
+    return _encode_xy(P[0] * zi % q, P[1] * zi % q)
+
+
+def _decodepoint(s):
+    """
+    Point decompression, x = u v^3 (u v^7)^((q-5)/8), u = y^2 - 1, v = dy^2 + 1
+    Single exponentiation, the square root check validates the point.
+    """
+    y = int.from_bytes(bytes(s[:32]), "little")
+    sign = y >> 255
+    y = (y & ((1 << 255) - 1)) % q
+    yy = y * y % q
+    u = (yy - 1) % q
+    v = (ed25519_2.d * yy + 1) % q
+    v3 = v * v * v % q
+    x = u * v3 * pow(u * v3 * v3 * v % q, (q - 5) // 8, q) % q
+    vxx = v * x * x % q
+    if vxx != u:
+        if vxx != q - u:
+            raise ValueError("decoding point that is not on curve")
+        x = x * ed25519_2.I % q
+    if (x & 1) != sign:
+        x = q - x
+    return x, y, 1, x * y % q
 
 
 class EdScalar(object):
@@ -188,12 +220,11 @@ def get_keccak():
 
 def keccak_hash(inp):
     """
-    Hashesh input in one call
+    Hashesh input in one call, pycryptodome Keccak (original padding)
+    is used, the pure python one is too slow for the one-shot hashing.
     :return:
     """
-    ctx = get_keccak()
-    ctx.update(inp)
-    return ctx.digest()
+    return _keccak.new(data=inp, digest_bits=256).digest()
 
 
 def keccak_hash_into(r, inp):
@@ -369,6 +400,50 @@ def decodepoint_into(r, b, offset=0):
     return r.init(_offset(b, offset))
 
 
+def decodepoint_batch(bs):
+    """
+    Decodes list of encoded points
+    """
+    return [EdPoint(_decodepoint(x)) for x in bs]
+
+
+def encodepoint_batch(points):
+    """
+    Encodes list of points, all Z coordinates are inverted at once
+    (Montgomery's trick), i.e., one field inversion for the whole list.
+    """
+    return _encode_ext_batch([P.v for P in points])
+
+
+def _encode_ext_batch(vs):
+    prefix = []
+    acc = 1
+    for P in vs:
+        prefix.append(acc)
+        acc = acc * P[2] % q
+    if acc == 0:
+        raise ValueError("Invalid point")
+
+    acc = pow(acc, q - 2, q)
+    res = [None] * len(vs)
+    for i in range(len(vs) - 1, -1, -1):
+        x, y, z = vs[i][:3]
+        zi = acc * prefix[i] % q
+        acc = acc * z % q
+        res[i] = _encode_xy(x * zi % q, y * zi % q)
+    return res
+
+
+def decodepoint_xy(b, offset=0):
+    """
+    Point from affine coordinates x || y, see point_enc_to_xy()
+    Skips the point decompression.
+    """
+    x = int.from_bytes(b[offset : offset + 32], "little")
+    y = int.from_bytes(b[offset + 32 : offset + 64], "little")
+    return EdPoint(conv_xy_to_ext((x, y)))
+
+
 #
 # Zmod(2^255 - 19) operations, fe (field element)
 # Not constant time! PoC only.
@@ -541,6 +616,45 @@ def sc_inv_into(r, x):
     return r.init(x).modinv()
 
 
+def sc_inv_batch(xs):
+    """
+    Inverts all scalars in xs using a single modular inversion (Montgomery's trick)
+    :param xs: list of scalars
+    :return: list of inverted scalars
+    """
+    return sc_inv_batch_into([new_scalar() for _ in range(len(xs))], xs)
+
+
+def sc_inv_batch_into(rs, xs):
+    """
+    Batch modular inversion mod curve order L, rs[i] = xs[i]^{-1}.
+    rs may alias xs.
+
+    :param rs: list of result scalars, len(rs) >= len(xs)
+    :param xs: list of scalars to invert, all non-zero
+    :return: rs
+    """
+    n = len(xs)
+    if n == 0:
+        return rs
+
+    acc = 1
+    prefix = [0] * n
+    for i in range(n):
+        v = xs[i].v
+        if v == 0:
+            raise ValueError("Cannot invert zero scalar")
+        prefix[i] = acc
+        acc = acc * v % l
+
+    acc = pow(acc, l - 2, l)
+    for i in range(n - 1, -1, -1):
+        v = xs[i].v
+        rs[i].init(acc * prefix[i])
+        acc = acc * v % l
+    return rs
+
+
 def random_scalar():
     return EdScalar(rand.getrandbits(64 * 8) % l)
 
@@ -581,12 +695,101 @@ def mul_inverse_egcd(x, n, s=1, t=0, N=0):
 #
 
 
+#
+# Fixed-base tables: T[i][j] = j * 2^{w*i} * P in the precomputed form
+# (y - x, y + x, 2dxy), for the basepoint B and the commitment generator H.
+# Multiplication by a fixed base then needs one mixed addition per nonzero
+# w-bit digit of the scalar, no doublings.
+#
+
+BASE_TABLE_WINDOW = 4
+_fixed_tables = {}
+
+
+def _ext_to_precomp(P):
+    return tuple(c % q for c in conv_xy_to_precomp(conv_ext_to_xy(P)))
+
+
+def _build_fixed_table(P, w):
+    table = []
+    for _ in range((253 + w - 1) // w):
+        row = [None, _ext_to_precomp(P)]
+        acc = P
+        for _ in range(2, 1 << w):
+            acc = ed25519_2.edwards_add(acc, P)
+            row.append(_ext_to_precomp(acc))
+        table.append(row)
+        P = ed25519_2.edwards_add(acc, P)
+    return table
+
+
+def _fixed_table(name, P):
+    """
+    Returns the fixed-base table of P, built on the first use
+    """
+    table = _fixed_tables.get(name)
+    if table is None:
+        table = _build_fixed_table(P, BASE_TABLE_WINDOW)
+        _fixed_tables[name] = table
+    return table
+
+
+def set_base_table_window(w):
+    """
+    Sets the fixed-base table window width, tables are rebuilt on next use.
+    Each table has ceil(253 / w) * (2^w - 1) points.
+    """
+    global BASE_TABLE_WINDOW
+    if w < 1 or w > 16:
+        raise ValueError("Unsupported window width")
+    BASE_TABLE_WINDOW = w
+    _fixed_tables.clear()
+
+
+def _madd_precomp(P, Q):
+    """
+    Mixed addition, extended P + precomputed affine Q
+    """
+    x1, y1, z1, t1 = P
+    ym, yp, t2d = Q
+    a = (y1 - x1) * ym % q
+    b = (y1 + x1) * yp % q
+    c = t1 * t2d % q
+    dd = 2 * z1 % q
+    e = b - a
+    f = dd - c
+    g = dd + c
+    h = b + a
+    return e * f % q, g * h % q, f * g % q, e * h % q
+
+
+def _scalarmult_fixed(table, e, P=ed25519_2.ident):
+    """
+    P + e * T, T is the base of the fixed table
+    """
+    w = BASE_TABLE_WINDOW
+    mask = (1 << w) - 1
+    e = e % l
+    for row in table:
+        if not e:
+            break
+        j = e & mask
+        if j:
+            P = _madd_precomp(P, row[j])
+        e >>= w
+    return P
+
+
+def _scalarmult_base_table(e):
+    return _scalarmult_fixed(_fixed_table("B", ed25519_2.B), e)
+
+
 def scalarmult_base(a):
-    return EdPoint(ed25519_2.scalarmult_B(a.v))
+    return EdPoint(_scalarmult_base_table(a.v))
 
 
 def scalarmult_base_into(r, a):
-    return r.init(ed25519_2.scalarmult_B(a.v))
+    return r.init(_scalarmult_base_table(a.v))
 
 
 def scalarmult(P, e):
@@ -625,6 +828,10 @@ def point_norm(P):
     return P
 
 
+def point_copy(P):
+    return EdPoint(P)
+
+
 def point_mul8(P):
     return P * EIGHT
 
@@ -649,17 +856,135 @@ def sc_inv_eight():
     return INV_EIGHT_SC
 
 
+#
+# Interleaved (Straus / Shamir) wNAF double scalar multiplication.
+# Variable points use odd multiple tables P, 3P, ..., 15P in the cached form
+# (y + x, y - x, 2z, 2dt), see ge_dsm_precomp(). The basepoint uses a static
+# window 8 odd multiple table in the affine precomputed form.
+#
+
+DSM_WINDOW = 5
+DSM_BASE_WINDOW = 8
+
+
+class EdDsmPrecomp(object):
+    """
+    Odd multiples table of the point for the wNAF multiplication, ge_dsmp
+    """
+
+    __slots__ = ("point", "pos", "neg")
+
+    def __init__(self, point):
+        P = point.v
+        P2 = ed25519_2.edwards_double(P)
+        self.point = point
+        self.pos = []
+        self.neg = []
+        for _ in range(1 << (DSM_WINDOW - 2)):
+            x, y, z, t = P
+            t2d = 2 * ed25519.d * t % q
+            self.pos.append(((y - x) % q, (y + x) % q, 2 * z % q, t2d))
+            self.neg.append(((y + x) % q, (y - x) % q, 2 * z % q, -t2d % q))
+            P = ed25519_2.edwards_add(P, P2)
+
+
+def _dsm_base_table():
+    table = _fixed_tables.get("B_odd")
+    if table is None:
+        pos = []
+        P = ed25519_2.B
+        P2 = ed25519_2.edwards_double(P)
+        for _ in range(1 << (DSM_BASE_WINDOW - 2)):
+            pos.append(_ext_to_precomp(P))
+            P = ed25519_2.edwards_add(P, P2)
+        neg = [(yp, ym, -t2d % q) for ym, yp, t2d in pos]
+        table = _fixed_tables["B_odd"] = (pos, neg)
+    return table
+
+
+def _dsm(P):
+    return P if isinstance(P, EdDsmPrecomp) else EdDsmPrecomp(P)
+
+
+def _wnaf(e, w):
+    """
+    Width-w non-adjacent form of e, least significant digit first
+    """
+    naf = []
+    full = 1 << w
+    half = 1 << (w - 1)
+    while e:
+        if e & 1:
+            d = e & (full - 1)
+            if d >= half:
+                d -= full
+            e -= d
+        else:
+            d = 0
+        naf.append(d)
+        e >>= 1
+    return naf
+
+
+def _add_cached(P, Q):
+    """
+    Extended P + cached Q
+    """
+    x1, y1, z1, t1 = P
+    ym, yp, z2, t2d = Q
+    a = (y1 - x1) * ym % q
+    b = (y1 + x1) * yp % q
+    c = t1 * t2d % q
+    dd = z1 * z2 % q
+    e = b - a
+    f = dd - c
+    g = dd + c
+    h = b + a
+    return e * f % q, g * h % q, f * g % q, e * h % q
+
+
+def _dsm_mul(terms, base_scalar=None):
+    r"""
+    \sum_i s_i * P_i (+ base_scalar * B), terms are (scalar int, EdDsmPrecomp)
+    """
+    digits = [
+        (_wnaf(e % l, DSM_WINDOW), tbl.pos, tbl.neg, _add_cached) for e, tbl in terms
+    ]
+    if base_scalar is not None:
+        pos, neg = _dsm_base_table()
+        digits.append(
+            (_wnaf(base_scalar % l, DSM_BASE_WINDOW), pos, neg, _madd_precomp)
+        )
+
+    P = ed25519_2.ident
+    started = False
+    for i in range(max(len(x[0]) for x in digits) - 1, -1, -1):
+        if started:
+            P = ed25519_2.edwards_double(P)
+        for naf, pos, neg, add in digits:
+            if i >= len(naf):
+                continue
+            d = naf[i]
+            if d > 0:
+                P = add(P, pos[d >> 1])
+                started = True
+            elif d < 0:
+                P = add(P, neg[(-d) >> 1])
+                started = True
+    return P
+
+
 def ge_double_scalarmult_base_vartime(a, A, b):
     """
     void ge_double_scalarmult_base_vartime(ge_p2 *r, const unsigned char *a, const ge_p3 *A, const unsigned char *b)
     r = a * A + b * B
 
     :param a:
-    :param A:
+    :param A: point or ge_dsm_precomp() table
     :param b:
     :return:
     """
-    return point_add(scalarmult(A, a), scalarmult_base(b))
+    return EdPoint(_dsm_mul([(a.v, _dsm(A))], b.v))
 
 
 def ge_double_scalarmult_base_vartime2(a, A, b, B):
@@ -673,7 +998,7 @@ def ge_double_scalarmult_base_vartime2(a, A, b, B):
     :param B:
     :return:
     """
-    return point_add(scalarmult(A, a), scalarmult(B, b))
+    return EdPoint(_dsm_mul([(a.v, _dsm(A)), (b.v, _dsm(B))]))
 
 
 def ge_double_scalarmult_precomp_vartime(a, A, b, Bi):
@@ -688,12 +1013,12 @@ def ge_double_scalarmult_precomp_vartime2(a, Ai, b, Bi):
     """
     void ge_double_scalarmult_precomp_vartime2(ge_p2 *r, const unsigned char *a, const ge_dsmp Ai, const unsigned char *b, const ge_dsmp Bi)
     :param a:
-    :param Ai:
+    :param Ai: point or ge_dsm_precomp() table
     :param b:
-    :param Bi:
+    :param Bi: point or ge_dsm_precomp() table
     :return:
     """
-    return point_add(scalarmult(Ai, a), scalarmult(Bi, b))
+    return EdPoint(_dsm_mul([(a.v, _dsm(Ai)), (b.v, _dsm(Bi))]))
 
 
 def identity(byte_enc=False):
@@ -771,10 +1096,11 @@ def precomp(point):
 def ge_dsm_precomp(point):
     """
     void ge_dsm_precomp(ge_dsmp r, const ge_p3 *s)
+    Odd multiples table reusable in the ge_double_scalarmult_* functions.
     :param point:
     :return:
     """
-    return point
+    return _dsm(point)
 
 
 #
@@ -788,9 +1114,7 @@ def cn_fast_hash(buff):
     :param buff:
     :return:
     """
-    kc2 = keccak2.Keccak256()
-    kc2.update(buff)
-    return kc2.digest()
+    return keccak_hash(buff)
 
 
 def hash_to_scalar(data, length=None):
@@ -826,7 +1150,7 @@ def hash_to_point(buf):
 
     # like sqrt (w / x) although may have to check signs..
     # so, note that if a squareroot exists, then clearly a square exists..
-    rx = ed25519.expmod(w * ed25519.inv(xp), (q + 3) // 8, q)
+    rx = pow(w * pow(xp, q - 2, q), (q + 3) // 8, q)
     # rx is ok.
 
     x = rx * rx * (w * w - 2 * A * A * u * u) % q
@@ -868,14 +1192,13 @@ def hash_to_point(buf):
     rz = (z + w) % q
     ry = (z - w) % q
     rx = rx * rz % q
-    rt = 1
-
-    # extended representation
-    rt = ((rx * ry % q) * inv(rz)) % q
 
-    P = EdPoint((rx, ry, rz, rt))
-    P8 = scalarmult(P, EdScalar(8))
-    return P8
+    # extended representation (X : Y : Z : T), x = X / Z, y = Y / Z, T = XY / Z
+    # scaled by Z to avoid the inversion
+    P8 = (rx * rz % q, ry * rz % q, rz * rz % q, rx * ry % q)
+    for _ in range(3):
+        P8 = ed25519_2.edwards_double(P8)
+    return EdPoint(P8)
 
 
 def hash_to_point_into(r, buf):
@@ -905,8 +1228,16 @@ def xmr_H():
     return EdPoint(XMR_H_PT)
 
 
+def _scalarmult_h_table(e, P=ed25519_2.ident):
+    return _scalarmult_fixed(_fixed_table("H", XMR_H_PT.v), e, P)
+
+
 def scalarmult_h(i):
-    return XMR_H_PT * EdScalar.ensure_scalar(i)
+    return EdPoint(_scalarmult_h_table(EdScalar.ensure_scalar(i).v))
+
+
+def scalarmult_h_into(r, i):
+    return r.init(_scalarmult_h_table(EdScalar.ensure_scalar(i).v))
 
 
 def add_keys2(a, b, B):
@@ -917,7 +1248,7 @@ def add_keys2(a, b, B):
     :param B:
     :return:
     """
-    return point_add(scalarmult_base(a), scalarmult(B, b))
+    return ge_double_scalarmult_base_vartime(b, B, a)
 
 
 def add_keys2_into(r, a, b, B):
@@ -933,7 +1264,7 @@ def add_keys3(a, A, b, B):
     :param B:
     :return:
     """
-    return point_add(scalarmult(A, a), scalarmult(B, b))
+    return ge_double_scalarmult_base_vartime2(a, A, b, B)
 
 
 def add_keys3_into(r, a, A, b, B):
@@ -949,8 +1280,8 @@ def gen_c(a, amount):
     :param amount:
     :return:
     """
-    aG = scalarmult_base(a)
-    return point_add(aG, scalarmult_h(amount))
+    aG = _scalarmult_base_table(a.v)
+    return EdPoint(_scalarmult_h_table(EdScalar.ensure_scalar(amount).v, aG))
 
 
 def generate_key_derivation(key1, key2):
@@ -1040,6 +1371,100 @@ def get_subaddress_secret_key(secret_key, major=0, minor=0):
     return hash_to_scalar(buffer)
 
 
+#
+# Vector operations over contiguous buffers of packed 32 B elements.
+# dst may alias the inputs.
+#
+
+
+def _vint(a, i):
+    return int.from_bytes(a[i : i + 32], "little")
+
+
+def _vect_write_points(dst, vs):
+    for i, enc in enumerate(_encode_ext_batch(vs)):
+        dst[32 * i : 32 * (i + 1)] = enc
+    return dst
+
+
+def sc_add_vect(dst, a, b):
+    """
+    dst[i] = a[i] + b[i]
+    """
+    for i in range(0, len(a), 32):
+        dst[i : i + 32] = ((_vint(a, i) + _vint(b, i)) % l).to_bytes(32, "little")
+    return dst
+
+
+def sc_sub_vect(dst, a, b):
+    """
+    dst[i] = a[i] - b[i]
+    """
+    for i in range(0, len(a), 32):
+        dst[i : i + 32] = ((_vint(a, i) - _vint(b, i)) % l).to_bytes(32, "little")
+    return dst
+
+
+def sc_mul_vect(dst, a, b):
+    """
+    dst[i] = a[i] * b[i], Hadamard product
+    """
+    for i in range(0, len(a), 32):
+        dst[i : i + 32] = ((_vint(a, i) * _vint(b, i)) % l).to_bytes(32, "little")
+    return dst
+
+
+def sc_scale_vect(dst, a, x):
+    """
+    dst[i] = a[i] * x, x is a scalar
+    """
+    x = x.v
+    for i in range(0, len(a), 32):
+        dst[i : i + 32] = ((_vint(a, i) * x) % l).to_bytes(32, "little")
+    return dst
+
+
+def sc_inner_product_vect(a, b):
+    r"""
+    \sum_i a[i] * b[i], returns scalar
+    """
+    acc = 0
+    for i in range(0, len(a), 32):
+        acc += _vint(a, i) * _vint(b, i)
+    return EdScalar(acc)
+
+
+def scalarmult_vect(dst, points, e):
+    """
+    dst[i] = e * points[i], e is a scalar
+    """
+    e = e.v
+    vs = []
+    for i in range(0, len(points), 32):
+        P = EdPoint(_decodepoint(points[i : i + 32]))
+        vs.append(_dsm_mul([(e, EdDsmPrecomp(P))]))
+    return _vect_write_points(dst, vs)
+
+
+def add_keys3_vect(dst, a, A, b, B):
+    """
+    dst[i] = a * A[i] + b * B[i], a, b are scalars
+    """
+    vs = []
+    for i in range(0, len(A), 32):
+        Ai = EdDsmPrecomp(EdPoint(_decodepoint(A[i : i + 32])))
+        Bi = EdDsmPrecomp(EdPoint(_decodepoint(B[i : i + 32])))
+        vs.append(_dsm_mul([(a.v, Ai), (b.v, Bi)]))
+    return _vect_write_points(dst, vs)
+
+
+def hash_to_point_vect(src):
+    """
+    H_p(src[i]) for all packed 32 B keys in src, returns list of points
+    """
+    return [hash_to_point(bytes(src[i : i + 32])) for i in range(0, len(src), 32)]
+
+
 #
 # Backend config
 #
@@ -1049,6 +1474,9 @@ class PyECBackend(ECBackendBase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+    def backend_id(self):
+        return ec_picker.EC_BACKEND_PY
+
     def has_crypto_into_functions(self):
         return True
 
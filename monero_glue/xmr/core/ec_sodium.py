@@ -0,0 +1,835 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+#
+# EC backend on top of libsodium (ctypes), crypto_core_ed25519_* and
+# crypto_scalarmult_ed25519_*_noclamp, libsodium >= 1.0.18.
+#
+# Points and scalars are kept encoded, 32 B bytearray. Scalars are reduced mod l.
+# libsodium refuses points outside of the prime order subgroup and the identity
+# as scalar multiplication operands / results, these cases fall back to ec_py,
+# as well as the Monero specific pieces (hash_to_point, hashing).
+#
+
+import ctypes as ct
+import ctypes.util
+import os
+import struct
+
+from monero_glue.xmr.core import ec_picker, ec_py
+from monero_glue.xmr.core.ec_base import *
+from monero_glue.xmr.core.ec_py import (  # noqa: F401
+    compute_hmac,
+    fe_1,
+    fe_add,
+    fe_divpowm1,
+    fe_expmod,
+    fe_isnegative,
+    fe_isnonzero,
+    fe_mod,
+    fe_mul,
+    fe_sq,
+    fe_sub,
+    get_hmac,
+    get_keccak,
+    keccak_2hash,
+    keccak_hash,
+    keccak_hash_into,
+    pbkdf2,
+    random_bytes,
+)
+from monero_serialize import xmrserialize
+
+LIBSODIUM_NAMES = ["libsodium.so.23", "libsodium.so", "libsodium.dylib"]
+LIBSODIUM_FUNCTIONS = [
+    "crypto_core_ed25519_add",
+    "crypto_core_ed25519_sub",
+    "crypto_core_ed25519_scalar_add",
+    "crypto_core_ed25519_scalar_sub",
+    "crypto_core_ed25519_scalar_mul",
+    "crypto_core_ed25519_scalar_invert",
+    "crypto_core_ed25519_scalar_random",
+    "crypto_scalarmult_ed25519_noclamp",
+    "crypto_scalarmult_ed25519_base_noclamp",
+]
+
+_KEY = ct.c_ubyte * 32
+
+
+def open_lib(path=None):
+    """
+    Loads libsodium, path defaults to LIBSODIUM_PATH env var or the system library
+    :param path:
+    :return: ctypes library
+    """
+    path = path or os.getenv("LIBSODIUM_PATH") or ctypes.util.find_library("sodium")
+    names = [path] if path else LIBSODIUM_NAMES
+
+    lib = None
+    for name in names:
+        try:
+            lib = ct.CDLL(name)
+            break
+        except OSError:
+            pass
+
+    if lib is None:
+        raise ValueError("libsodium not found")
+    for fnc in LIBSODIUM_FUNCTIONS:
+        if not hasattr(lib, fnc):
+            raise ValueError("libsodium too old, %s missing" % fnc)
+    if lib.sodium_init() < 0:
+        raise ValueError("libsodium init failed")
+    return lib
+
+
+try:
+    lib = open_lib()
+except ValueError as e:
+    raise ImportError(str(e))
+
+IDENTITY = b"\x01" + b"\x00" * 31
+
+
+def _b(x):
+    """
+    Read-only pointer to the 32 B key
+    """
+    if isinstance(x, bytes):
+        return x
+    return _KEY.from_buffer_copy(x)
+
+
+def _int(x):
+    return int.from_bytes(x, "little")
+
+
+def _sc(x):
+    return bytearray((x % l).to_bytes(32, "little"))
+
+
+def _into(r, x):
+    r[:] = x
+    return r
+
+
+def new_point():
+    return bytearray(IDENTITY)
+
+
+def new_scalar():
+    return bytearray(32)
+
+
+#
+# EC
+#
+
+
+def _offset(x, offset=0):
+    if offset == 0:
+        return x
+    return memoryview(x)[offset:]
+
+
+def _py_point(P):
+    return ec_py.decodepoint(bytes(P))
+
+
+def _from_py_point(P):
+    return bytearray(ec_py.encodepoint(P))
+
+
+def decodepoint(x, offset=0):
+    """
+    Decodes and checks the point, returns its canonical encoding
+    """
+    r = new_point()
+    enc = _b(_offset(x, offset)[:32])
+    if lib.crypto_core_ed25519_add(_KEY.from_buffer(r), enc, IDENTITY):
+        raise ValueError("decoding point that is not on curve")
+    return r
+
+
+def decodepoint_into(r, x, offset=0):
+    return _into(r, decodepoint(x, offset))
+
+
+def decodepoint_xy(x, offset=0):
+    """
+    Point from affine coordinates x || y, see point_enc_to_xy()
+    Point is recompressed and decoded.
+    """
+    x = _offset(x, offset)
+    enc = bytearray(x[32:64])
+    enc[31] |= (x[0] & 1) << 7
+    return decodepoint(enc)
+
+
+def decodepoint_batch(bs):
+    return [decodepoint(x) for x in bs]
+
+
+def encodepoint(pt):
+    return bytes(pt)
+
+
+def encodepoint_batch(points):
+    return [bytes(x) for x in points]
+
+
+def encodepoint_into(b, pt, offset=0):
+    b[offset : offset + 32] = pt
+    return b
+
+
+def decodeint(x, offset=0):
+    return _sc(_int(_offset(x, offset)[:32]))
+
+
+def decodeint_noreduce(x, offset=0):
+    return bytearray(_offset(x, offset)[:32])
+
+
+def decodeint_into(r, x, offset=0):
+    return _into(r, decodeint(x, offset))
+
+
+def decodeint_into_noreduce(r, x, offset=0):
+    return _into(r, _offset(x, offset)[:32])
+
+
+def encodeint(x):
+    return bytes(x)
+
+
+def encodeint_into(b, x, offset=0):
+    b[offset : offset + 32] = x
+    return b
+
+
+#
+# Zmod(order), scalar values field
+#
+
+
+def _sc_op(fnc, a, b):
+    r = new_scalar()
+    fnc(_KEY.from_buffer(r), _b(a), _b(b))
+    return r
+
+
+def sc_0():
+    return new_scalar()
+
+
+def sc_0_into(r):
+    return _into(r, bytes(32))
+
+
+def sc_init(x):
+    if x >= (1 << 64):
+        raise ValueError("Initialization works up to 64-bit only")
+    return _sc(x)
+
+
+def sc_init_into(r, x):
+    return _into(r, sc_init(x))
+
+
+def sc_get64(x):
+    return _int(x)
+
+
+def sc_check(key):
+    """
+    Checks the scalar is non-zero and reduced
+
+    :param key:
+    :return:
+    """
+    v = _int(key)
+    if v % l == 0:
+        return -1
+    return 0 if v < l else -1
+
+
+def check_sc(key):
+    """
+    throws exception on invalid key
+    :param key:
+    :return:
+    """
+    if sc_check(key) != 0:
+        raise ValueError("Invalid scalar value")
+
+
+def sc_reduce32(data):
+    return _sc(_int(data))
+
+
+def sc_add(aa, bb):
+    return _sc_op(lib.crypto_core_ed25519_scalar_add, aa, bb)
+
+
+def sc_add_into(r, aa, bb):
+    return _into(r, sc_add(aa, bb))
+
+
+def sc_sub(aa, bb):
+    return _sc_op(lib.crypto_core_ed25519_scalar_sub, aa, bb)
+
+
+def sc_sub_into(r, aa, bb):
+    return _into(r, sc_sub(aa, bb))
+
+
+def sc_mul(aa, bb):
+    return _sc_op(lib.crypto_core_ed25519_scalar_mul, aa, bb)
+
+
+def sc_mul_into(r, aa, bb):
+    return _into(r, sc_mul(aa, bb))
+
+
+def sc_isnonzero(c):
+    return _int(c) % l != 0
+
+
+def sc_eq(a, b):
+    return _int(a) % l == _int(b) % l
+
+
+def sc_mulsub(aa, bb, cc):
+    """
+    (cc - aa * bb) % l
+    """
+    return sc_sub(cc, sc_mul(aa, bb))
+
+
+def sc_mulsub_into(r, aa, bb, cc):
+    """
+    (cc - aa * bb) % l
+    """
+    return _into(r, sc_mulsub(aa, bb, cc))
+
+
+def sc_muladd(aa, bb, cc):
+    """
+    (cc + aa * bb) % l
+    """
+    return sc_add(cc, sc_mul(aa, bb))
+
+
+def sc_muladd_into(r, aa, bb, cc):
+    """
+    (cc + aa * bb) % l
+    """
+    return _into(r, sc_muladd(aa, bb, cc))
+
+
+def sc_inv(x):
+    r = new_scalar()
+    if lib.crypto_core_ed25519_scalar_invert(_KEY.from_buffer(r), _b(x)):
+        raise ValueError("Cannot invert zero scalar")
+    return r
+
+
+def sc_inv_into(r, x):
+    return _into(r, sc_inv(x))
+
+
+def sc_inv_batch(xs):
+    """
+    Inverts all scalars in xs using a single modular inversion (Montgomery's trick)
+    :param xs: list of scalars
+    :return: list of inverted scalars
+    """
+    return sc_inv_batch_into([new_scalar() for _ in range(len(xs))], xs)
+
+
+def sc_inv_batch_into(rs, xs):
+    """
+    Batch modular inversion mod curve order L, rs[i] = xs[i]^{-1}.
+    rs may alias xs.
+
+    :param rs: list of result scalars, len(rs) >= len(xs)
+    :param xs: list of scalars to invert, all non-zero
+    :return: rs
+    """
+    vs = [ec_py.EdScalar(_int(x)) for x in xs]
+    for r, v in zip(rs, ec_py.sc_inv_batch(vs)):
+        _into(r, _sc(v.v))
+    return rs
+
+
+def random_scalar():
+    r = new_scalar()
+    lib.crypto_core_ed25519_scalar_random(_KEY.from_buffer(r))
+    return r
+
+
+def random_scalar_into(r):
+    return _into(r, random_scalar())
+
+
+#
+# GE - ed25519 group
+#
+
+INV_EIGHT = b"\x79\x2f\xdc\xe2\x29\xe5\x06\x61\xd0\xda\x1c\x7d\xb3\x9d\xd3\x07\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x06"
+INV_EIGHT_SC = decodeint(INV_EIGHT)
+
+
+def check_ed25519point(x):
+    r = new_point()
+    if lib.crypto_core_ed25519_add(_KEY.from_buffer(r), _b(x), IDENTITY):
+        raise ValueError("P is not on ed25519 curve")
+
+
+def scalarmult_base(a):
+    r = new_point()
+    lib.crypto_scalarmult_ed25519_base_noclamp(_KEY.from_buffer(r), _b(a))
+    if a[31] & 0x80:  # not reduced, noclamp ignores the top bit
+        r = _from_py_point(ec_py.scalarmult_base(ec_py.EdScalar(_int(a))))
+    return r
+
+
+def scalarmult_base_into(r, a):
+    return _into(r, scalarmult_base(a))
+
+
+def scalarmult(P, e):
+    """
+    e * P, points outside of the prime order subgroup and zero results
+    are handled by ec_py
+    """
+    r = new_point()
+    if e[31] & 0x80 or lib.crypto_scalarmult_ed25519_noclamp(
+        _KEY.from_buffer(r), _b(e), _b(P)
+    ):
+        r = _from_py_point(ec_py.scalarmult(_py_point(P), ec_py.EdScalar(_int(e))))
+    return r
+
+
+def scalarmult_into(r, P, e):
+    return _into(r, scalarmult(P, e))
+
+
+def point_add(P, Q):
+    r = new_point()
+    if lib.crypto_core_ed25519_add(_KEY.from_buffer(r), _b(P), _b(Q)):
+        raise ValueError("P is not on ed25519 curve")
+    return r
+
+
+def point_add_into(r, P, Q):
+    return _into(r, point_add(P, Q))
+
+
+def point_sub(P, Q):
+    r = new_point()
+    if lib.crypto_core_ed25519_sub(_KEY.from_buffer(r), _b(P), _b(Q)):
+        raise ValueError("P is not on ed25519 curve")
+    return r
+
+
+def point_sub_into(r, P, Q):
+    return _into(r, point_sub(P, Q))
+
+
+def point_eq(P, Q):
+    return bytes(P) == bytes(Q)
+
+
+def point_double(P):
+    return point_add(P, P)
+
+
+def point_double_into(r, P):
+    return _into(r, point_double(P))
+
+
+def point_norm(P):
+    return P
+
+
+def point_copy(P):
+    return bytearray(P)
+
+
+def point_mul8(P):
+    return point_double(point_double(point_double(P)))
+
+
+def point_mulinv8(P):
+    return scalarmult(P, INV_EIGHT_SC)
+
+
+def point_mul8_into(r, P):
+    return _into(r, point_mul8(P))
+
+
+def sc_inv_eight():
+    return INV_EIGHT_SC
+
+
+def ge_double_scalarmult_base_vartime(a, A, b):
+    """
+    void ge_double_scalarmult_base_vartime(ge_p2 *r, const unsigned char *a, const ge_p3 *A, const unsigned char *b)
+    r = a * A + b * B
+    """
+    return point_add(scalarmult(A, a), scalarmult_base(b))
+
+
+def ge_double_scalarmult_base_vartime2(a, A, b, B):
+    """
+    r = a * A + b * B
+    """
+    return point_add(scalarmult(A, a), scalarmult(B, b))
+
+
+def ge_double_scalarmult_precomp_vartime(a, A, b, Bi):
+    """
+    void ge_double_scalarmult_precomp_vartime(ge_p2 *r, const unsigned char *a, const ge_p3 *A, const unsigned char *b, const ge_dsmp Bi)
+    """
+    return ge_double_scalarmult_base_vartime2(a, A, b, Bi)
+
+
+def ge_double_scalarmult_precomp_vartime2(a, Ai, b, Bi):
+    """
+    void ge_double_scalarmult_precomp_vartime2(ge_p2 *r, const unsigned char *a, const ge_dsmp Ai, const unsigned char *b, const ge_dsmp Bi)
+    """
+    return ge_double_scalarmult_base_vartime2(a, Ai, b, Bi)
+
+
+def identity(byte_enc=False):
+    """
+    Identity point
+    :return:
+    """
+    return IDENTITY if byte_enc else new_point()
+
+
+def identity_into(r):
+    return _into(r, IDENTITY)
+
+
+def ge_frombytes_vartime_check(point):
+    """
+    Checks the point is on the curve
+    :param point:
+    :return:
+    """
+    check_ed25519point(point)
+    return 0
+
+
+def ge_frombytes_vartime(point):
+    ge_frombytes_vartime_check(point)
+    return point
+
+
+def precomp(point):
+    """
+    Precomputation placeholder
+    :param point:
+    :return:
+    """
+    return point
+
+
+def ge_dsm_precomp(point):
+    """
+    Precomputation placeholder, libsodium has no reusable multiples table
+    :param point:
+    :return:
+    """
+    return point
+
+
+#
+# Monero specific
+#
+
+
+def cn_fast_hash(buff):
+    """
+    Keccak 256, original one (before changes made in SHA3 standard)
+    :param buff:
+    :return:
+    """
+    return keccak_hash(buff)
+
+
+def hash_to_scalar(data, length=None):
+    """
+    H_s(P)
+    :param data:
+    :param length:
+    :return:
+    """
+    dt = data[:length] if length else data
+    return _sc(_int(cn_fast_hash(bytes(dt))))
+
+
+def hash_to_scalar_into(r, data, length=None):
+    return _into(r, hash_to_scalar(data, length))
+
+
+def hash_to_point(buf):
+    """
+    H_p(buf), ge_fromfe_frombytes_vartime() is computed by ec_py
+    :param buf:
+    :return:
+    """
+    return _from_py_point(ec_py.hash_to_point(bytes(buf)))
+
+
+def hash_to_point_into(r, buf):
+    return _into(r, hash_to_point(buf))
+
+
+#
+# XMR
+#
+
+
+XMR_H = ec_py.XMR_H
+
+
+def xmr_H():
+    """
+    Returns point H
+    8b655970153799af2aeadc9ff1add0ea6c7251d54154cfa92c173a0dd39c1f94
+    :return:
+    """
+    return bytearray(XMR_H)
+
+
+def scalarmult_h(i):
+    return scalarmult(XMR_H, _sc(i) if isinstance(i, int) else i)
+
+
+def scalarmult_h_into(r, i):
+    return _into(r, scalarmult_h(i))
+
+
+def add_keys2(a, b, B):
+    """
+    aG + bB, G is basepoint
+    :param a:
+    :param b:
+    :param B:
+    :return:
+    """
+    return point_add(scalarmult_base(a), scalarmult(B, b))
+
+
+def add_keys2_into(r, a, b, B):
+    return _into(r, add_keys2(a, b, B))
+
+
+def add_keys3(a, A, b, B):
+    """
+    aA + bB
+    :param a:
+    :param A:
+    :param b:
+    :param B:
+    :return:
+    """
+    return ge_double_scalarmult_base_vartime2(a, A, b, B)
+
+
+def add_keys3_into(r, a, A, b, B):
+    return _into(r, add_keys3(a, A, b, B))
+
+
+def gen_c(a, amount):
+    """
+    Generates Pedersen commitment
+    C = aG + bH
+
+    :param a:
+    :param amount:
+    :return:
+    """
+    return point_add(scalarmult_base(a), scalarmult_h(amount))
+
+
+def generate_key_derivation(key1, key2):
+    """
+    Key derivation: 8*(key2*key1)
+
+    :param key1: public key of receiver Bob (see page 7)
+    :param key2: Alice's private
+    :return:
+    """
+    if sc_check(key2) != 0:
+        # checks that the secret key is uniform enough...
+        raise ValueError("error in sc_check in keyder")
+    if ge_frombytes_vartime_check(key1) != 0:
+        raise ValueError("didn't pass curve checks in keyder")
+
+    return point_mul8(scalarmult(key1, key2))
+
+
+def derivation_to_scalar(derivation, output_index):
+    """
+    H_s(derivation || varint(output_index))
+    :param derivation:
+    :param output_index:
+    :return:
+    """
+    check_ed25519point(derivation)
+    buf2 = encodepoint(derivation) + xmrserialize.dump_uvarint_b(output_index)
+    return hash_to_scalar(buf2, len(buf2))
+
+
+def derive_public_key(derivation, output_index, base):
+    """
+    H_s(derivation || varint(output_index))G + base
+
+    :param derivation:
+    :param output_index:
+    :param base:
+    :return:
+    """
+    if ge_frombytes_vartime_check(base) != 0:  # check some conditions on the point
+        raise ValueError("derive pub key bad point")
+    check_ed25519point(base)
+
+    scalar = derivation_to_scalar(derivation, output_index)
+    return point_add(base, scalarmult_base(scalar))
+
+
+def derive_secret_key(derivation, output_index, base):
+    """
+    base + H_s(derivation || varint(output_index))
+    :param derivation:
+    :param output_index:
+    :param base:
+    :return:
+    """
+    if sc_check(base) != 0:
+        raise ValueError("cs_check in derive_secret_key")
+    return sc_add(base, derivation_to_scalar(derivation, output_index))
+
+
+def get_subaddress_secret_key(secret_key, major=0, minor=0):
+    """
+    Builds subaddress secret key from the subaddress index
+    Hs(SubAddr || a || index_major || index_minor)
+
+    :param secret_key:
+    :param major:
+    :param minor:
+    :return:
+    """
+    prefix = b"SubAddr"
+    buffer = bytearray(len(prefix) + 1 + 32 + 4 + 4)
+    struct.pack_into(
+        "<7sb32sLL", buffer, 0, prefix, 0, encodeint(secret_key), major, minor
+    )
+    return hash_to_scalar(buffer)
+
+
+#
+# Vector operations over contiguous buffers of packed 32 B elements.
+# dst may alias the inputs.
+#
+
+
+def _vect_op(dst, a, fnc, *args):
+    for i in range(0, len(a), 32):
+        dst[i : i + 32] = fnc(a[i : i + 32], *[x[i : i + 32] for x in args])
+    return dst
+
+
+def sc_add_vect(dst, a, b):
+    """
+    dst[i] = a[i] + b[i]
+    """
+    return _vect_op(dst, a, sc_add, b)
+
+
+def sc_sub_vect(dst, a, b):
+    """
+    dst[i] = a[i] - b[i]
+    """
+    return _vect_op(dst, a, sc_sub, b)
+
+
+def sc_mul_vect(dst, a, b):
+    """
+    dst[i] = a[i] * b[i], Hadamard product
+    """
+    return _vect_op(dst, a, sc_mul, b)
+
+
+def sc_scale_vect(dst, a, x):
+    """
+    dst[i] = a[i] * x, x is a scalar
+    """
+    return _vect_op(dst, a, lambda y: sc_mul(y, x))
+
+
+def sc_inner_product_vect(a, b):
+    r"""
+    \sum_i a[i] * b[i], returns scalar
+    """
+    acc = 0
+    for i in range(0, len(a), 32):
+        acc += _int(a[i : i + 32]) * _int(b[i : i + 32])
+    return _sc(acc)
+
+
+def scalarmult_vect(dst, points, e):
+    """
+    dst[i] = e * points[i], e is a scalar
+    """
+    return _vect_op(dst, points, lambda P: scalarmult(P, e))
+
+
+def add_keys3_vect(dst, a, A, b, B):
+    """
+    dst[i] = a * A[i] + b * B[i], a, b are scalars
+    """
+    return _vect_op(dst, A, lambda P, Q: add_keys3(a, P, b, Q), B)
+
+
+def hash_to_point_vect(src):
+    """
+    H_p(src[i]) for all packed 32 B keys in src, returns list of points
+    """
+    return [hash_to_point(src[i : i + 32]) for i in range(0, len(src), 32)]
+
+
+#
+# Backend config
+#
+
+
+class SodiumECBackend(ECBackendBase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def backend_id(self):
+        return ec_picker.EC_BACKEND_SODIUM
+
+    def has_crypto_into_functions(self):
+        return True
+
+    def is_fast(self):
+        return True
+
+
+BACKEND_OBJ = None
+
+
+def get_backend():
+    global BACKEND_OBJ
+    if BACKEND_OBJ is None:
+        BACKEND_OBJ = SodiumECBackend()
+    return BACKEND_OBJ
@@ -6,6 +6,7 @@ import ctypes as ct
 import hmac
 
 from Crypto.Protocol.KDF import PBKDF2
+from monero_glue.xmr.core import ec_picker
 from monero_glue.xmr.core.ec_base import *
 from trezor_crypto import trezor_cfunc as tcryr
 
@@ -160,10 +161,29 @@ def decodepoint_into(r, x, offset=0):
     return r
 
 
+def decodepoint_xy(x, offset=0):
+    """
+    Point from affine coordinates x || y, see point_enc_to_xy()
+    Native decompression is fast, point is recompressed and decoded.
+    """
+    x = _offset(x, offset)
+    enc = bytearray(x[32:64])
+    enc[31] |= (x[0] & 1) << 7
+    return decodepoint(enc)
+
+
 def encodepoint(pt):
     return tcry.ge25519_pack_r(pt)
 
 
+def decodepoint_batch(bs):
+    return [decodepoint(x) for x in bs]
+
+
+def encodepoint_batch(points):
+    return [encodepoint(x) for x in points]
+
+
 def encodepoint_into(b, pt, offset=0):
     bf = tcry.KEY_BUFF.from_buffer(_offset(b, offset))
     tcry.ge25519_pack(bf, pt)
@@ -416,6 +436,43 @@ def sc_inv_into(r, x):
     return decodeint_into_noreduce(r, rr)
 
 
+def sc_inv_batch(xs):
+    """
+    Inverts all scalars in xs using a single modular inversion (Montgomery's trick)
+    :param xs: list of scalars
+    :return: list of inverted scalars
+    """
+    return sc_inv_batch_into([new_scalar() for _ in range(len(xs))], xs)
+
+
+def sc_inv_batch_into(rs, xs):
+    """
+    Batch modular inversion mod curve order L, rs[i] = xs[i]^{-1}.
+    rs may alias xs.
+
+    :param rs: list of result scalars, len(rs) >= len(xs)
+    :param xs: list of scalars to invert, all non-zero
+    :return: rs
+    """
+    n = len(xs)
+    if n == 0:
+        return rs
+
+    prefix = [None] * n
+    for i in range(n):
+        if tcry.iszero256_modm(xs[i]):
+            raise ValueError("Cannot invert zero scalar")
+        prefix[i] = xs[i] if i == 0 else tcry.mul256_modm_r(prefix[i - 1], xs[i])
+
+    acc = sc_inv(prefix[n - 1])
+    for i in range(n - 1, 0, -1):
+        nacc = tcry.mul256_modm_r(acc, xs[i])
+        tcry.mul256_modm(rs[i], acc, prefix[i - 1])
+        acc = nacc
+    tcry.mul256_modm(rs[0], acc, sc_init(1))
+    return rs
+
+
 def random_scalar():
     return tcry.xmr_random_scalar_r()
 
@@ -497,6 +554,13 @@ def point_norm(P):
     return tcry.ge25519_norm_r(P)
 
 
+def point_copy(P):
+    """
+    New point equal to P, normalized
+    """
+    return tcry.ge25519_norm_r(P)
+
+
 def point_mul8(P):
     return tcry.ge25519_mul8_r(P)
 
@@ -704,6 +768,13 @@ def scalarmult_h(i):
     return scalarmult(xmr_H(), sc_init(i) if isinstance(i, int) else i)
 
 
+def scalarmult_h_into(r, i):
+    """
+    scalarmult_h() into r, API parity with the other backends, no H table here
+    """
+    return scalarmult_into(r, xmr_H(), sc_init(i) if isinstance(i, int) else i)
+
+
 def add_keys2(a, b, B):
     """
     aG + bB, G is basepoint
@@ -875,6 +946,123 @@ def prove_range(amount, last_mask=None):
     # return C, a, nrsig
 
 
+#
+# Vector operations over contiguous buffers of packed 32 B elements.
+# Each buffer is wrapped once per call as a ctypes array of KEY_BUFF, elements
+# are accessed as views into it, the copy is made only for read-only inputs.
+# Scratch scalars and points are allocated per call so the functions are
+# thread-safe. Every element still costs one native call per step
+# (expand / op / contract). dst may alias the inputs.
+#
+
+
+def _vect_view(a, writable=False):
+    arr = tcry.KEY_BUFF * (len(a) // 32)
+    try:
+        return arr.from_buffer(a)
+    except TypeError:
+        if writable:
+            raise
+        return arr.from_buffer_copy(a)
+
+
+def _sc_vect_op(dst, a, b, op):
+    s1, s2 = new_scalar(), new_scalar()
+    va, vb, vd = _vect_view(a), _vect_view(b), _vect_view(dst, True)
+    for i in range(len(va)):
+        tcry.expand256_modm(s1, va[i], 32)
+        tcry.expand256_modm(s2, vb[i], 32)
+        op(s1, s1, s2)
+        tcry.contract256_modm(vd[i], s1)
+    return dst
+
+
+def sc_add_vect(dst, a, b):
+    """
+    dst[i] = a[i] + b[i]
+    """
+    return _sc_vect_op(dst, a, b, tcry.add256_modm)
+
+
+def sc_sub_vect(dst, a, b):
+    """
+    dst[i] = a[i] - b[i]
+    """
+    return _sc_vect_op(dst, a, b, tcry.sub256_modm)
+
+
+def sc_mul_vect(dst, a, b):
+    """
+    dst[i] = a[i] * b[i], Hadamard product
+    """
+    return _sc_vect_op(dst, a, b, tcry.mul256_modm)
+
+
+def sc_scale_vect(dst, a, x):
+    """
+    dst[i] = a[i] * x, x is a scalar
+    """
+    s1 = new_scalar()
+    va, vd = _vect_view(a), _vect_view(dst, True)
+    for i in range(len(va)):
+        tcry.expand256_modm(s1, va[i], 32)
+        tcry.mul256_modm(s1, s1, x)
+        tcry.contract256_modm(vd[i], s1)
+    return dst
+
+
+def sc_inner_product_vect(a, b):
+    r"""
+    \sum_i a[i] * b[i], returns scalar
+    """
+    s1, s2, acc = new_scalar(), new_scalar(), new_scalar()
+    va, vb = _vect_view(a), _vect_view(b)
+    for i in range(len(va)):
+        tcry.expand256_modm(s1, va[i], 32)
+        tcry.expand256_modm(s2, vb[i], 32)
+        tcry.muladd256_modm(acc, s1, s2, acc)
+    return acc
+
+
+def scalarmult_vect(dst, points, e):
+    """
+    dst[i] = e * points[i], e is a scalar
+    """
+    p1, p2 = new_point(), new_point()
+    vp, vd = _vect_view(points), _vect_view(dst, True)
+    for i in range(len(vp)):
+        tcry.ge25519_unpack_vartime(p1, vp[i])
+        tcry.ge25519_scalarmult(p2, p1, e)
+        tcry.ge25519_pack(vd[i], p2)
+    return dst
+
+
+def add_keys3_vect(dst, a, A, b, B):
+    """
+    dst[i] = a * A[i] + b * B[i], a, b are scalars
+    """
+    p1, p2, p3 = new_point(), new_point(), new_point()
+    vA, vB, vd = _vect_view(A), _vect_view(B), _vect_view(dst, True)
+    for i in range(len(vA)):
+        tcry.ge25519_unpack_vartime(p1, vA[i])
+        tcry.ge25519_unpack_vartime(p2, vB[i])
+        tcry.xmr_add_keys3_vartime(p3, a, p1, b, p2)
+        tcry.ge25519_pack(vd[i], p3)
+    return dst
+
+
+def hash_to_point_vect(src):
+    """
+    H_p(src[i]) for all packed 32 B keys in src, returns list of points
+    """
+    res = []
+    for key in _vect_view(src):
+        r = new_point()
+        tcry.xmr_hash_to_ec(r, key)
+        res.append(r)
+    return res
+
+
 #
 # Backend config
 #
@@ -884,6 +1072,9 @@ class TcryECBackend(ECBackendBase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+    def backend_id(self):
+        return ec_picker.EC_BACKEND_TREZOR
+
     def has_rangeproof_borromean(self):
         return True
 
@@ -9,21 +9,145 @@
 # https://tools.ietf.org/html/draft-josefsson-eddsa-ed25519-00#section-4
 # https://github.com/monero-project/research-lab
 
+# The EC backend and the heavy dependencies are loaded on the first use
+# of a primitive (module attribute access or a helper call below), so
+# processes parsing addresses only do not pay the backend import.
+
 import binascii
-import operator
+import functools
+import importlib
 import sys
+import threading
+import types
+
+from monero_glue.xmr.core import ec_cache
+
+# Star-imported to the module namespace on the first use, in this order
+_STAR_MODULES = (
+    "monero_glue.xmr.core.ec",
+    "monero_glue.xmr.core.ec_conv",
+    "monero_glue.xmr.core.pycompat",
+)
+
+# Module attributes resolved on demand, name -> (module, attribute)
+_LAZY_ATTRS = {
+    "operator": ("operator", None),
+    "rand": ("Crypto.Random.random", None),
+    "b58_mnr": ("monero_glue.misc.b58_mnr", None),
+    "common": ("monero_glue.xmr.common", None),
+    "ed25519": ("monero_glue.xmr.core.backend.ed25519", None),
+    "ed25519_2": ("monero_glue.xmr.core.backend.ed25519_2", None),
+    "keccak2": ("monero_glue.xmr.core.backend.keccak2", None),
+    "b": ("monero_glue.xmr.core.backend.ed25519", "b"),
+    "d": ("monero_glue.xmr.core.backend.ed25519", "d"),
+    "l": ("monero_glue.xmr.core.backend.ed25519", "l"),
+    "q": ("monero_glue.xmr.core.backend.ed25519", "q"),
+    "xmrserialize": ("monero_serialize.xmrserialize", None),
+}
+
+_backend_loaded = False
+_backend_lock = threading.RLock()
+_backend_fncs = []
+_ec = None
+
+# Batches at least this large are hashed by the NumPy Keccak when available,
+# per-message hashing is as fast for smaller ones
+KECCAK_NP_MIN_BATCH = 4096
+_keccak_np = None  # False if NumPy is not available
+
+# Memoized hash_to_point, keyed by the encoded input, see set_cache_size()
+_hash_to_point_cache = ec_cache.LruCache()
+
+
+def _lazy_attr(name):
+    mod_name, attr = _LAZY_ATTRS[name]
+    mod = importlib.import_module(mod_name)
+    val = getattr(mod, attr) if attr else mod
+    globals()[name] = val
+    return val
+
+
+def _star_names(mod):
+    names = getattr(mod, "__all__", None)
+    if names is None:
+        names = [x for x in mod.__dict__ if not x.startswith("_")]
+    return names
+
+
+def _load_backend():
+    """
+    Loads the EC backend to the module namespace, as the star imports did.
+    Helpers defined in this module take precedence.
+    """
+    global _backend_loaded, _ec
+    if _backend_loaded:
+        return
+
+    with _backend_lock:
+        if _backend_loaded:
+            return
+
+        g = globals()
+        _ec = importlib.import_module(_STAR_MODULES[0])
+        for name in _LAZY_ATTRS:
+            _lazy_attr(name)
+
+        for mod_name in _STAR_MODULES:
+            mod = importlib.import_module(mod_name)
+            for name in _star_names(mod):
+                if name not in _OWN_NAMES:
+                    g[name] = getattr(mod, name)
 
-from Crypto.Random import random as rand
-from monero_glue.misc import b58_mnr
-from monero_glue.xmr import common
-from monero_glue.xmr.core.backend import ed25519, ed25519_2, keccak2
-from monero_glue.xmr.core.backend.ed25519 import b, d, l, q
-from monero_glue.xmr.core.ec import *
-from monero_glue.xmr.core.ec_conv import *
-from monero_glue.xmr.core.pycompat import *
-from monero_serialize import xmrserialize
+        # Helpers do not need the load check anymore
+        for name in _backend_fncs:
+            g[name] = g[name].__wrapped__
+        _backend_loaded = True
 
 
+def _needs_backend(fnc):
+    """
+    Decorator for helpers using backend primitives, loads the backend first
+    """
+
+    @functools.wraps(fnc)
+    def wrapper(*args, **kwargs):
+        _load_backend()
+        return fnc(*args, **kwargs)
+
+    _backend_fncs.append(fnc.__name__)
+    return wrapper
+
+
+class _LazyModule(types.ModuleType):
+    """
+    Module type resolving missing attributes by loading the backend.
+    Module level __getattr__ (PEP 562) is not available before Python 3.7.
+    """
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name in _LAZY_ATTRS:
+            return _lazy_attr(name)
+        if not _backend_loaded:
+            _load_backend()
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError("module %r has no attribute %r" % (self.__name__, name))
+
+    def __dir__(self):
+        _load_backend()
+        return sorted(self.__dict__)
+
+
+def get_backend_loaded():
+    """
+    True if the EC backend has been loaded already
+    """
+    return _backend_loaded
+
+
+@_needs_backend
 def b16_to_scalar(bts):
     """
     Converts hexcoded bytearray to the scalar
@@ -33,6 +157,7 @@ def b16_to_scalar(bts):
     return decodeint(binascii.unhexlify(bts))
 
 
+@_needs_backend
 def public_key(sk):
     """
     Creates public key from the private key (integer scalar)
@@ -43,6 +168,7 @@ def public_key(sk):
     return encodepoint(scalarmult_base(sk))
 
 
+@_needs_backend
 def gen_Hpow(size):
     """
     Returns powers of point H
@@ -56,6 +182,7 @@ def gen_Hpow(size):
     return H2
 
 
+@_needs_backend
 def hmac_point(key, point):
     """
     HMAC single point
@@ -66,6 +193,7 @@ def hmac_point(key, point):
     return compute_hmac(key, encodepoint(point))
 
 
+@_needs_backend
 def generate_signature(data, priv):
     """
     Generate EC signature
@@ -86,6 +214,7 @@ def generate_signature(data, priv):
     return c, r, pub
 
 
+@_needs_backend
 def check_signature(data, c, r, pub):
     """
     EC signature verification
@@ -100,28 +229,141 @@ def check_signature(data, c, r, pub):
     if sc_check(c) != 0 or sc_check(r) != 0:
         raise ValueError("Signature error")
 
-    tmp2 = point_add(scalarmult(pub, c), scalarmult_base(r))
+    tmp2 = ge_double_scalarmult_base_vartime(c, pub, r)
     buff = data + encodepoint(pub) + encodepoint(tmp2)
     tmp_c = hash_to_scalar(buff)
     res = sc_sub(tmp_c, c)
     return not sc_isnonzero(res)
 
 
+@_needs_backend
+def hash_to_point(buf):
+    """
+    H_p(buf), memoized. Returns a copy of the cached point.
+    :param buf:
+    :return:
+    """
+    key = bytes(buf)
+    return _ec.point_copy(
+        _hash_to_point_cache.get_or_compute(key, _ec.hash_to_point, key)
+    )
+
+
+@_needs_backend
+def hash_to_point_vect(src):
+    """
+    H_p(src[i]) for all packed 32 B keys in src, memoized.
+    Only the missing keys are passed to the backend.
+    Returns copies of the cached points.
+    :param src:
+    :return: list of points
+    """
+    res = []
+    missing = []
+    for i in range(0, len(src), 32):
+        key = bytes(src[i : i + 32])
+        pt = _hash_to_point_cache.get(key)
+        if pt is None:
+            missing.append((len(res), key))
+        res.append(pt)
+
+    if missing:
+        pts = _ec.hash_to_point_vect(b"".join(x[1] for x in missing))
+        for (idx, key), pt in zip(missing, pts):
+            _hash_to_point_cache.put(key, pt)
+            res[idx] = pt
+    return [_ec.point_copy(pt) for pt in res]
+
+
+def _get_keccak_np():
+    global _keccak_np
+    if _keccak_np is None:
+        try:
+            from monero_glue.xmr.core.backend import keccak_np
+
+            _keccak_np = keccak_np
+        except ImportError:
+            _keccak_np = False
+    return _keccak_np
+
+
+@_needs_backend
+def keccak_hash_many(bufs):
+    """
+    Keccak-256 of all buffers. Large batches are hashed at once by the
+    batched Keccak-f (NumPy, optional), one by one otherwise.
+    :param bufs: list of bytes-like
+    :return: list of 32 B digests
+    """
+    if len(bufs) >= KECCAK_NP_MIN_BATCH and _get_keccak_np():
+        return _keccak_np.keccak_256_many(bufs)
+    return [keccak_hash(x) for x in bufs]
+
+
+@_needs_backend
+def hash_to_scalar_many(bufs):
+    """
+    H_s(bufs[i]) for all buffers
+    :param bufs: list of bytes-like
+    :return: list of scalars
+    """
+    return [decodeint(x) for x in keccak_hash_many(bufs)]
+
+
+def get_cache_stats():
+    """
+    Hit / miss statistics of the memoized EC maps
+    :return: dict name -> dict(hits, misses, size, maxsize)
+    """
+    return {"hash_to_point": _hash_to_point_cache.stats()}
+
+
+def set_cache_size(size):
+    """
+    Sets the maximal number of entries of each memoized EC map, 0 disables.
+    Default is taken from the EC_CACHE_SIZE env var.
+    :param size:
+    :return:
+    """
+    _hash_to_point_cache.resize(size)
+
+
+def clear_caches():
+    _hash_to_point_cache.clear()
+
+
+def _addr_hash(buf):
+    """
+    Address checksum hash, does not load the backend when not loaded yet
+    """
+    if _backend_loaded:
+        return cn_fast_hash(buf)
+    kc2 = _lazy_attr("keccak2").Keccak256()
+    kc2.update(buf)
+    return kc2.digest()
+
+
 def xmr_base58_addr_encode_check(version, buff):
     buf = bytes([version]) + buff
-    h = cn_fast_hash(buf)
+    h = _addr_hash(buf)
     buf = binascii.hexlify(buf + h[0:4])
-    return b58_mnr.b58encode(buf)
+    return _lazy_attr("b58_mnr").b58encode(buf)
 
 
 def xmr_base58_addr_decode_check(buff):
-    d = b58_mnr.b58decode(data_bin=buff)
+    d = _lazy_attr("b58_mnr").b58decode(data_bin=buff)
 
     addr_checksum = d[-4:]
-    calc_checksum = cn_fast_hash(d[:-4])[:4]
+    calc_checksum = _addr_hash(d[:-4])[:4]
     if addr_checksum == calc_checksum:
         version = ord(d[:1])
         return d[1:-4], version
 
     else:
         raise ValueError("Invalid address checksum")
+
+
+_OWN_NAMES = frozenset(
+    x for x, v in globals().items() if isinstance(v, types.FunctionType)
+)
+sys.modules[__name__].__class__ = _LazyModule
@@ -7,7 +7,7 @@
 import logging
 
 from monero_glue.xmr import common, crypto
-from monero_serialize import xmrtypes
+from monero_serialize import xmrserialize as x, xmrtypes
 
 logger = logging.getLogger(__name__)
 
@@ -105,7 +105,7 @@ def decode_points(vct):
     :param vct:
     :return:
     """
-    return [crypto.decodepoint(x) for x in vct]
+    return crypto.decodepoint_batch(vct)
 
 
 def copy_ct_key(ct):
@@ -134,9 +134,11 @@ def decode_ct_keys_points(vct, copy=False):
     :return:
     """
     rvct = copy_ct_keys(vct) if copy else vct
+    masks = crypto.decodepoint_batch([x.mask for x in rvct])
+    dests = crypto.decodepoint_batch([x.dest for x in rvct])
     for i in range(len(rvct)):
-        rvct[i].mask = crypto.decodepoint(rvct[i].mask)
-        rvct[i].dest = crypto.decodepoint(rvct[i].dest)
+        rvct[i].mask = masks[i]
+        rvct[i].dest = dests[i]
     return rvct
 
 
@@ -320,6 +322,41 @@ def ver_borromean(P1, P2, s0, s1, ee):
     return crypto.sc_eq(ee_computed, ee)
 
 
+def ver_borromean_batch(proofs):
+    """
+    Verifies many Borromean signatures, results as ver_borromean().
+    Each round is evaluated for all proofs together: points are encoded
+    in one batch, round hashes of all proofs are computed by one
+    hash_to_scalar_many() call, the final challenge of each proof is hashed in one pass.
+
+    :param proofs: list of (P1, P2, s0, s1, ee)
+    :return: list of booleans
+    """
+    LL = []
+    for P1, P2, s0, s1, ee in proofs:
+        for ii in range(len(P1)):
+            LL.append(crypto.add_keys2(s0[ii], ee, P1[ii]))
+    chash = crypto.hash_to_scalar_many(crypto.encodepoint_batch(LL))
+    del LL
+
+    Lv1 = []
+    off = 0
+    for P1, P2, s0, s1, ee in proofs:
+        for ii in range(len(P1)):
+            Lv1.append(crypto.add_keys2(s1[ii], chash[off + ii], P2[ii]))
+        off += len(P1)
+    Lv1 = crypto.encodepoint_batch(Lv1)
+
+    res = []
+    off = 0
+    for P1, P2, s0, s1, ee in proofs:
+        n = len(P1)
+        buff = b"".join(bytes(x) for x in Lv1[off : off + n])
+        res.append(crypto.sc_eq(crypto.decodeint(crypto.keccak_hash(buff)), ee))
+        off += n
+    return res
+
+
 #
 # Optimized versions with incremental hashing,
 # Simple and full variants for Monero
@@ -412,7 +449,7 @@ def gen_mlsag_rows(message, rv, pk, xx, kLRki, index, dsRows, rows, cols):
             hasher.update(crypto.encodepoint(aGi))
             hasher.update(crypto.encodepoint(aHPi))
 
-        Ip[i] = crypto.precomp(rv.II[i])
+        Ip[i] = crypto.ge_dsm_precomp(rv.II[i])
 
     for i in range(dsRows, rows):
         alpha[i] = crypto.random_scalar()
@@ -425,6 +462,48 @@ def gen_mlsag_rows(message, rv, pk, xx, kLRki, index, dsRows, rows, cols):
     return c_old, Ip, alpha
 
 
+def _hash_mlsag_column(
+    message, pk_col, ss_col, c_old, Ip, dsRows, pk_enc=None, Hi=None
+):
+    """
+    Computes the next ring challenge from one column of the key matrix.
+    Column keys are encoded and hashed to points at once, L, R points
+    are encoded in one batch, the challenge is hashed in one pass.
+
+    :param message:
+    :param pk_col: column of the key matrix, point form
+    :param ss_col: column of the signature scalars
+    :param c_old: previous challenge
+    :param Ip: ge_dsm_precomp() of the key images
+    :param dsRows:
+    :param pk_enc: encoded pk_col, computed if None
+    :param Hi: hash_to_point() of the first dsRows keys, computed if None
+    :return: challenge scalar
+    """
+    rows = len(pk_col)
+    if pk_enc is None:
+        pk_enc = crypto.encodepoint_batch(pk_col)
+    if Hi is None:
+        Hi = crypto.hash_to_point_vect(b"".join(pk_enc[:dsRows]))  # hashToPoint()
+
+    pts = []
+    for j in range(dsRows):
+        pts.append(crypto.add_keys2(ss_col[j], c_old, pk_col[j]))
+        pts.append(
+            crypto.ge_double_scalarmult_precomp_vartime2(ss_col[j], Hi[j], c_old, Ip[j])
+        )
+    for j in range(dsRows, rows):
+        pts.append(crypto.add_keys2(ss_col[j], c_old, pk_col[j]))
+    LR = crypto.encodepoint_batch(pts)
+
+    parts = [message]
+    for j in range(dsRows):
+        parts.extend((pk_enc[j], LR[2 * j], LR[2 * j + 1]))
+    for j in range(dsRows, rows):
+        parts.extend((pk_enc[j], LR[dsRows + j]))
+    return crypto.decodeint(crypto.keccak_hash(b"".join(parts)))
+
+
 def gen_mlsag_ext(message, pk, xx, kLRki, mscout, index, dsRows):
     """
     Multilayered Spontaneous Anonymous Group Signatures (MLSAG signatures)
@@ -441,7 +520,7 @@ def gen_mlsag_ext(message, pk, xx, kLRki, mscout, index, dsRows):
     rows, cols = gen_mlsag_assert(pk, xx, kLRki, mscout, index, dsRows)
 
     rv = xmrtypes.MgSig()
-    c, L, R, Hi = 0, None, None, None
+    c = 0
 
     c_old, Ip, alpha = gen_mlsag_rows(
         message, rv, pk, xx, kLRki, index, dsRows, rows, cols
@@ -453,24 +532,7 @@ def gen_mlsag_ext(message, pk, xx, kLRki, mscout, index, dsRows):
 
     while i != index:
         rv.ss[i] = scalar_gen_vector(rows)
-        hasher = hasher_message(message)
-
-        for j in range(dsRows):
-            L = crypto.add_keys2(rv.ss[i][j], c_old, pk[i][j])
-            Hi = crypto.hash_to_point(
-                crypto.encodepoint(pk[i][j])
-            )  # originally hashToPoint()
-            R = crypto.add_keys3(rv.ss[i][j], Hi, c_old, Ip[j])
-            hasher.update(crypto.encodepoint(pk[i][j]))
-            hasher.update(crypto.encodepoint(L))
-            hasher.update(crypto.encodepoint(R))
-
-        for j in range(dsRows, rows):
-            L = crypto.add_keys2(rv.ss[i][j], c_old, pk[i][j])
-            hasher.update(crypto.encodepoint(pk[i][j]))
-            hasher.update(crypto.encodepoint(L))
-
-        c = crypto.decodeint(hasher.digest())
+        c = _hash_mlsag_column(message, pk[i], rv.ss[i], c_old, Ip, dsRows)
         c_old = c
         i = (i + 1) % cols
 
@@ -521,16 +583,20 @@ def ver_mlsag_assert(pk, rv, dsRows):
     return rows, cols
 
 
-def ver_mlsag_ext(message, pk, rv, dsRows):
+def ver_mlsag_ext(message, pk, rv, dsRows, pk_enc=None):
     """
     Multilayered Spontaneous Anonymous Group Signatures (MLSAG signatures)
     c.f. http://eprint.iacr.org/2015/1098 section 2.
     keyImageV just does I[i] = xx[i] * Hash(xx[i] * G) for each i
 
+    Key image precomputations are built once per signature, the key matrix
+    is encoded and hashed to points once, in batches, before the ring walk.
+
     :param message:
     :param pk: matrix of EC points, point form.
     :param rv:
     :param dsRows:
+    :param pk_enc: pk matrix in the encoded form if known by the caller, computed if None
     :return:
     """
     rows, cols = ver_mlsag_assert(pk, rv, dsRows)
@@ -538,28 +604,27 @@ def ver_mlsag_ext(message, pk, rv, dsRows):
 
     Ip = key_vector(dsRows)
     for i in range(dsRows):
-        Ip[i] = crypto.precomp(rv.II[i])
+        Ip[i] = crypto.ge_dsm_precomp(rv.II[i])
+
+    if pk_enc is None:
+        flat = crypto.encodepoint_batch([pt for col in pk for pt in col])
+        pk_enc = [flat[i * rows : (i + 1) * rows] for i in range(cols)]
+    Hi = crypto.hash_to_point_vect(
+        b"".join(bytes(k) for col in pk_enc for k in col[:dsRows])
+    )
 
     i = 0
     while i < cols:
-        c = 0
-        hasher = hasher_message(message)
-        for j in range(dsRows):
-            L = crypto.add_keys2(rv.ss[i][j], c_old, pk[i][j])
-            Hi = crypto.hash_to_point(
-                crypto.encodepoint(pk[i][j])
-            )  # originally hashToPoint()
-            R = crypto.add_keys3(rv.ss[i][j], Hi, c_old, Ip[j])
-            hasher.update(crypto.encodepoint(pk[i][j]))
-            hasher.update(crypto.encodepoint(L))
-            hasher.update(crypto.encodepoint(R))
-
-        for j in range(dsRows, rows):
-            L = crypto.add_keys2(rv.ss[i][j], c_old, pk[i][j])
-            hasher.update(crypto.encodepoint(pk[i][j]))
-            hasher.update(crypto.encodepoint(L))
-
-        c = crypto.decodeint(hasher.digest())
+        c = _hash_mlsag_column(
+            message,
+            pk[i],
+            rv.ss[i],
+            c_old,
+            Ip,
+            dsRows,
+            pk_enc[i],
+            Hi[i * dsRows : (i + 1) * dsRows],
+        )
         c_old = c
         i += 1
 
@@ -705,35 +770,282 @@ def ver_rct_mg(mg, pubs, out_pk, txn_fee_key, message):
                 M[i][rows], crypto.decodepoint(pubs[i][j].commitment)
             )  # add Ci in last row
 
-    for i in range(cols):
-        for j in range(len(out_pk)):
-            M[i][rows] = crypto.point_sub(
-                M[i][rows], crypto.decodepoint(out_pk[j].mask)
-            )  # subtract output Ci's in last row
+    out_sum = txn_fee_key
+    for j in range(len(out_pk)):
+        out_sum = crypto.point_add(out_sum, crypto.decodepoint(out_pk[j].mask))
 
-        # subtract txn fee output in last row
-        M[i][rows] = crypto.point_sub(M[i][rows], txn_fee_key)
+    for i in range(cols):
+        # subtract output Ci's and txn fee output in last row
+        M[i][rows] = crypto.point_sub(M[i][rows], out_sum)
 
-    return ver_mlsag_ext(message, M, mg, rows)
+    # dest keys are already encoded, only the last row is encoded
+    last_enc = crypto.encodepoint_batch([M[i][rows] for i in range(cols)])
+    M_enc = [
+        [pubs[i][j].dest for j in range(rows)] + [last_enc[i]] for i in range(cols)
+    ]
+    return ver_mlsag_ext(message, M, mg, rows, M_enc)
 
 
-def ver_rct_mg_simple(message, mg, pubs, C):
+def ver_rct_mg_simple(message, mg, pubs, C, P=None, C_nonzero=None):
     """
     Verifies the above sig is created corretly
     :param message:
     :param mg:
     :param pubs: vector of points, encoded
     :param C:
+    :param P: decoded pubs[i].dest if known by the caller, e.g., shared by more signatures
+    :param C_nonzero: decoded pubs[i].commitment if known by the caller
     :return:
     """
     rows = 1
     cols = len(pubs)
     if cols == 0:
         raise ValueError("Empty pubs")
+    if P is None:
+        P = crypto.decodepoint_batch([x.dest for x in pubs])
+    if C_nonzero is None:
+        C_nonzero = crypto.decodepoint_batch([x.commitment for x in pubs])
+    if len(P) != cols or len(C_nonzero) != cols:
+        raise ValueError("Decoded pubs size mismatch")
 
     M = key_matrix(rows + 1, cols)
     for i in range(cols):
-        M[i][0] = crypto.decodepoint(pubs[i].dest)
-        M[i][1] = crypto.point_sub(crypto.decodepoint(pubs[i].commitment), C)
+        M[i][0] = P[i]
+        M[i][1] = crypto.point_sub(C_nonzero[i], C)
+
+    C_enc = crypto.encodepoint_batch([M[i][1] for i in range(cols)])
+    M_enc = [[pubs[i].dest, C_enc[i]] for i in range(cols)]
+    return ver_mlsag_ext(message, M, mg, rows, M_enc)
+
+
+#
+# CLSAG, https://eprint.iacr.org/2019/654
+# One ring of (P, C) pairs, the key and the commitment rows are aggregated
+# with mu_P, mu_C into one key: W_i = mu_P * P[i] + mu_C * C[i].
+#
+
+HASH_KEY_CLSAG_ROUND = b"CLSAG_round"
+HASH_KEY_CLSAG_AGG_0 = b"CLSAG_agg_0"
+HASH_KEY_CLSAG_AGG_1 = b"CLSAG_agg_1"
+
+
+class Clsag(x.MessageType):
+    """
+    CLSAG signature, the key image I is not serialized (as MgSig.II)
+    """
+
+    __slots__ = ["s", "c1", "D", "I"]
+    MFIELDS = [("s", xmrtypes.KeyV), ("c1", xmrtypes.ECKey), ("D", xmrtypes.ECKey)]
+
+
+def _clsag_domain(domain):
+    return domain + b"\x00" * (32 - len(domain))
+
+
+def _clsag_agg(P_enc, C_enc, I, D, C_offset_enc):
+    """
+    Aggregation coefficients mu_P, mu_C.
+    D is the stored one, i.e., D / 8.
+    """
+    keys = b"".join(
+        [b"".join(P_enc), b"".join(C_enc)]
+        + [bytes(k) for k in crypto.encodepoint_batch([I, D])]
+        + [C_offset_enc]
+    )
+    mu_P = crypto.hash_to_scalar(_clsag_domain(HASH_KEY_CLSAG_AGG_0) + keys)
+    mu_C = crypto.hash_to_scalar(_clsag_domain(HASH_KEY_CLSAG_AGG_1) + keys)
+    return mu_P, mu_C
+
+
+def _clsag_prefix(message, P_enc, C_enc, C_offset_enc):
+    """
+    Constant part of the round hash
+    """
+    return b"".join(
+        [_clsag_domain(HASH_KEY_CLSAG_ROUND), b"".join(P_enc), b"".join(C_enc)]
+        + [C_offset_enc, bytes(message)]
+    )
+
+
+def _clsag_round(prefix, s, c, W, Hp, W_I):
+    """
+    Next ring challenge, L = s * G + c * W, R = s * Hp + c * W_I
+    :param prefix: _clsag_prefix()
+    :param s: signature scalar of the member
+    :param c: previous challenge
+    :param W: aggregated key of the member
+    :param Hp: hash_to_point of the member key
+    :param W_I: ge_dsm_precomp() of the aggregated key image
+    :return: challenge scalar
+    """
+    L = crypto.add_keys2(s, c, W)
+    R = crypto.ge_double_scalarmult_precomp_vartime2(s, Hp, c, W_I)
+    LR = crypto.encodepoint_batch([L, R])
+    return crypto.hash_to_scalar(prefix + bytes(LR[0]) + bytes(LR[1]))
+
+
+def gen_clsag(message, P, p, C, z, C_nonzero, C_offset, index, kLRki=None, mscout=None):
+    """
+    CLSAG signature, knowing p = dlog(P[index]) and z = dlog(C[index])
+
+    :param message:
+    :param P: ring keys, point form
+    :param p: secret key of P[index]
+    :param C: ring commitments minus C_offset, point form
+    :param z: secret key of C[index]
+    :param C_nonzero: ring commitments, point form
+    :param C_offset: pseudo output commitment, point form
+    :param index: real input index
+    :param kLRki: multisig data
+    :param mscout: lambda accepting c
+    :return: (Clsag with raw points and scalars, c)
+    """
+    n = len(P)
+    if n == 0:
+        raise ValueError("Empty ring")
+    if len(C) != n or len(C_nonzero) != n:
+        raise ValueError("Ring size mismatch")
+    if index >= n:
+        raise ValueError("Index out of range")
+    if (not kLRki or not mscout) and (kLRki or mscout):
+        raise ValueError("Only one of kLRki/mscout is present")
+
+    P_enc = [bytes(k) for k in crypto.encodepoint_batch(P)]
+    C_enc = [bytes(k) for k in crypto.encodepoint_batch(C_nonzero)]
+    C_offset_enc = bytes(crypto.encodepoint(C_offset))
+    Hp = crypto.hash_to_point_vect(b"".join(P_enc))
+
+    rv = Clsag()
+    D = crypto.scalarmult(Hp[index], z)
+    rv.D = crypto.scalarmult(D, crypto.sc_inv_eight())
+
+    if kLRki:
+        a = kLRki.k
+        aG, aH = kLRki.L, kLRki.R
+        rv.I = kLRki.ki
+    else:
+        a = crypto.random_scalar()
+        aG = crypto.scalarmult_base(a)
+        aH = crypto.scalarmult(Hp[index], a)
+        rv.I = crypto.scalarmult(Hp[index], p)
+
+    mu_P, mu_C = _clsag_agg(P_enc, C_enc, rv.I, rv.D, C_offset_enc)
+    prefix = _clsag_prefix(message, P_enc, C_enc, C_offset_enc)
+    W_I = crypto.ge_dsm_precomp(crypto.add_keys3(mu_P, rv.I, mu_C, D))
+
+    aGH = crypto.encodepoint_batch([aG, aH])
+    c = crypto.hash_to_scalar(prefix + bytes(aGH[0]) + bytes(aGH[1]))
+
+    rv.s = key_vector(n)
+    i = (index + 1) % n
+    if i == 0:
+        rv.c1 = c
+
+    while i != index:
+        rv.s[i] = crypto.random_scalar()
+        W = crypto.add_keys3(mu_P, P[i], mu_C, C[i])
+        c = _clsag_round(prefix, rv.s[i], c, W, Hp[i], W_I)
+        i = (i + 1) % n
+        if i == 0:
+            rv.c1 = c
+
+    # s = a - c * (mu_P * p + mu_C * z)
+    w = crypto.sc_muladd(mu_P, p, crypto.sc_mul(mu_C, z))
+    rv.s[index] = crypto.sc_mulsub(c, w, a)
+
+    if mscout:
+        mscout(c)
+
+    return rv, c
+
+
+def ver_clsag(message, P, C_nonzero, C_offset, sig):
+    """
+    CLSAG verification
+
+    :param message:
+    :param P: ring keys, point form
+    :param C_nonzero: ring commitments, point form
+    :param C_offset: pseudo output commitment, point form
+    :param sig: Clsag, raw points and scalars
+    :return:
+    """
+    n = len(P)
+    if n == 0:
+        raise ValueError("Empty ring")
+    if len(C_nonzero) != n:
+        raise ValueError("Ring size mismatch")
+    if len(sig.s) != n:
+        raise ValueError("Bad s size")
+    if crypto.sc_check(sig.c1) != 0:
+        raise ValueError("Bad c1")
+    for si in sig.s:
+        if crypto.sc_check(si) != 0:
+            raise ValueError("Bad s")
+
+    D_8 = crypto.point_mul8(sig.D)
+    if crypto.point_eq(D_8, crypto.identity()):
+        raise ValueError("Bad auxiliary key")
+    if crypto.point_eq(sig.I, crypto.identity()):
+        raise ValueError("Bad key image")
+
+    P_enc = [bytes(k) for k in crypto.encodepoint_batch(P)]
+    C_enc = [bytes(k) for k in crypto.encodepoint_batch(C_nonzero)]
+    C_offset_enc = bytes(crypto.encodepoint(C_offset))
+    Hp = crypto.hash_to_point_vect(b"".join(P_enc))
+
+    mu_P, mu_C = _clsag_agg(P_enc, C_enc, sig.I, sig.D, C_offset_enc)
+    prefix = _clsag_prefix(message, P_enc, C_enc, C_offset_enc)
+    W_I = crypto.ge_dsm_precomp(crypto.add_keys3(mu_P, sig.I, mu_C, D_8))
+
+    c = sig.c1
+    for i in range(n):
+        C = crypto.point_sub(C_nonzero[i], C_offset)
+        W = crypto.add_keys3(mu_P, P[i], mu_C, C)
+        c = _clsag_round(prefix, sig.s[i], c, W, Hp[i], W_I)
+
+    c = crypto.sc_sub(c, sig.c1)
+    return not crypto.sc_isnonzero(c)
+
+
+def prove_rct_clsag_simple(message, pubs, in_sk, a, cout, kLRki, mscout, index):
+    """
+    CLSAG counterpart of prove_rct_mg_simple(), same inputs.
+
+    :param message:
+    :param pubs: vector of CtKeys, public, point values, encoded form. (dest, mask) = (P, C)
+    :param in_sk: CtKey, private. (spending private key, input commitment mask (original))
+    :param a: mask from the pseudo_output commitment (alpha)
+    :param cout: point, decoded. Pseudo output public key.
+    :param kLRki:
+    :param mscout: lambda accepting c
+    :param index:
+    :return: (Clsag, c)
+    """
+    if len(pubs) == 0:
+        raise ValueError("Empty pubs")
+
+    P = crypto.decodepoint_batch([x.dest for x in pubs])
+    C_nonzero = crypto.decodepoint_batch([x.commitment for x in pubs])
+    C = [crypto.point_sub(Ci, cout) for Ci in C_nonzero]
+    z = crypto.sc_sub(in_sk.mask, a)
+    return gen_clsag(
+        message, P, in_sk.dest, C, z, C_nonzero, cout, index, kLRki, mscout
+    )
+
+
+def ver_rct_clsag_simple(message, sig, pubs, C):
+    """
+    CLSAG counterpart of ver_rct_mg_simple()
+    :param message:
+    :param sig: Clsag, raw form, with the key image sig.I
+    :param pubs: vector of points, encoded
+    :param C: pseudo output, point form
+    :return:
+    """
+    if len(pubs) == 0:
+        raise ValueError("Empty pubs")
 
-    return ver_mlsag_ext(message, M, mg, rows)
+    P = crypto.decodepoint_batch([x.dest for x in pubs])
+    C_nonzero = crypto.decodepoint_batch([x.commitment for x in pubs])
+    return ver_clsag(message, P, C_nonzero, C, sig)
@@ -20,6 +20,7 @@ from .sub.tsx_helper import *
 from .sub.xmr_net import *
 
 DISPLAY_DECIMAL_POINT = 12
+HF_VERSION_CLSAG = 13
 
 
 class XmrNoSuchAddressException(common.XmrException):
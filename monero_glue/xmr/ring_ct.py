@@ -3,6 +3,7 @@
 # Author: https://github.com/monero-project/mininero
 # Author: Dusan Klinec, ph4r05, 2018
 
+import asyncio
 import logging
 
 from monero_glue.compat import gc
@@ -12,6 +13,7 @@ from monero_serialize import xmrtypes
 
 logger = logging.getLogger(__name__)
 ATOMS = 64
+_HPOW = None
 
 
 def d2b(n, digits):
@@ -71,6 +73,25 @@ async def prove_range_bp_batch(amounts, masks):
     return bp_proof
 
 
+async def prove_range_bp_jobs(jobs, service=None, workers=None):
+    """
+    Proves many (amounts, masks) jobs in parallel, e.g., when building
+    several transactions at once. Proofs are returned in the jobs order.
+
+    :param jobs: list of (amounts, masks)
+    :param service: BulletProofProvingService to use, temporary one if None
+    :param workers: number of workers of the temporary service
+    :return:
+    """
+    from monero_glue.xmr import bulletproof as bp
+
+    if service is not None:
+        return service.prove_all(jobs)
+
+    with bp.BulletProofProvingService(workers=workers) as service:
+        return service.prove_all(jobs)
+
+
 async def verify_bp(bp_proof, amounts=None, masks=None):
     from monero_glue.xmr import bulletproof as bp
 
@@ -91,6 +112,44 @@ async def verify_bp(bp_proof, amounts=None, masks=None):
     return res
 
 
+async def prove_range_bp_plus(amount, last_mask=None):
+    mask = last_mask if last_mask is not None else crypto.random_scalar()
+    bp_proof = await prove_range_bp_plus_batch([amount], [mask])
+
+    C = crypto.decodepoint(bp_proof.V[0])
+    C = crypto.point_mul8(C)
+
+    gc.collect()
+    return C, mask, bp_proof
+
+
+async def prove_range_bp_plus_batch(amounts, masks):
+    from monero_glue.xmr import bulletproof_plus as bpp
+
+    bpi = bpp.BulletProofPlusBuilder()
+    bp_proof = bpi.prove_batch([crypto.sc_init(a) for a in amounts], masks)
+    del (bpi, bpp)
+    gc.collect()
+
+    return bp_proof
+
+
+async def verify_bp_plus(bp_proof, amounts=None, masks=None):
+    from monero_glue.xmr import bulletproof_plus as bpp
+
+    if amounts:
+        bp_proof.V = []
+        for i in range(len(amounts)):
+            C = crypto.gen_c(masks[i], amounts[i])
+            crypto.scalarmult_into(C, C, crypto.sc_inv_eight())
+            bp_proof.V.append(crypto.encodepoint(C))
+
+    bpi = bpp.BulletProofPlusBuilder()
+    res = bpi.verify(bp_proof)
+    gc.collect()
+    return res
+
+
 def bp_comm_to_v(C):
     """
     Commitment to proof.V
@@ -385,6 +444,183 @@ def prove_range_mem(amount, last_mask=None):
     return C, a, R
 
 
+#
+# Borromean prover strategies
+#
+
+RANGE_STRATEGY_BACKEND = "backend"  # backend C implementation
+RANGE_STRATEGY_ORIG = "orig"  # prove_range_orig
+RANGE_STRATEGY_MEM = "mem"  # prove_range_mem
+RANGE_STRATEGY_CHUNKED = "chunked"  # prove_range_chunked
+RANGE_STRATEGIES = (
+    RANGE_STRATEGY_BACKEND,
+    RANGE_STRATEGY_ORIG,
+    RANGE_STRATEGY_MEM,
+    RANGE_STRATEGY_CHUNKED,
+)
+RANGE_PROFILE_ENV = "XMR_RANGE_PROFILE"
+
+# strategy -> [peak Python allocations in bytes, seconds per proof],
+# measured by monero_poc/tools/range_bench.py, "fast" is used with native backends.
+# The backend strategy has no entry, the C implementation is preferred when available.
+RANGE_STRATEGY_PROFILES = {
+    "python": {
+        RANGE_STRATEGY_ORIG: [113760, 0.370],
+        RANGE_STRATEGY_MEM: [72112, 0.420],
+        RANGE_STRATEGY_CHUNKED: [26431, 0.451],
+    },
+    "fast": {
+        RANGE_STRATEGY_ORIG: [46554, 0.051],
+        RANGE_STRATEGY_MEM: [33708, 0.060],
+        RANGE_STRATEGY_CHUNKED: [18838, 0.059],
+    },
+}
+
+_range_profile = None
+
+
+def _prove_range_backend(amount, last_mask=None):
+    return crypto.prove_range(amount, last_mask)[:3]
+
+
+RANGE_STRATEGY_FNC = {
+    RANGE_STRATEGY_BACKEND: _prove_range_backend,
+    RANGE_STRATEGY_ORIG: prove_range_orig,
+    RANGE_STRATEGY_MEM: prove_range_mem,
+    RANGE_STRATEGY_CHUNKED: prove_range_chunked,
+}
+
+
+def get_range_strategies():
+    """
+    Strategies usable with the current EC backend
+    """
+    if crypto.get_backend().has_rangeproof_borromean():
+        return list(RANGE_STRATEGIES)
+    return [x for x in RANGE_STRATEGIES if x != RANGE_STRATEGY_BACKEND]
+
+
+def get_range_profile():
+    """
+    Strategy profile of the current EC backend. Loaded from the range_bench.py
+    JSON output specified by the XMR_RANGE_PROFILE env var if set.
+    :return: dict strategy -> [peak bytes, seconds]
+    """
+    global _range_profile
+    if _range_profile is None:
+        import json
+        import os
+
+        path = os.environ.get(RANGE_PROFILE_ENV)
+        if path:
+            with open(path) as fh:
+                _range_profile = json.load(fh)["profile"]
+        else:
+            fast = crypto.get_backend().is_fast()
+            _range_profile = RANGE_STRATEGY_PROFILES["fast" if fast else "python"]
+    return _range_profile
+
+
+def select_range_strategy(mem_budget=None, latency_target=None, profile=None):
+    """
+    Selects the Borromean prover.
+    The backend C implementation is used if available. Otherwise the
+    strategies fitting the memory budget are considered, the leanest one
+    meeting the latency target is selected, the fastest one if there is
+    no target or none meets it. If no strategy fits the budget the leanest one is used.
+
+    :param mem_budget: peak memory budget in bytes, None for unlimited
+    :param latency_target: seconds per proof, None for no target
+    :param profile: dict strategy -> [peak bytes, seconds], get_range_profile() if None
+    :return: metadata dict: strategy, mem, time (estimates, None if unknown)
+    """
+    strategies = get_range_strategies()
+    if RANGE_STRATEGY_BACKEND in strategies:
+        return {"strategy": RANGE_STRATEGY_BACKEND, "mem": None, "time": None}
+
+    profile = profile if profile is not None else get_range_profile()
+    cands = [(x, profile[x][0], profile[x][1]) for x in strategies if x in profile]
+    if not cands:
+        raise ValueError("No profiled range proof strategy")
+
+    fit = [x for x in cands if mem_budget is None or x[1] <= mem_budget]
+    if not fit:
+        fit = [min(cands, key=lambda x: x[1])]
+        logger.warning(
+            "No range proof strategy fits %s B, using %s" % (mem_budget, fit[0][0])
+        )
+
+    res = None
+    if latency_target is not None:
+        fast_enough = [x for x in fit if x[2] <= latency_target]
+        if fast_enough:
+            res = min(fast_enough, key=lambda x: x[1])
+    if res is None:
+        res = min(fit, key=lambda x: x[2])
+    return {"strategy": res[0], "mem": res[1], "time": res[2]}
+
+
+def prove_range_auto(
+    amount,
+    last_mask=None,
+    mem_budget=None,
+    latency_target=None,
+    decode=False,
+    byte_enc=False,
+    strategy=None,
+):
+    """
+    Range proof by the prover selected by select_range_strategy().
+    Output format does not depend on the strategy, as in prove_range().
+
+    :param amount:
+    :param last_mask:
+    :param mem_budget: peak memory budget in bytes
+    :param latency_target: seconds per proof
+    :param decode: decodes output
+    :param byte_enc: flat byte representation of the proof
+    :param strategy: forces the strategy, skips the selection
+    :return: C, mask, rsig, metadata dict (strategy, mem, time)
+    """
+    if byte_enc and decode:
+        raise ValueError("Conflicting options byte_enc, decode")
+
+    if strategy is None:
+        meta = select_range_strategy(mem_budget, latency_target)
+    elif strategy in get_range_strategies():
+        meta = {"strategy": strategy, "mem": None, "time": None}
+    else:
+        raise ValueError("Unsupported range proof strategy: %s" % strategy)
+
+    C, a, R = RANGE_STRATEGY_FNC[meta["strategy"]](amount, last_mask)
+
+    if meta["strategy"] in (RANGE_STRATEGY_BACKEND, RANGE_STRATEGY_CHUNKED):
+        # flat byte representation, s0 | s1 | ee | Ci
+        R = b"".join(bytes(x) for x in R) if isinstance(R, list) else bytes(R)
+        if not byte_enc:
+            R = monero.inflate_rsig(R)
+            if decode:
+                R = monero.recode_rangesig(R, encode=False)
+
+    elif byte_enc:
+        R = monero.flatten_rsig(monero.recode_rangesig(R, encode=True))
+    elif not decode:
+        R = monero.recode_rangesig(R, encode=True)
+
+    return C, a, R, meta
+
+
+def get_hpow_table():
+    """
+    Shared table of 2^i * H, i < ATOMS, computed on the first use.
+    Points must not be modified.
+    """
+    global _HPOW
+    if _HPOW is None:
+        _HPOW = crypto.gen_Hpow(ATOMS)
+    return _HPOW
+
+
 def ver_range(C=None, rsig=None, use_bulletproof=False, decode=True):
     """
     Verifies that \sum Ci = C and that each Ci is a commitment to 0 or 2^i
@@ -394,28 +630,66 @@ def ver_range(C=None, rsig=None, use_bulletproof=False, decode=True):
     :param decode: decodes encoded range proof
     :return:
     """
-    n = ATOMS
-    CiH = [None] * n
-    C_tmp = crypto.identity()
-    c_H = crypto.xmr_H()
+    if use_bulletproof:
+        bp = bulletproof.BulletProofBuilder()
+        return bp.verify(rsig)
+
+    return ver_range_batch([C], [rsig], decode)[0]
 
-    if decode and not use_bulletproof:
-        rsig = monero.recode_rangesig(rsig, encode=False, copy=True)
 
-    if not use_bulletproof:
-        for i in range(0, n):
-            CiH[i] = crypto.point_sub(rsig.Ci[i], c_H)
-            C_tmp = crypto.point_add(C_tmp, rsig.Ci[i])
-            c_H = crypto.point_double(c_H)
+def _decode_rangesig(rsig):
+    """
+    Decoded copy of the Borromean range proof, Ci decoded in one batch
+    """
+    nrsig = xmrtypes.RangeSig()
+    nrsig.Ci = crypto.decodepoint_batch(rsig.Ci)
+    nrsig.asig = xmrtypes.BoroSig()
+    nrsig.asig.s0 = [crypto.decodeint(x) for x in rsig.asig.s0]
+    nrsig.asig.s1 = [crypto.decodeint(x) for x in rsig.asig.s1]
+    nrsig.asig.ee = crypto.decodeint(rsig.asig.ee)
+    return nrsig
 
-        if C is not None and not crypto.point_eq(C_tmp, C):
-            return 0
 
-    if use_bulletproof:
-        bp = bulletproof.BulletProofBuilder()
-        return bp.verify(rsig)
+def ver_range_batch(Cs, rsigs, decode=True):
+    """
+    Verifies many Borromean range proofs, e.g., outputs of historical
+    pre-bulletproof transactions. 2^i * H points are taken from the shared
+    table, Borromean signatures are checked by mlsag2.ver_borromean_batch().
+
+    :param Cs: commitments, point form, None skips the sum Ci = C check
+    :param rsigs: Borromean range proofs
+    :param decode: decodes encoded range proofs
+    :return: list of booleans, one per proof, malformed proofs are invalid
+    """
+    if len(Cs) != len(rsigs):
+        raise ValueError("Commitments and proofs size mismatch")
 
-    return mlsag2.ver_borromean(rsig.Ci, CiH, rsig.asig.s0, rsig.asig.s1, rsig.asig.ee)
+    H2 = get_hpow_table()
+    res = [False] * len(rsigs)
+    proofs, idxs = [], []
+    for idx, rsig in enumerate(rsigs):
+        if decode:
+            try:
+                rsig = _decode_rangesig(rsig)
+            except Exception as e:
+                logger.debug("Range proof %s not decodable: %s" % (idx, e))
+                continue
+
+        asig = rsig.asig
+        if not (len(rsig.Ci) == len(asig.s0) == len(asig.s1) == ATOMS):
+            continue
+
+        C = Cs[idx]
+        if C is not None and not crypto.point_eq(sum_Ci(rsig.Ci), C):
+            continue
+
+        CiH = [crypto.point_sub(rsig.Ci[i], H2[i]) for i in range(ATOMS)]
+        proofs.append((rsig.Ci, CiH, rsig.asig.s0, rsig.asig.s1, rsig.asig.ee))
+        idxs.append(idx)
+
+    for idx, ok in zip(idxs, mlsag2.ver_borromean_batch(proofs)):
+        res[idx] = ok
+    return res
 
 
 # Ring-ct MG sigs
@@ -428,6 +702,173 @@ def ver_range(C=None, rsig=None, use_bulletproof=False, decode=True):
 #   verifies the above sig is created corretly
 
 
+def _pack_mg_simple(mg, key_image, ring, pseudo_out):
+    """
+    Packs one simple RingCT input to a compact buffer for the worker,
+    layout: cc | I | ss (ring_size x 2) | ring (dest, commitment) | pseudo_out
+    All values encoded, 32 B each.
+
+    :param mg: MgSig, encoded
+    :param key_image: encoded key image
+    :param ring: ring members with dest, commitment, encoded
+    :param pseudo_out: encoded pseudo output commitment
+    :return: bytes
+    """
+    parts = [bytes(mg.cc), bytes(key_image)]
+    for ss in mg.ss:
+        parts.extend(bytes(x) for x in ss)
+    for member in ring:
+        parts.append(bytes(member.dest))
+        parts.append(bytes(member.commitment))
+    parts.append(bytes(pseudo_out))
+    return b"".join(parts)
+
+
+def _ver_mg_simple_worker(message, ring_size, buff):
+    """
+    Verifies one simple RingCT input packed by _pack_mg_simple().
+    Runs in a process pool worker of verify_rct_signatures().
+    """
+    from monero_glue.messages.MoneroRctKeyPublic import MoneroRctKeyPublic
+
+    if len(buff) != 32 * (3 + 4 * ring_size):
+        raise ValueError("Bad input buffer size")
+
+    keys = [buff[i : i + 32] for i in range(0, len(buff), 32)]
+    ss_off, ring_off = 2, 2 + 2 * ring_size
+    mg = xmrtypes.MgSig()
+    mg.cc = crypto.decodeint(keys[0])
+    mg.II = [crypto.decodepoint(keys[1])]
+    mg.ss = [
+        [crypto.decodeint(x) for x in keys[ss_off + 2 * i : ss_off + 2 * i + 2]]
+        for i in range(ring_size)
+    ]
+    ring = [
+        MoneroRctKeyPublic(
+            dest=keys[ring_off + 2 * i], commitment=keys[ring_off + 2 * i + 1]
+        )
+        for i in range(ring_size)
+    ]
+    pseudo_out = crypto.decodepoint(keys[-1])
+    return mlsag2.ver_rct_mg_simple(message, mg, ring, pseudo_out)
+
+
+def _ver_mg_full(message, rv, vin, mix_ring):
+    """
+    Full RingCT, one MG over all inputs, verified in this process
+    """
+    mg = xmrtypes.MgSig()
+    mg.cc = crypto.decodeint(rv.p.MGs[0].cc)
+    mg.II = [crypto.decodepoint(x.k_image) for x in vin]
+    mg.ss = [[crypto.decodeint(x) for x in ss] for ss in rv.p.MGs[0].ss]
+
+    ring_size = len(mix_ring[0])
+    pubs = [[mix_ring[j][i] for j in range(len(vin))] for i in range(ring_size)]
+    txn_fee_key = crypto.scalarmult_h(rv.txnFee)
+    return mlsag2.ver_rct_mg(mg, pubs, rv.outPk, txn_fee_key, message)
+
+
+async def verify_rct_signatures(
+    tx, mix_ring, message=None, workers=None, executor=None
+):
+    """
+    Verifies MLSAG signatures of all transaction inputs.
+    Simple RingCT inputs are verified in a process pool, awaited without
+    blocking the event loop, the first failure cancels the pending ones.
+    An input failing with an exception, e.g., an undecodable point, is invalid. Each input is sent to the worker as one
+    compact bytes buffer (_pack_mg_simple) instead of pickled message objects.
+    Full RingCT has one MG over all inputs, verified in this process.
+
+    :param tx: Transaction, deserialized, MGs in the encoded form
+    :param mix_ring: list of rings, one per input, members with dest, commitment (encoded)
+    :param message: pre MLSAG hash, computed from the transaction if None
+    :param workers: number of processes, os.cpu_count() by default, 1 verifies in this process
+    :param executor: concurrent.futures executor to use, new ProcessPoolExecutor if None
+    :return: True if all signatures are valid
+    """
+    import os
+
+    rv = tx.rct_signatures
+    num_inputs = len(tx.vin)
+    if len(mix_ring) != num_inputs:
+        raise ValueError("Mix ring size mismatch")
+
+    if message is None:
+        if rv.message is None:
+            rv.message = await monero.get_transaction_prefix_hash(tx)
+        message = await monero.get_pre_mlsag_hash(rv)
+
+    if rv.type == xmrtypes.RctType.Full:
+        if len(rv.p.MGs) != 1:
+            raise ValueError("Bad MGs size")
+        return _ver_mg_full(message, rv, tx.vin, mix_ring)
+
+    if rv.type in (
+        xmrtypes.RctType.FullBulletproof,
+        xmrtypes.RctType.SimpleBulletproof,
+    ):
+        pseudo_outs = rv.p.pseudoOuts
+    elif rv.type == xmrtypes.RctType.Simple:
+        pseudo_outs = rv.pseudoOuts
+    else:
+        raise ValueError("Unsupported rct tx type %s" % rv.type)
+
+    if len(rv.p.MGs) != num_inputs or len(pseudo_outs) != num_inputs:
+        raise ValueError("Bad MGs size")
+
+    jobs = []
+    for idx in range(num_inputs):
+        mg = rv.p.MGs[idx]
+        ring = mix_ring[idx]
+        if len(mg.ss) != len(ring) or any(len(x) != 2 for x in mg.ss):
+            raise ValueError("Bad rv.ss size")
+        buff = _pack_mg_simple(mg, tx.vin[idx].k_image, ring, pseudo_outs[idx])
+        jobs.append((len(ring), buff))
+
+    workers = workers if workers else (os.cpu_count() or 1)
+    if executor is None and (workers == 1 or num_inputs == 1):
+        for ring_size, buff in jobs:
+            try:
+                if not _ver_mg_simple_worker(message, ring_size, buff):
+                    return False
+            except Exception:
+                return False
+        return True
+
+    own_executor = executor is None
+    if own_executor:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=min(workers, num_inputs))
+
+    futures = [
+        asyncio.wrap_future(
+            executor.submit(_ver_mg_simple_worker, message, ring_size, buff)
+        )
+        for ring_size, buff in jobs
+    ]
+    try:
+        pending = futures
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for fut in done:
+                try:
+                    if not fut.result():
+                        return False
+                except Exception:
+                    return False
+        return True
+
+    finally:
+        # do not wait for the running jobs after the first failure
+        for fut in futures:
+            fut.cancel()
+        if own_executor:
+            executor.shutdown(wait=False)
+
+
 def ecdh_encode(unmasked, receiver_pk=None, derivation=None):
     """
     Elliptic Curve Diffie-Helman: encodes and decodes the amount b and mask a
@@ -24,6 +24,25 @@ def recode_ecdh(ecdh, encode=True):
     return ecdh
 
 
+def recode_clsag(sigs, encode=True):
+    """
+    Recodes CLSAG signatures from raw forms to bytearrays so it works with serialization
+    :param sigs:
+    :param encode: if true encodes to byte representation, otherwise decodes from byte representation
+    :return:
+    """
+    recode_int = crypto.encodeint if encode else crypto.decodeint
+    recode_point = crypto.encodepoint if encode else crypto.decodepoint
+    for sig in sigs:
+        sig.c1 = recode_int(sig.c1)
+        sig.D = recode_point(sig.D)
+        if getattr(sig, "I", None):
+            sig.I = recode_point(sig.I)
+        for i in range(len(sig.s)):
+            sig.s[i] = recode_int(sig.s[i])
+    return sigs
+
+
 def recode_msg(mgs, encode=True):
     """
     Recodes MGs signatures from raw forms to bytearrays so it works with serialization
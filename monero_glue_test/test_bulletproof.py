@@ -3,6 +3,8 @@
 # Author: Dusan Klinec, ph4r05, 2018
 
 import binascii
+import os
+import tempfile
 from binascii import unhexlify
 import unittest
 
@@ -498,6 +500,210 @@ class BulletproofTest(aiounittest.AsyncTestCase):
         )
         self.assertEqual(res, res2)
 
+    def test_multiexp_pippenger(self):
+        self.skip_if_cannot_test()
+        scalars = [crypto.random_scalar() for _ in range(40)] + [crypto.sc_init(0)]
+        points = [crypto.scalarmult_base(crypto.random_scalar()) for _ in range(41)]
+        muex = bp.MultiExp(scalars=[crypto.encodeint(x) for x in scalars],
+                           points=[crypto.encodepoint(x) for x in points])
+
+        res = bp.multiexp(None, muex, low_mem=True)
+        self.assertEqual(res, bp.multiexp(None, muex, low_mem=False))
+        self.assertEqual(res, bp.multiexp_pippenger(None, muex, mem_cap=16))
+        self.assertEqual(res, bp.multiexp_straus(None, muex))
+        self.assertEqual(res, bp.multiexp_straus(None, muex, window=3))
+        self.assertEqual(res, bp.multiexp_naive(None, muex))
+
+    def test_multiexp_crossover(self):
+        self.skip_if_cannot_test()
+        naive_max, straus_max = bp.multiexp_crossover()
+        self.assertLessEqual(naive_max, straus_max)
+
+        res, timings = bp.multiexp_calibrate(sizes=(1, 2), store=False)
+        self.assertEqual(len(timings), 2)
+        self.assertEqual(len(timings[1]), 3)
+        self.assertLessEqual(res[0], res[1])
+
+    def test_gen_table(self):
+        self.skip_if_cannot_test()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        fname = os.path.join(tmpdir.name, "gens.bin")
+
+        size = 258
+        bp.BpGenTable.generate(fname, size)
+        table = bp.BpGenTable().load(fname)
+        self.addCleanup(table.close)
+        self.assertEqual(table.size, size)
+        self.assertTrue(table.has_xy())
+
+        Gi, Hi = bp.init_exponents(size)
+        for i in (0, 1, 255, 256, 257):
+            self.assertEqual(bytes(Gi[i]), bytes(table.Gi[i]))
+            self.assertEqual(bytes(Hi[i]), bytes(table.Hi[i]))
+            self.assertEqual(
+                crypto.encodepoint(table.decodepoint(Hi[i])), bytes(Hi[i])
+            )
+        self.assertIsNone(table.decodepoint(bp.XMR_H))
+
+        try:
+            bp.set_gen_table(table)
+            bpi = bp.BulletProofBuilder()
+            self.assertIs(bpi.Gprec, table.Gi)
+            bpi.verify_batch([self.bproof_1(), self.bproof_2()])
+            with self.assertRaises(Exception):
+                bpi.verify_batch([self.bproof_2_invalid()])
+        finally:
+            bp.set_gen_table(None)
+
+        # multiexp point decoding loads the table from the environment
+        os.environ[bp.BP_GEN_TABLE_ENV] = fname
+        try:
+            pt = bp._decodepoint(Hi[257])
+            self.assertIsNotNone(bp._gen_table)
+            self.assertEqual(crypto.encodepoint(pt), bytes(Hi[257]))
+            bp._gen_table.close()
+        finally:
+            del os.environ[bp.BP_GEN_TABLE_ENV]
+            bp.set_gen_table(None)
+
+        with open(fname, "r+b") as fh:
+            fh.seek(bp.BP_GEN_TABLE_HEADER_SIZE + 100)
+            b = fh.read(1)
+            fh.seek(bp.BP_GEN_TABLE_HEADER_SIZE + 100)
+            fh.write(bytes([b[0] ^ 1]))
+        with self.assertRaises(ValueError):
+            bp.BpGenTable().load(fname)
+
+    def test_verify_batch_parallel(self):
+        self.skip_if_cannot_test()
+        bpi = bp.BulletProofBuilder()
+        self.assertTrue(bpi.verify_batch_parallel([self.bproof_1()], workers=2))
+        self.assertTrue(
+            bpi.verify_batch_parallel(
+                [self.bproof_1(), self.bproof_2(), self.bproof_2()], workers=2
+            )
+        )
+        with self.assertRaises(ValueError):
+            bpi.verify_batch_parallel(
+                [self.bproof_1(), self.bproof_2_invalid()], workers=2
+            )
+
+    def test_proving_service(self):
+        self.skip_if_cannot_test()
+        jobs = [
+            ([123], [crypto.sc_init(432)]),
+            ([7, (1 << 30) + 16], [crypto.random_scalar(), crypto.random_scalar()]),
+        ]
+
+        bpi = bp.BulletProofBuilder()
+        with bp.BulletProofProvingService(workers=2, max_pending=1) as svc:
+            proofs = svc.prove_all(jobs)
+
+        self.assertEqual(len(proofs), len(jobs))
+        for proof, (amounts, masks) in zip(proofs, jobs):
+            self.assertEqual(len(proof.V), len(amounts))
+            for i in range(len(amounts)):
+                C = crypto.gen_c(masks[i], amounts[i])
+                C = crypto.scalarmult(C, crypto.sc_inv_eight())
+                self.assertEqual(crypto.encodepoint(C), bytes(proof.V[i]))
+            self.assertTrue(bpi.verify(proof))
+
+    def test_invert_batch(self):
+        self.skip_if_cannot_test()
+        xs = bp.KeyV(7)
+        for i in range(len(xs)):
+            bp.sc_gen(xs[i])
+
+        res = bp.invert_batch(None, xs)
+        for i in range(len(xs)):
+            self.assertEqual(bp.invert(None, xs[i]), res.to(i))
+
+    def test_scalar_vector(self):
+        self.skip_if_cannot_test()
+        a = bp.KeyV(8)
+        b = bp.KeyV(8)
+        for i in range(len(a)):
+            bp.sc_gen(a[i])
+            bp.sc_gen(b[i])
+
+        sa = bp.ScalarVector.decode(a)
+        sb = bp.ScalarVector.decode(b)
+        self.assertEqual(sa.encode().d, a.d)
+        self.assertEqual(
+            crypto.encodeint(sa.inner_product(sb)), bp.inner_product(a, b)
+        )
+        self.assertEqual(
+            sa.hadamard(sb).encode().d, bp.hadamard(a, b).d
+        )
+
+        x = crypto.random_scalar()
+        self.assertEqual(
+            bp.ScalarVector.powers(x, 5).encode().d,
+            bp.vector_powers(crypto.encodeint(x), 5).d,
+        )
+
+        self.assertEqual(
+            bp.cross_inner_product(sa, sb, sb, sa),
+            bp.cross_inner_product(a, b, b, a),
+        )
+
+        y = crypto.random_scalar()
+        sa.fold(x, y)
+        bp.scalar_fold(sb, crypto.encodeint(x), crypto.encodeint(y))
+        bp.scalar_fold(a, crypto.encodeint(x), crypto.encodeint(y))
+        bp.scalar_fold(b, crypto.encodeint(x), crypto.encodeint(y))
+        self.assertEqual(len(sa), 4)
+        for i in range(len(sa)):
+            self.assertEqual(sa.to(i), a.to(i))
+            self.assertEqual(sb.to(i), b.to(i))
+
+    def test_challenge_products(self):
+        self.skip_if_cannot_test()
+        rounds = 4
+        w = bp.KeyV(rounds)
+        winv = bp.KeyV(rounds)
+        for i in range(rounds):
+            bp.sc_gen(w[i])
+            bp.invert(winv[i], w[i])
+
+        chprod = bp.challenge_products(w, winv, rounds)
+        chprod_sc = bp.challenge_products(w, winv, rounds, native=True)
+        for i in range(1 << rounds):
+            exp = bp.init_key(bp.ONE)
+            for j in range(rounds):
+                bp.sc_mul(exp, exp, w[j] if i & (1 << (rounds - 1 - j)) else winv[j])
+            self.assertEqual(exp, chprod.to(i))
+            self.assertEqual(exp, chprod_sc.to(i))
+
+    def test_verify_batch_low_mem(self):
+        self.skip_if_cannot_test()
+        bpi = bp.BulletProofBuilder()
+        bpi.low_mem = True
+        bpi.verify_batch([self.bproof_1()])
+        bpi.verify_batch([self.bproof_1(), self.bproof_2()])
+        with self.assertRaises(Exception):
+            bpi.verify_batch([self.bproof_2_invalid()])
+
+    def test_prove_low_mem(self):
+        """
+        Host mode works on native scalar vectors, low memory mode on encoded keys,
+        proofs of one mode verify in the other one.
+        """
+        self.skip_if_cannot_test()
+        sv = [crypto.sc_init(123), crypto.sc_init(768)]
+        gamma = [crypto.sc_init(456), crypto.sc_init(901)]
+
+        bpi = bp.BulletProofBuilder()
+        bpi_low = bp.BulletProofBuilder()
+        bpi_low.low_mem = True
+
+        proof = bpi.prove_batch(sv, gamma)
+        proof_low = bpi_low.prove_batch(sv, gamma)
+        bpi_low.verify(proof)
+        bpi.verify(proof_low)
+        bpi.verify_batch([proof, proof_low])
+
     def test_prove_batch(self):
         self.skip_if_cannot_test()
         bpi = bp.BulletProofBuilder()
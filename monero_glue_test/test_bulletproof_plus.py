@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+
+import unittest
+
+import aiounittest
+
+from monero_glue.agent import agent_lite
+from monero_glue.xmr import crypto, ring_ct
+from monero_glue.xmr import bulletproof_plus as bpp
+
+
+class BulletproofPlusTest(aiounittest.AsyncTestCase):
+    """Simple tests"""
+
+    def __init__(self, *args, **kwargs):
+        super(BulletproofPlusTest, self).__init__(*args, **kwargs)
+
+    def can_test(self):
+        return crypto.get_backend().has_crypto_into_functions()
+
+    def skip_if_cannot_test(self):
+        if not self.can_test():
+            self.skipTest("Crypto backend does not implement required functions")
+
+    def test_prove(self):
+        self.skip_if_cannot_test()
+        bpi = bpp.BulletProofPlusBuilder()
+        proof = bpi.prove(crypto.sc_init(123456), crypto.sc_init(789))
+        self.assertEqual(len(proof.L), 6)
+        self.assertTrue(bpi.verify(proof))
+
+    def test_prove_batch(self):
+        self.skip_if_cannot_test()
+        bpi = bpp.BulletProofPlusBuilder()
+        sv = [crypto.sc_init(0), crypto.sc_init((1 << 64) - 1)]
+        gamma = [crypto.sc_init(456), crypto.sc_init(901)]
+        proof = bpi.prove_batch(sv, gamma)
+        self.assertEqual(len(proof.L), 7)
+        self.assertTrue(bpi.verify(proof))
+
+    def test_verify_batch(self):
+        self.skip_if_cannot_test()
+        bpi = bpp.BulletProofPlusBuilder()
+        proof1 = bpi.prove(crypto.sc_init(123), crypto.sc_init(456))
+        proof2 = bpi.prove_batch(
+            [crypto.sc_init(1), crypto.sc_init(2), crypto.sc_init(3)],
+            [crypto.sc_init(4), crypto.sc_init(5), crypto.sc_init(6)],
+        )
+        self.assertTrue(bpi.verify_batch([proof1, proof2]))
+
+    def test_verify_invalid(self):
+        self.skip_if_cannot_test()
+        bpi = bpp.BulletProofPlusBuilder()
+        proof = bpi.prove(crypto.sc_init(123), crypto.sc_init(456))
+
+        one = crypto.sc_init(1)
+        proof.s1 = crypto.encodeint(crypto.sc_add(crypto.decodeint(proof.s1), one))
+        with self.assertRaises(ValueError):
+            bpi.verify(proof)
+
+        proof = bpi.prove(crypto.sc_init(123), crypto.sc_init(456))
+        proof.V = [proof.V[0], proof.V[0]]
+        with self.assertRaises(ValueError):
+            bpi.verify(proof)
+
+    async def test_ring_ct(self):
+        self.skip_if_cannot_test()
+        mask = crypto.sc_init(999)
+        C, mask, proof = await ring_ct.prove_range_bp_plus(1000, mask)
+        self.assertTrue(crypto.point_eq(C, crypto.gen_c(mask, 1000)))
+        res = await ring_ct.verify_bp_plus(proof, [1000], [mask])
+        self.assertTrue(res)
+
+    def test_rsig_type(self):
+        self.assertEqual(agent_lite.get_rsig_type(True, 2, use_bp_plus=True), 4)
+        self.assertEqual(agent_lite.generate_rsig_batch_sizes(4, 5), [5])
+        with self.assertRaises(ValueError):
+            agent_lite.get_rsig_type(True, 17, use_bp_plus=True)
+
+
+if __name__ == "__main__":
+    unittest.main()  # pragma: no cover
@@ -0,0 +1,405 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+
+import binascii
+import unittest
+
+from monero_glue.agent import agent_lite
+from monero_glue.hwtoken import iface, misc, token
+from monero_glue.messages import MoneroTransactionData, MoneroTransactionRsigData
+from monero_glue.messages.MoneroRctKeyPublic import MoneroRctKeyPublic
+from monero_glue.protocol.tsx_sign_builder import TTransactionBuilder
+from monero_glue.xmr import crypto, mlsag2, monero, wallet
+from monero_glue.xmr.sub.recode import recode_clsag, recode_msg
+from monero_glue_test.base_agent_test import BaseAgentTest
+from monero_serialize import xmrserialize, xmrtypes
+
+
+class ClsagTest(BaseAgentTest):
+    """CLSAG ring signatures, checked against MLSAG on the same rings"""
+
+    def __init__(self, *args, **kwargs):
+        super(ClsagTest, self).__init__(*args, **kwargs)
+
+    def gen_ring(self, n, index, amount):
+        """
+        Ring of n members, the real one at index
+        :return: (secret CtKey, public keys, pseudo out mask, pseudo out)
+        """
+        sk = misc.StdObj(dest=crypto.random_scalar(), mask=crypto.random_scalar())
+        pubs = []
+        for i in range(n):
+            if i == index:
+                P = crypto.scalarmult_base(sk.dest)
+                C = crypto.gen_c(sk.mask, amount)
+            else:
+                P = crypto.scalarmult_base(crypto.random_scalar())
+                C = crypto.gen_c(crypto.random_scalar(), amount + i + 1)
+            pubs.append(
+                MoneroRctKeyPublic(
+                    dest=crypto.encodepoint(P), commitment=crypto.encodepoint(C)
+                )
+            )
+
+        a = crypto.random_scalar()
+        return sk, pubs, a, crypto.gen_c(a, amount)
+
+    def test_clsag(self):
+        message = crypto.keccak_hash(b"clsag")
+        for n, index in [(1, 0), (2, 1), (11, 0), (11, 5), (11, 10)]:
+            sk, pubs, a, cout = self.gen_ring(n, index, 10)
+            sig, _ = mlsag2.prove_rct_clsag_simple(
+                message, pubs, sk, a, cout, None, None, index
+            )
+            self.assertEqual(len(sig.s), n)
+            self.assertTrue(mlsag2.ver_rct_clsag_simple(message, sig, pubs, cout))
+
+            other = crypto.keccak_hash(b"other")
+            self.assertFalse(mlsag2.ver_rct_clsag_simple(other, sig, pubs, cout))
+
+    def test_clsag_mlsag(self):
+        """
+        Both signatures over the same ring and key verify, key images match
+        """
+        message = crypto.keccak_hash(b"clsag-mlsag")
+        sk, pubs, a, cout = self.gen_ring(11, 3, 1000)
+
+        mg, _ = mlsag2.prove_rct_mg_simple(message, pubs, sk, a, cout, None, None, 3)
+        sig, _ = mlsag2.prove_rct_clsag_simple(
+            message, pubs, sk, a, cout, None, None, 3
+        )
+        self.assertTrue(mlsag2.ver_rct_mg_simple(message, mg, pubs, cout))
+        self.assertTrue(mlsag2.ver_rct_clsag_simple(message, sig, pubs, cout))
+        self.assertTrue(crypto.point_eq(mg.II[0], sig.I))
+
+    def test_clsag_tampered(self):
+        message = crypto.keccak_hash(b"clsag-tamper")
+        sk, pubs, a, cout = self.gen_ring(4, 2, 50)
+        sig, _ = mlsag2.prove_rct_clsag_simple(
+            message, pubs, sk, a, cout, None, None, 2
+        )
+
+        # pseudo out commits to a different amount
+        bad_cout = crypto.gen_c(a, 51)
+        self.assertFalse(mlsag2.ver_rct_clsag_simple(message, sig, pubs, bad_cout))
+
+        # ring member replaced
+        bad_pubs = list(pubs)
+        bad_pubs[0] = MoneroRctKeyPublic(
+            dest=crypto.encodepoint(crypto.scalarmult_base(crypto.random_scalar())),
+            commitment=pubs[0].commitment,
+        )
+        self.assertFalse(mlsag2.ver_rct_clsag_simple(message, sig, bad_pubs, cout))
+
+        # secret key not matching the real member
+        bad_sk = misc.StdObj(dest=crypto.random_scalar(), mask=sk.mask)
+        bad_sig, _ = mlsag2.prove_rct_clsag_simple(
+            message, pubs, bad_sk, a, cout, None, None, 2
+        )
+        self.assertFalse(mlsag2.ver_rct_clsag_simple(message, bad_sig, pubs, cout))
+
+        with self.assertRaises(ValueError):
+            mlsag2.ver_rct_clsag_simple(message, sig, pubs[:3], cout)
+
+    async def test_clsag_serialize(self):
+        message = crypto.keccak_hash(b"clsag-ser")
+        sk, pubs, a, cout = self.gen_ring(5, 1, 7)
+        sig, _ = mlsag2.prove_rct_clsag_simple(
+            message, pubs, sk, a, cout, None, None, 1
+        )
+        key_image = sig.I
+
+        buff = await misc.dump_msg(recode_clsag([sig])[0])
+        self.assertEqual(len(buff), 1 + 5 * 32 + 2 * 32)
+
+        sig2 = await misc.parse_msg(buff, mlsag2.Clsag())
+        sig2 = recode_clsag([sig2], encode=False)[0]
+        sig2.I = key_image
+        self.assertTrue(mlsag2.ver_rct_clsag_simple(message, sig2, pubs, cout))
+
+    def verify_monero_vector(self, vector):
+        """
+        CLSAG generated by Monero, D is stored as D / 8
+        :param vector: dict of hex values
+        :return:
+        """
+        unhex = binascii.unhexlify
+        message = unhex(vector["msg"])
+        pubs = [
+            MoneroRctKeyPublic(dest=unhex(P), commitment=unhex(C))
+            for P, C in vector["ring"]
+        ]
+        cout = crypto.decodepoint(unhex(vector["cout"]))
+        sig = mlsag2.Clsag(
+            s=[crypto.decodeint(unhex(x)) for x in vector["ss"]],
+            c1=crypto.decodeint(unhex(vector["sc1"])),
+            D=crypto.decodepoint(unhex(vector["sD"])),
+            I=crypto.decodepoint(unhex(vector["sI"])),
+        )
+        self.assertTrue(mlsag2.ver_rct_clsag_simple(message, sig, pubs, cout))
+
+        other = crypto.keccak_hash(b"other")
+        self.assertFalse(mlsag2.ver_rct_clsag_simple(other, sig, pubs, cout))
+
+        bad_pubs = list(pubs)
+        bad_pubs[3], bad_pubs[4] = bad_pubs[4], bad_pubs[3]
+        self.assertFalse(mlsag2.ver_rct_clsag_simple(message, sig, bad_pubs, cout))
+
+        bad_cout = crypto.point_add(cout, crypto.xmr_H())
+        self.assertFalse(mlsag2.ver_rct_clsag_simple(message, sig, pubs, bad_cout))
+
+    def test_monero_vector_01(self):
+        self.verify_monero_vector(
+            {
+                "msg": "0100000000000000000000000000000000000000000000000000000000000000",
+                "cout": "8e3afb92d8ae1264417489259e38f7205a62baea86ae9592cd91988b9cc48102",
+                "sI": "a1c7f4a316ddd16374fe495d402be60566047ae5a1352554e98ebff118705303",
+                "sD": "cd80b5c7f3f597de6e20bcef669a4ba9eb3eb89ead12ab1c24c92acd609afcb2",
+                "sc1": "cf4f48ed60771d4e8d02e9e0af37281ceeb66573bd528ac256a7e17794a75602",
+                "ss": [
+                    "aaeffa564b5b0ff1e4ed72c9b595cd0241ac64eeb41b902a35688e369922d704",
+                    "1defc134a853252d734d19b29d8f2fabc85a8ae24ebcf8f050d4daf8a335e901",
+                    "cdf9ac576f0c7ceb7eb22c1a1254a801d0d2915e59870be8b1ab68cd1281120d",
+                    "d1973493d8224aaa9732878b9a88d448ea16185f94e5bafd82816277682fa108",
+                    "a130e076845e512687575942bf3694bcb44eb19eb1181af9a1fc2254949b7c0f",
+                    "26f5b6ea154d6bd4a969c742563d75f1bfcd5ded3af78669e45ba95e76c48605",
+                    "5b695d3be46b826fd11e043028dee2aa25cf36910e86537fcd1cd3f5cb49650e",
+                    "37e811ebb4a2b9c35556b4af911a03a93468f599956c034092c3ece9e1169208",
+                    "a361ceec9aacd65da6d3e686fbcd0c1aef26096321be7f01653157ee6096a201",
+                    "f9b762ef1df69bb12ca76a97dce11f7840b8ec63c3dc2683f7ae71cb79c49103",
+                    "ea010fa6a35f3bd3d7899a7a2a8df4d3ef9c9dfbbd56fe43ff5c7442821d3508",
+                ],
+                "ring": [
+                    (
+                        "241c0295b4c3a149e5ac7997963e125d0fc6cc8adad9349df3b01ff611936c87",
+                        "3a24a4c418ccb2ceb83672d01534a73ff1e9f548937d5ddd7f1971c9b398868c",
+                    ),
+                    (
+                        "ec432ccfbf730077cb2d8c59968e2796148a590eec7928ecf268d883ced0de5b",
+                        "2973d6e9c27538fd0f7c003e014311e9403dcb6e7d86b66df65176a579943bda",
+                    ),
+                    (
+                        "0cfeafc313a6a2e60110778d53d61fa1705e9049b8afba0f51c1127f6855c07f",
+                        "ffa4d4c77202907832294243a96886920017b67fbe5b3800bcc1457c4a4a1ff0",
+                    ),
+                    (
+                        "bd4eca22dc010a214524901b88bdda27e427217ff784c47520ee76743caba036",
+                        "e07135f8398459133c2969184e70610b9b995f73e44acf54b6eaed6227e68bbc",
+                    ),
+                    (
+                        "73c8d57d0128c99fc2ab0be8cee5fe5c1288b98e51822a6681846035fcc53fea",
+                        "2987499fde3f4353013206d89fe2d7c6ad3cd9a66c9a36d17749e39112513572",
+                    ),
+                    (
+                        "385c538901b79c6bd2ddea5191e808b1414c9dfdcaf424841d843dd788cb89ad",
+                        "ec5f987fe138c6cb1d47ff75d77852b7c0a94ba1f0b93d22c0463f75986605bd",
+                    ),
+                    (
+                        "fed06cb761745a6f087d1af13f84670ecbf1523d72b46e8bd0698d1cdfb398bc",
+                        "5d81df981fb885f947b9404cb63cb06fe4e001be281f2bdfb3c638d54ec6e49e",
+                    ),
+                    (
+                        "667d1edfb83a17bd81fcf7831362b6c9038f26340ee1fe56d41f62cb0b32e989",
+                        "e9ceba97867b43cd5420c94fa61cc5f11e440e261df74dfc8b1c07ec4b13aa3c",
+                    ),
+                    (
+                        "e1e76da5bd52fc065f9af40efde5f733f9673974d14c6af8d200d8576ac3a90d",
+                        "97358d6ddad38b2707fb864bfcaaab935851af66d50bcbac569d159d740bdf71",
+                    ),
+                    (
+                        "4fd5d0db88283c63905d5095a76b11a75337e43f403f8469175ba9c49741552e",
+                        "af0ab85872a6355d5c82c1f9a2a41488146e19b272887a1f7385cc26bef3f1d8",
+                    ),
+                    (
+                        "37e1a4c49a22340fa5ac2c22c1b7a891e7191cdc53911700a317c0d8b92bbf4e",
+                        "5c89d29dad77de7d76ece8bb81c7c8cd15008f63c5a14ab1c984b3833e7bbce3",
+                    ),
+                ],
+            }
+        )
+
+    def test_monero_vector_02(self):
+        self.verify_monero_vector(
+            {
+                "msg": "0100000000000000000000000000000000000000000000000000000000000000",
+                "cout": "fdf2503d3217dbf73ababd16f5ab5a63d64c047db1d02b0888a50d2570f3a793",
+                "sI": "917fdd3086c056503ffdb1840f03c78d48bfe6d9d60b4efb194bd9798d03acaa",
+                "sD": "769d0ca9b272ac02c5efad7df6b5c00f2995c99ca80f4597136decba9a0dd36f",
+                "sc1": "fe5c7eb39a32d2aea12e6d127d847b72ea810bfbf3d5bbe23c40e7abdd12900e",
+                "ss": [
+                    "da2940c66cc2405032d959325c8804e216f76b36e71b2ae6b76417ed9c10a80a",
+                    "ca763505c2e5ebacf72098f8cba89ea6826aa448501f03d439c7a838a88bba0e",
+                    "b2eadee4c121e85b0c2a09d56c665ba19ee8ebc451f1e9e96cf72c874f945104",
+                    "5a79523fdc0df9a54ab3937c878bd5a02e62bff77efc338728deb060ecda4509",
+                    "dfadddc51866cde5206269270f44ca2f6350ca0b1328a968773fcacf57031502",
+                    "a964f3549a10fc8bdb2f8217df0e9b08e90477be19a665b94b73ce417622450b",
+                    "48e805427109268b04bf378c869501dbebb79c0cbe664bf7eb0ca222376d1c0f",
+                    "33f36d9a699e92a66d4b9fdf6c1123ae99701b117fbe8f0af9faec51e45eb409",
+                    "25ef746a03aaf59701d1d47ea3b9e9f092662cebc9d44902ce18e81cc5035f01",
+                    "2ba3022d4f9b57da7429499715592073f1608cf270318840a5fd3890bbf5950a",
+                    "8149ec0d965c9881d6a4adedca7d3c9090359dbfae56dbab526be102722aab09",
+                ],
+                "ring": [
+                    (
+                        "081b048be784e1ff6f3b7ebe602690c27723b5d9952405bcdcbed31d16125067",
+                        "6090eccb73d2e1fc7bc7644a4fad04e5fe93d953a1258307c44d5b23cd636bf9",
+                    ),
+                    (
+                        "e2f0f100f1634d7c7dd5a09bc6dd7ee53506d73536aa743e8ea049528e4cb2aa",
+                        "632438f9aeda72eb9c6c434391cf9fa2f71788bea598a5d5729a5d502865932a",
+                    ),
+                    (
+                        "6744197cfde37ad1901d518f112c0f4d820c23122a016949e300eec2ab88916c",
+                        "1b251d5b32e22de29a4f99a0ed1de32754636175075e21b25d7283036eb85541",
+                    ),
+                    (
+                        "0e86bb7ee0b4728f2fedde7ac5019b54de7b2bb19b44d1864e6346dac6c171ab",
+                        "5a3c85e93890f802d4148140733dcdcd676353fce1bd774ce28034fc2ec00253",
+                    ),
+                    (
+                        "1847ce49d9552651395b2fa80637c131a31036f0bfc5abb63526701cd1a32320",
+                        "a9cb55bc24e6e1fb894c511f2edd4b7bda4c75a608657d952e85bab83ec98a52",
+                    ),
+                    (
+                        "5c5d0b678f5045b0304e3c48027bd7e9ccaee1dac4449ed1f34b204868ca5651",
+                        "badf83ccba38f2194f924a4f7fb7c2fd966b1e16c1fddeb3658033aa009febe0",
+                    ),
+                    (
+                        "81961aa4c241a91d498d8f3057b31373d9fc72b6e7d7f98bf497e3dfe705eeaa",
+                        "a0e632fbb801d6bce99ef97d7bb6acd945aff5cd7fab56c0e6fec6900a3babd7",
+                    ),
+                    (
+                        "cbd89f10ddf152bd9c756d145ef4cda1d56a31f1e1936759bee04b7a8a815c76",
+                        "8b835b8180f36e79ba79528e0d3401f439cc1c7f99e4bcfb3cb4aa2b60b1afc1",
+                    ),
+                    (
+                        "a7bc55e955a825730f5dcdc3f8126717d7647cbca8a6b90e08b77269aeed3533",
+                        "8da31e80698c9b5181b2e8d9773136083a34e3e72c92134d8201d9c368d89284",
+                    ),
+                    (
+                        "a7902cec90d3f2de25c8ddc87075159fd00f219a51a1e7dcac17c2b8a91887e9",
+                        "2b1e848b6649abefbd6b399504a169252358e7ff6bde8fa7a773b9cf0a167069",
+                    ),
+                    (
+                        "9fc3d5fb7de8cfc59982f7b20f3f5c145ad191088e7f59c10908dc5d55863bee",
+                        "b8de2bc9bb46d475007230a92af14afb6f9dd2804b5c31355a282b40ccdadc92",
+                    ),
+                ],
+            }
+        )
+
+    async def load_trezor_tx(self, fl="tsx_t_uns_01.txt"):
+        """
+        First transaction of the unsigned test fixture, with Bulletproofs
+        """
+        creds = self.get_trezor_creds(0)
+        unsigned_tx = await wallet.load_unsigned_tx(
+            creds.view_key_private, self.get_data_file(fl)
+        )
+        tx = unsigned_tx.txes[0]
+        tx.use_rct = False
+        tx.use_bulletproofs = True
+        return creds, unsigned_tx, tx
+
+    async def init_builder(self, hard_fork):
+        """
+        Transaction builder initialized with the fixture transaction
+        :param hard_fork: tsx_data.hard_fork
+        :return: (builder, init result)
+        """
+        creds, _, tx = await self.load_trezor_tx()
+
+        tsx_data = MoneroTransactionData()
+        tsx_data.version = 1
+        tsx_data.payment_id = []
+        tsx_data.unlock_time = tx.unlock_time
+        tsx_data.outputs = [
+            misc.translate_monero_dest_entry_pb(x) for x in tx.splitted_dsts
+        ]
+        tsx_data.change_dts = misc.translate_monero_dest_entry_pb(tx.change_dts)
+        tsx_data.num_inputs = len(tx.sources)
+        tsx_data.mixin = len(tx.sources[0].outputs)
+        tsx_data.fee = sum([x.amount for x in tx.sources]) - sum(
+            [x.amount for x in tx.splitted_dsts]
+        )
+        tsx_data.account = tx.subaddr_account
+        tsx_data.minor_indices = tx.subaddr_indices
+        tsx_data.rsig_data = MoneroTransactionRsigData(
+            rsig_type=1, grouping=[1] * len(tsx_data.outputs)
+        )
+        tsx_data.hard_fork = hard_fork
+
+        builder = TTransactionBuilder(
+            trezor=misc.StdObj(iface=iface.TokenInterface()), creds=creds
+        )
+        return builder, await builder.init_transaction(tsx_data)
+
+    async def test_builder_hard_fork(self):
+        """
+        CLSAG transactions are rejected by the builder, MLSAG is used below
+        """
+        with self.assertRaises(misc.TrezorError):
+            await self.init_builder(monero.HF_VERSION_CLSAG)
+
+        for hard_fork in [None, monero.HF_VERSION_CLSAG - 1]:
+            builder, res = await self.init_builder(hard_fork)
+            self.assertEqual(len(res.hmacs), builder.num_dests())
+            self.assertEqual(builder.get_rct_type(), xmrtypes.RctType.FullBulletproof)
+
+    async def test_mlsag_signed_tx(self):
+        """
+        CLSAG over the rings of a MLSAG-signed transaction: the same key
+        images, signed and verified with the transaction pre-MLSAG hash
+        """
+        creds, unsigned_tx, tx = await self.load_trezor_tx()
+        trezor = token.TokenLite()
+        trezor.creds = creds
+        agent = agent_lite.Agent(trezor)
+        txes = await agent.sign_unsigned_tx(unsigned_tx)
+        con_data = agent.last_transaction_data()
+
+        tx_obj = xmrtypes.Transaction()
+        reader = xmrserialize.MemoryReaderWriter(bytearray(txes[0]))
+        await xmrserialize.Archive(reader, False).message(tx_obj)
+        monero.expand_transaction(tx_obj)
+        rv = tx_obj.rct_signatures
+        rv.message = con_data.tx_prefix_hash
+        message = await monero.get_pre_mlsag_hash(rv)
+        recode_msg(rv.p.MGs, encode=False)
+
+        subaddresses = monero.compute_subaddresses(
+            creds, tx.subaddr_account, tx.subaddr_indices
+        )
+        for idx, src in enumerate(con_data.tx_data.sources):
+            pubs = [
+                MoneroRctKeyPublic(dest=x[1].dest, commitment=x[1].mask)
+                for x in src.outputs
+            ]
+            pseudo_out = crypto.decodepoint(bytes(rv.p.pseudoOuts[idx]))
+            self.assertTrue(
+                mlsag2.ver_rct_mg_simple(message, rv.p.MGs[idx], pubs, pseudo_out)
+            )
+
+            xi, ki, _ = monero.generate_key_image_helper(
+                creds,
+                subaddresses,
+                crypto.decodepoint(src.outputs[src.real_output][1].dest),
+                crypto.decodepoint(src.real_out_tx_key),
+                [crypto.decodepoint(x) for x in src.real_out_additional_tx_keys],
+                src.real_output_in_tx_index,
+            )
+            self.assertEqual(bytes(crypto.encodepoint(ki)), tx_obj.vin[idx].k_image)
+
+            sk = misc.StdObj(dest=xi, mask=crypto.decodeint(src.mask))
+            a = crypto.random_scalar()
+            cout = crypto.gen_c(a, src.amount)
+            sig, _ = mlsag2.prove_rct_clsag_simple(
+                message, pubs, sk, a, cout, None, None, src.real_output
+            )
+            self.assertTrue(crypto.point_eq(sig.I, ki))
+            self.assertTrue(mlsag2.ver_rct_clsag_simple(message, sig, pubs, cout))
+
+
+if __name__ == "__main__":
+    unittest.main()  # pragma: no cover
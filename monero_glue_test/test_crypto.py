@@ -4,11 +4,14 @@
 
 import binascii
 from binascii import unhexlify
+import os
+import subprocess
+import sys
 import unittest
 
 import aiounittest
 from monero_glue.xmr import common, crypto
-from monero_glue.xmr.core import ec_py
+from monero_glue.xmr.core import ec_cache, ec_py
 
 
 class CryptoTest(aiounittest.AsyncTestCase):
@@ -53,6 +56,71 @@ class CryptoTest(aiounittest.AsyncTestCase):
             )
         )
 
+    def test_point_batch(self):
+        points = [crypto.scalarmult_base(crypto.random_scalar()) for _ in range(9)]
+        points.append(crypto.identity())
+        enc = crypto.encodepoint_batch(points)
+        self.assertEqual(enc, [crypto.encodepoint(x) for x in points])
+
+        dec = crypto.decodepoint_batch(enc)
+        self.assertEqual(len(dec), len(points))
+        for P, Q in zip(points, dec):
+            self.assertTrue(crypto.point_eq(P, Q))
+
+        self.assertEqual(crypto.encodepoint_batch([]), [])
+        self.assertEqual(crypto.decodepoint_batch([]), [])
+
+    def test_vector_ops(self):
+        n = 5
+        sa = [crypto.random_scalar() for _ in range(n)]
+        sb = [crypto.random_scalar() for _ in range(n)]
+        pa = [crypto.scalarmult_base(crypto.random_scalar()) for _ in range(n)]
+        pb = [crypto.scalarmult_base(crypto.random_scalar()) for _ in range(n)]
+        a = b"".join(crypto.encodeint(x) for x in sa)
+        b = b"".join(crypto.encodeint(x) for x in sb)
+        A = b"".join(crypto.encodepoint(x) for x in pa)
+        B = b"".join(crypto.encodepoint(x) for x in pb)
+        x, y = crypto.random_scalar(), crypto.random_scalar()
+
+        def scalars(buff):
+            return [crypto.decodeint(buff[32 * i : 32 * (i + 1)]) for i in range(n)]
+
+        def points(buff):
+            return [crypto.decodepoint(buff[32 * i : 32 * (i + 1)]) for i in range(n)]
+
+        for fnc, op in [
+            (crypto.sc_add_vect, crypto.sc_add),
+            (crypto.sc_sub_vect, crypto.sc_sub),
+            (crypto.sc_mul_vect, crypto.sc_mul),
+        ]:
+            res = scalars(fnc(bytearray(32 * n), a, b))
+            for i in range(n):
+                self.assertTrue(crypto.sc_eq(res[i], op(sa[i], sb[i])))
+
+        res = scalars(crypto.sc_scale_vect(bytearray(32 * n), a, x))
+        for i in range(n):
+            self.assertTrue(crypto.sc_eq(res[i], crypto.sc_mul(sa[i], x)))
+
+        ip = crypto.sc_0()
+        for i in range(n):
+            ip = crypto.sc_muladd(sa[i], sb[i], ip)
+        self.assertTrue(crypto.sc_eq(ip, crypto.sc_inner_product_vect(a, b)))
+
+        res = points(crypto.scalarmult_vect(bytearray(32 * n), A, x))
+        for i in range(n):
+            self.assertTrue(crypto.point_eq(res[i], crypto.scalarmult(pa[i], x)))
+
+        dst = bytearray(A)  # aliased destination
+        res = points(crypto.add_keys3_vect(dst, x, memoryview(dst), y, B))
+        for i in range(n):
+            exp = crypto.add_keys3(x, pa[i], y, pb[i])
+            self.assertTrue(crypto.point_eq(res[i], exp))
+
+        res = crypto.hash_to_point_vect(A)
+        for i in range(n):
+            exp = crypto.hash_to_point(crypto.encodepoint(pa[i]))
+            self.assertTrue(crypto.point_eq(res[i], exp))
+
     def test_scalarmult_base(self):
         scalar = crypto.decodeint(
             unhexlify(
@@ -78,6 +146,45 @@ class CryptoTest(aiounittest.AsyncTestCase):
         self.assertEqual(exp, crypto.encodepoint(res))
         self.assertTrue(crypto.point_eq(crypto.decodepoint(exp), res))
 
+    def test_scalarmult_base_table(self):
+        scalars = [0, 1, 2, 15, 16, 255, ec_py.l - 1, ec_py.l, (1 << 253) - 1]
+        scalars += [ec_py.random_scalar().v for _ in range(8)]
+        window = ec_py.BASE_TABLE_WINDOW
+        try:
+            for w in (1, 3, 4, 7):
+                ec_py.set_base_table_window(w)
+                for x in scalars:
+                    sc = ec_py.EdScalar(x)
+                    exp = ec_py.scalarmult(ec_py.BASE, sc)
+                    self.assertTrue(ec_py.point_eq(exp, ec_py.scalarmult_base(sc)))
+
+                    res = ec_py.new_point()
+                    ec_py.scalarmult_base_into(res, sc)
+                    self.assertTrue(ec_py.point_eq(exp, res))
+        finally:
+            ec_py.set_base_table_window(window)
+
+    def test_scalarmult_h(self):
+        H = crypto.xmr_H()
+        for amount in [0, 1, 15, 16, 123456789, (1 << 64) - 1]:
+            exp = crypto.scalarmult(H, crypto.sc_init(amount))
+            self.assertTrue(crypto.point_eq(exp, crypto.scalarmult_h(amount)))
+            self.assertTrue(
+                crypto.point_eq(exp, crypto.scalarmult_h(crypto.sc_init(amount)))
+            )
+
+            res = crypto.new_point()
+            crypto.scalarmult_h_into(res, amount)
+            self.assertTrue(crypto.point_eq(exp, res))
+
+            mask = crypto.random_scalar()
+            exp = crypto.point_add(crypto.scalarmult_base(mask), exp)
+            self.assertTrue(crypto.point_eq(exp, crypto.gen_c(mask, amount)))
+
+        x = crypto.random_scalar()
+        exp = crypto.scalarmult(H, x)
+        self.assertTrue(crypto.point_eq(exp, crypto.scalarmult_h(x)))
+
     def test_scalarmult(self):
         priv = unhexlify(
             b"3482fb9735ef879fcae5ec7721b5d3646e155c4fb58d6cc11c732c9c9b76620a"
@@ -231,6 +338,24 @@ class CryptoTest(aiounittest.AsyncTestCase):
             R_exp = crypto.point_add(crypto.scalarmult(A, a), crypto.scalarmult_base(b))
             self.assertTrue(crypto.point_eq(R, R_exp))
 
+    def test_ge25519_double_scalarmult_precomp(self):
+        A = crypto.scalarmult_base(crypto.random_scalar())
+        B = crypto.scalarmult_base(crypto.random_scalar())
+        Ai = crypto.ge_dsm_precomp(A)
+        Bi = crypto.ge_dsm_precomp(B)
+        scalars = [crypto.sc_init(0), crypto.sc_init(1), crypto.sc_init(16)]
+        scalars += [crypto.random_scalar() for _ in range(5)]
+        for a in scalars:
+            b = crypto.random_scalar()
+            R_exp = crypto.point_add(crypto.scalarmult(A, a), crypto.scalarmult(B, b))
+            R = crypto.ge_double_scalarmult_precomp_vartime2(a, Ai, b, Bi)
+            self.assertTrue(crypto.point_eq(R, R_exp))
+            R = crypto.ge_double_scalarmult_precomp_vartime(a, A, b, Bi)
+            self.assertTrue(crypto.point_eq(R, R_exp))
+
+            R_exp = crypto.point_add(crypto.scalarmult(A, b), crypto.scalarmult_base(a))
+            self.assertTrue(crypto.point_eq(crypto.add_keys2(a, b, A), R_exp))
+
     def test_pointadd(self):
         a = crypto.random_scalar()
         A = crypto.scalarmult_base(a)
@@ -257,7 +382,116 @@ class CryptoTest(aiounittest.AsyncTestCase):
             binascii.hexlify(crypto.encodeint(res)),
             b"bcf365a551e6358f3f281a6241d4a25eded60230b60a1d48c67b51a85e33d70e",
         )
-        
+
+    def test_sc_inversion_batch(self):
+        inp = [crypto.random_scalar() for _ in range(9)]
+        res = crypto.sc_inv_batch(inp)
+        self.assertEqual(len(res), len(inp))
+        for x, rx in zip(inp, res):
+            self.assertTrue(crypto.sc_eq(rx, crypto.sc_inv(x)))
+
+        # in-place
+        inp_enc = [crypto.encodeint(x) for x in inp]
+        crypto.sc_inv_batch_into(inp, inp)
+        for x, rx in zip(inp, res):
+            self.assertTrue(crypto.sc_eq(rx, x))
+
+        self.assertEqual(crypto.sc_inv_batch([]), [])
+        inp = [crypto.decodeint(x) for x in inp_enc]
+        inp[3] = crypto.sc_0()
+        with self.assertRaises(ValueError):
+            crypto.sc_inv_batch(inp)
+
+    def test_lazy_backend(self):
+        code = "\n".join(
+            [
+                "import sys",
+                "from monero_glue.xmr import crypto",
+                "assert not crypto.get_backend_loaded()",
+                "assert 'monero_glue.xmr.core.ec' not in sys.modules",
+                "a = crypto.xmr_base58_addr_encode_check(18, bytes(64))",
+                "assert crypto.xmr_base58_addr_decode_check(a)[1] == 18",
+                "assert not crypto.get_backend_loaded()",
+                "crypto.public_key(crypto.sc_init(1))",
+                "assert crypto.get_backend_loaded()",
+            ]
+        )
+        env = dict(os.environ)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env["PYTHONPATH"] = os.pathsep.join([root] + sys.path)
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self.assertEqual(0, proc.returncode, proc.stderr.decode("utf8"))
+        self.assertEqual(
+            crypto.public_key(crypto.sc_init(1)),
+            crypto.encodepoint(crypto.scalarmult_base(crypto.sc_init(1))),
+        )
+
+    def test_lru_cache(self):
+        cache = ec_cache.LruCache(2)
+        cache.put(b"a", 1)
+        cache.put(b"b", 2)
+        self.assertEqual(1, cache.get(b"a"))
+        cache.put(b"c", 3)  # evicts b
+        self.assertIsNone(cache.get(b"b"))
+        self.assertEqual(3, cache.get_or_compute(b"c", lambda: 0))
+        self.assertEqual(
+            {"hits": 2, "misses": 1, "size": 2, "maxsize": 2}, cache.stats()
+        )
+
+        cache.resize(0)
+        self.assertEqual(0, len(cache))
+        self.assertEqual(4, cache.get_or_compute(b"d", lambda: 4))
+        self.assertEqual(0, len(cache))
+
+    def test_hash_to_point_cache(self):
+        crypto.clear_caches()
+        keys = [
+            crypto.encodepoint(crypto.scalarmult_base(crypto.sc_init(i)))
+            for i in range(1, 4)
+        ]
+        pts = [crypto.hash_to_point(x) for x in keys[:2]]
+        self.assertTrue(crypto.point_eq(pts[0], crypto.hash_to_point(keys[0])))
+
+        # returned points are copies, the cache is not modified through them
+        crypto.point_add_into(pts[0], pts[0], pts[1])
+        vect = crypto.hash_to_point_vect(b"".join(keys))
+        crypto.point_add_into(vect[1], vect[1], vect[1])
+        vect = crypto.hash_to_point_vect(b"".join(keys))
+        for key, pt in zip(keys, vect):
+            self.assertEqual(bytes(ec_py.hash_to_point(key)), crypto.encodepoint(pt))
+
+        stats = crypto.get_cache_stats()["hash_to_point"]
+        self.assertEqual(6, stats["hits"])
+        self.assertEqual(3, stats["misses"])
+
+    def test_keccak_many(self):
+        self.assertEqual(
+            unhexlify(
+                b"c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+            ),
+            crypto.cn_fast_hash(b""),
+        )
+
+        # lengths around the 136 B rate
+        msgs = [bytes(range(i % 256)) for i in (0, 1, 32, 135, 136, 137, 250, 272)]
+        ref = [crypto.cn_fast_hash(x) for x in msgs]
+        self.assertEqual(ref, crypto.keccak_hash_many(msgs))
+        self.assertEqual(
+            [crypto.encodeint(crypto.hash_to_scalar(x)) for x in msgs],
+            [crypto.encodeint(x) for x in crypto.hash_to_scalar_many(msgs)],
+        )
+
+        try:
+            from monero_glue.xmr.core.backend import keccak_np
+        except ImportError:
+            self.skipTest("NumPy missing")
+        self.assertEqual(ref, keccak_np.keccak_256_many(msgs))
+
 
 if __name__ == "__main__":
     unittest.main()  # pragma: no cover
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import aiounittest
+from monero_glue.xmr.core import ec_auto, ec_picker, ec_py
+
+
+class EcAutoTest(aiounittest.AsyncTestCase):
+    """Simple tests"""
+
+    def __init__(self, *args, **kwargs):
+        super(EcAutoTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "ec_backend.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        ec_auto._selection = None
+
+    def test_picker(self):
+        env = os.environ.get("EC_BACKEND")
+        try:
+            os.environ["EC_BACKEND"] = "auto"
+            self.assertEqual(ec_picker.get_ec_backend(), ec_picker.EC_BACKEND_AUTO)
+        finally:
+            if env is None:
+                del os.environ["EC_BACKEND"]
+            else:
+                os.environ["EC_BACKEND"] = env
+
+    def test_load_backends(self):
+        modules = ec_auto.BACKEND_MODULES
+        try:
+            ec_auto.BACKEND_MODULES = {
+                ec_picker.EC_BACKEND_PY: modules[ec_picker.EC_BACKEND_PY],
+                99: "monero_glue.xmr.core.ec_missing",
+            }
+            with self.assertLogs(ec_auto.logger, "DEBUG") as logs:
+                res = ec_auto._load_backends()
+            self.assertEqual(list(res.keys()), [ec_picker.EC_BACKEND_PY])
+            self.assertEqual([r.levelname for r in logs.records], ["DEBUG"])
+        finally:
+            ec_auto.BACKEND_MODULES = modules
+
+    def test_calibrate(self):
+        sel = ec_auto.calibrate({ec_picker.EC_BACKEND_PY: ec_py}, reps=1)
+        self.assertEqual(sel["backend"], ec_picker.EC_BACKEND_PY)
+        self.assertEqual(
+            set(sel["timings"][ec_picker.EC_BACKEND_PY].keys()),
+            {"scalarmult_base", "scalarmult", "hash_to_point", "sc_mul"},
+        )
+
+    def test_select_cached(self):
+        bid = ec_auto.select_backend(path=self.path)
+        sel = ec_auto.get_selection()
+        self.assertEqual(bid, sel["backend"])
+        self.assertFalse(sel["cached"])
+        self.assertIn(bid, sel["timings"])
+        self.assertTrue(os.path.exists(self.path))
+
+        ec_auto._selection = None
+        self.assertEqual(bid, ec_auto.select_backend(path=self.path))
+        sel2 = ec_auto.get_selection()
+        self.assertTrue(sel2["cached"])
+        self.assertEqual(sel["timings"], sel2["timings"])
+
+        ec_auto.select_backend(recalibrate=True, path=self.path)
+        self.assertFalse(ec_auto.get_selection()["cached"])
+
+
+if __name__ == "__main__":
+    unittest.main()  # pragma: no cover
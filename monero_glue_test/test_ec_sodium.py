@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+
+import binascii
+import logging
+import unittest
+
+import aiounittest
+from monero_glue.xmr.core import ec_py
+
+logger = logging.getLogger(__name__)
+
+
+try:
+    from monero_glue.xmr.core import ec_sodium
+
+    LOADED = 1
+
+except Exception as e:
+    logger.info("Libsodium backend loading error: %s" % e)
+    LOADED = 0
+
+
+class EcSodiumTest(aiounittest.AsyncTestCase):
+    """Simple tests"""
+
+    def __init__(self, *args, **kwargs):
+        super(EcSodiumTest, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        if not LOADED:
+            self.skipTest("Libsodium missing")
+
+    def test_ed_crypto(self):
+        h_hex = b"8b655970153799af2aeadc9ff1add0ea6c7251d54154cfa92c173a0dd39c1f94"
+        h = binascii.unhexlify(h_hex)
+        self.assertEqual(h, ec_sodium.encodepoint(ec_sodium.decodepoint(h)))
+        self.assertEqual(h, ec_sodium.encodepoint(ec_sodium.xmr_H()))
+
+        with self.assertRaises(ValueError):
+            ec_sodium.decodepoint(b"\x02" + b"\x00" * 31)
+
+    def test_ops(self):
+        for _ in range(4):
+            a, b = ec_py.random_scalar(), ec_py.random_scalar()
+            A = ec_py.scalarmult_base(ec_py.random_scalar())
+            sa, sb = ec_sodium.decodeint(bytes(a)), ec_sodium.decodeint(bytes(b))
+            sA = ec_sodium.decodepoint(bytes(A))
+
+            self.assertEqual(bytes(a * b), bytes(ec_sodium.sc_mul(sa, sb)))
+            self.assertEqual(bytes(a - b), bytes(ec_sodium.sc_sub(sa, sb)))
+            self.assertEqual(
+                bytes(ec_py.sc_inv(a)), ec_sodium.encodeint(ec_sodium.sc_inv(sa))
+            )
+            self.assertEqual(
+                bytes(ec_py.scalarmult_base(a)),
+                ec_sodium.encodepoint(ec_sodium.scalarmult_base(sa)),
+            )
+            self.assertEqual(
+                bytes(ec_py.add_keys2(a, b, A)),
+                ec_sodium.encodepoint(ec_sodium.add_keys2(sa, sb, sA)),
+            )
+            self.assertEqual(
+                bytes(ec_py.gen_c(a, 123)),
+                ec_sodium.encodepoint(ec_sodium.gen_c(sa, 123)),
+            )
+
+        self.assertTrue(
+            ec_sodium.point_eq(
+                ec_sodium.identity(), ec_sodium.scalarmult_base(ec_sodium.sc_0())
+            )
+        )
+
+    def test_fallback(self):
+        # libsodium rejects points with a torsion component, ec_py is used
+        T = binascii.unhexlify(
+            b"c7176a703d4dd84fba3c0b760d10670f2a2053fa2c39ccc64ec7fd7792ac037a"
+        )
+        a = ec_py.random_scalar()
+        A = ec_py.scalarmult_base(ec_py.random_scalar())
+        A = ec_py.point_add(A, ec_py.decodepoint(T))
+        sA = ec_sodium.decodepoint(bytes(A))
+        sa = ec_sodium.decodeint(bytes(a))
+
+        self.assertEqual(
+            bytes(ec_py.scalarmult(A, a)),
+            ec_sodium.encodepoint(ec_sodium.scalarmult(sA, sa)),
+        )
+        self.assertEqual(
+            bytes(ec_py.point_mul8(A)),
+            ec_sodium.encodepoint(ec_sodium.point_mul8(sA)),
+        )
+        self.assertTrue(
+            ec_sodium.point_eq(
+                ec_sodium.identity(), ec_sodium.scalarmult(sA, ec_sodium.sc_0())
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()  # pragma: no cover
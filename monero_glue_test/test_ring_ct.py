@@ -6,7 +6,10 @@ import binascii
 import unittest
 
 import aiounittest
-from monero_glue.xmr import crypto, monero, ring_ct
+from monero_glue.hwtoken import misc
+from monero_glue.messages.MoneroRctKeyPublic import MoneroRctKeyPublic
+from monero_glue.xmr import crypto, mlsag2, monero, ring_ct
+from monero_serialize import xmrtypes
 
 
 class RingCtTest(aiounittest.AsyncTestCase):
@@ -90,6 +93,88 @@ class RingCtTest(aiounittest.AsyncTestCase):
         res = ring_ct.ver_range(proof[0], rsig)
         self.assertTrue(res)
 
+    def test_range_strategy(self):
+        profile = {
+            ring_ct.RANGE_STRATEGY_ORIG: [100, 1.0],
+            ring_ct.RANGE_STRATEGY_MEM: [60, 1.2],
+            ring_ct.RANGE_STRATEGY_CHUNKED: [20, 1.5],
+        }
+        if crypto.get_backend().has_rangeproof_borromean():
+            self.skipTest("Backend range proof is always selected")
+
+        def select(*args):
+            return ring_ct.select_range_strategy(*args, profile=profile)["strategy"]
+
+        self.assertEqual(select(None, None), ring_ct.RANGE_STRATEGY_ORIG)
+        self.assertEqual(select(80, None), ring_ct.RANGE_STRATEGY_MEM)
+        self.assertEqual(select(10, None), ring_ct.RANGE_STRATEGY_CHUNKED)
+        self.assertEqual(select(None, 2.0), ring_ct.RANGE_STRATEGY_CHUNKED)
+        self.assertEqual(select(None, 1.3), ring_ct.RANGE_STRATEGY_MEM)
+        self.assertEqual(select(None, 0.5), ring_ct.RANGE_STRATEGY_ORIG)
+        self.assertEqual(select(30, 0.5), ring_ct.RANGE_STRATEGY_CHUNKED)
+
+    def test_range_proof_auto(self):
+        amount = 17 + (1 << 40)
+        for strategy in ring_ct.get_range_strategies():
+            C, a, R, meta = ring_ct.prove_range_auto(amount, strategy=strategy)
+            self.assertEqual(meta["strategy"], strategy)
+            self.assertTrue(ring_ct.ver_range(C, R))
+            self.assertTrue(
+                crypto.point_eq(
+                    C,
+                    crypto.point_add(
+                        crypto.scalarmult_base(a), crypto.scalarmult_h(amount)
+                    ),
+                )
+            )
+
+            C, a, R, _ = ring_ct.prove_range_auto(
+                amount, decode=True, strategy=strategy
+            )
+            self.assertTrue(ring_ct.ver_range(C, R, decode=False))
+
+            C, a, R, _ = ring_ct.prove_range_auto(
+                amount, byte_enc=True, strategy=strategy
+            )
+            self.assertTrue(ring_ct.ver_range(C, monero.inflate_rsig(R)))
+
+        C, a, R, meta = ring_ct.prove_range_auto(amount, mem_budget=1)
+        self.assertIn(meta["strategy"], ring_ct.get_range_strategies())
+        self.assertTrue(ring_ct.ver_range(C, R))
+
+        with self.assertRaises(ValueError):
+            ring_ct.prove_range_auto(amount, strategy="unknown")
+
+    def test_range_proof_batch(self):
+        proofs = [ring_ct.prove_range(x) for x in [0, 17, 1 << 40]]
+        Cs = [x[0] for x in proofs]
+        rsigs = [x[2] for x in proofs]
+        self.assertEqual(ring_ct.ver_range_batch(Cs, rsigs), [True] * 3)
+        self.assertEqual(ring_ct.ver_range_batch([None] * 3, rsigs), [True] * 3)
+
+        # commitment mismatch, tampered signature
+        Cs[0] = crypto.point_add(Cs[0], crypto.scalarmult_base(crypto.sc_init(1)))
+        rsigs[2] = monero.recode_rangesig(rsigs[2], encode=False, copy=True)
+        rsigs[2].asig.s0[5] = crypto.sc_add(rsigs[2].asig.s0[5], crypto.sc_init(1))
+        monero.recode_rangesig(rsigs[2], encode=True)
+        self.assertEqual(ring_ct.ver_range_batch(Cs, rsigs), [False, True, False])
+
+        # malformed proofs do not abort the batch
+        short = monero.recode_rangesig(rsigs[1], encode=False, copy=True)
+        short.Ci = short.Ci[:-1]
+        monero.recode_rangesig(short, encode=True)
+        bad_point = monero.recode_rangesig(rsigs[1], encode=False, copy=True)
+        monero.recode_rangesig(bad_point, encode=True)
+        bad_point.Ci[3] = b"\x02" + b"\x00" * 31
+        self.assertEqual(
+            ring_ct.ver_range_batch([Cs[1]] * 3, [short, bad_point, rsigs[1]]),
+            [False, False, True],
+        )
+        self.assertFalse(ring_ct.ver_range(Cs[1], short))
+
+        with self.assertRaises(ValueError):
+            ring_ct.ver_range_batch(Cs[:2], rsigs)
+
     def test_key_image_signature(self):
         ki = binascii.unhexlify(
             b"a248206cea806a7d60ea936cdc35efdf44a189b1026c4e658f42216aec155383"
@@ -114,6 +199,146 @@ class RingCtTest(aiounittest.AsyncTestCase):
             ),
         )
 
+    def test_ver_rct_mg_simple_decoded(self):
+        message = crypto.keccak_hash(b"ver_rct_mg_simple")
+        tx, mix_ring = self.gen_simple_tx(1, 5, message)
+        mg = monero.recode_msg([tx.rct_signatures.p.MGs[0]], encode=False)[0]
+        mg.II = [crypto.decodepoint(tx.vin[0].k_image)]
+        pubs = mix_ring[0]
+        C = crypto.decodepoint(tx.rct_signatures.pseudoOuts[0])
+
+        P = [crypto.decodepoint(x.dest) for x in pubs]
+        C_nonzero = [crypto.decodepoint(x.commitment) for x in pubs]
+        self.assertTrue(mlsag2.ver_rct_mg_simple(message, mg, pubs, C))
+        self.assertTrue(
+            mlsag2.ver_rct_mg_simple(message, mg, pubs, C, P=P, C_nonzero=C_nonzero)
+        )
+        self.assertFalse(
+            mlsag2.ver_rct_mg_simple(
+                message, mg, pubs, C, P=P[1:] + P[:1], C_nonzero=C_nonzero
+            )
+        )
+        with self.assertRaises(ValueError):
+            mlsag2.ver_rct_mg_simple(message, mg, pubs, C, P=P[1:])
+
+    def test_ver_rct_mg_full(self):
+        message = crypto.keccak_hash(b"ver_rct_mg")
+        rows, cols, index = 2, 4, 1
+        in_sk = [
+            misc.StdObj(dest=crypto.random_scalar(), mask=crypto.random_scalar())
+            for _ in range(rows)
+        ]
+        pubs = []
+        for i in range(cols):
+            col = []
+            for j in range(rows):
+                if i == index:
+                    P = crypto.scalarmult_base(in_sk[j].dest)
+                    C = crypto.gen_c(in_sk[j].mask, 60)
+                else:
+                    P = crypto.scalarmult_base(crypto.random_scalar())
+                    C = crypto.gen_c(crypto.random_scalar(), 60)
+                col.append(
+                    MoneroRctKeyPublic(
+                        dest=crypto.encodepoint(P), commitment=crypto.encodepoint(C)
+                    )
+                )
+            pubs.append(col)
+
+        # 2 * 60 = 50 + 60 + fee 10
+        out_sk = [misc.StdObj(mask=crypto.random_scalar()) for _ in range(2)]
+        out_pk = [
+            misc.StdObj(mask=crypto.encodepoint(crypto.gen_c(out_sk[j].mask, amt)))
+            for j, amt in enumerate([50, 60])
+        ]
+        fee_key = crypto.scalarmult_h(10)
+
+        mg, _ = mlsag2.prove_rct_mg(
+            message, pubs, in_sk, out_sk, out_pk, None, None, index, fee_key
+        )
+        self.assertTrue(mlsag2.ver_rct_mg(mg, pubs, out_pk, fee_key, message))
+        self.assertFalse(
+            mlsag2.ver_rct_mg(mg, pubs, out_pk, crypto.scalarmult_h(11), message)
+        )
+
+    def gen_simple_tx(self, num_inputs, ring_size, message):
+        """
+        Simple RingCT transaction with MGs only, encoded as after deserialization
+        :return: (tx, mix_ring)
+        """
+        vin, mgs, pseudo_outs, mix_ring = [], [], [], []
+        for idx in range(num_inputs):
+            index = idx % ring_size
+            sk = misc.StdObj(dest=crypto.random_scalar(), mask=crypto.random_scalar())
+            ring = []
+            for i in range(ring_size):
+                if i == index:
+                    P = crypto.scalarmult_base(sk.dest)
+                    C = crypto.gen_c(sk.mask, 100)
+                else:
+                    P = crypto.scalarmult_base(crypto.random_scalar())
+                    C = crypto.gen_c(crypto.random_scalar(), 100)
+                ring.append(
+                    MoneroRctKeyPublic(
+                        dest=crypto.encodepoint(P), commitment=crypto.encodepoint(C)
+                    )
+                )
+
+            alpha = crypto.random_scalar()
+            cout = crypto.gen_c(alpha, 100)
+            mg, _ = mlsag2.prove_rct_mg_simple(
+                message, ring, sk, alpha, cout, None, None, index
+            )
+            monero.recode_msg([mg])
+            vin.append(xmrtypes.TxinToKey(amount=0, k_image=mg.II[0]))
+            mg.II = None
+            mgs.append(mg)
+            pseudo_outs.append(crypto.encodepoint(cout))
+            mix_ring.append(ring)
+
+        rv = xmrtypes.RctSig(
+            type=xmrtypes.RctType.Simple,
+            pseudoOuts=pseudo_outs,
+            p=xmrtypes.RctSigPrunable(MGs=mgs),
+        )
+        tx = xmrtypes.Transaction(version=2, vin=vin, rct_signatures=rv)
+        return tx, mix_ring
+
+    async def test_verify_rct_signatures(self):
+        message = crypto.keccak_hash(b"verify_rct_signatures")
+        tx, mix_ring = self.gen_simple_tx(3, 4, message)
+
+        self.assertTrue(
+            await ring_ct.verify_rct_signatures(tx, mix_ring, message, workers=1)
+        )
+        self.assertTrue(
+            await ring_ct.verify_rct_signatures(tx, mix_ring, message, workers=2)
+        )
+
+        other = crypto.keccak_hash(b"other")
+        self.assertFalse(
+            await ring_ct.verify_rct_signatures(tx, mix_ring, other, workers=2)
+        )
+
+        # swapped rings fail the signature check of those inputs
+        mix_ring[0], mix_ring[1] = mix_ring[1], mix_ring[0]
+        self.assertFalse(
+            await ring_ct.verify_rct_signatures(tx, mix_ring, message, workers=1)
+        )
+
+        # ring point not on the curve, worker raises
+        mix_ring[0], mix_ring[1] = mix_ring[1], mix_ring[0]
+        mix_ring[2][1].dest = b"\x02" + b"\x00" * 31
+        for workers in [1, 2]:
+            self.assertFalse(
+                await ring_ct.verify_rct_signatures(
+                    tx, mix_ring, message, workers=workers
+                )
+            )
+
+        with self.assertRaises(ValueError):
+            await ring_ct.verify_rct_signatures(tx, mix_ring[:2], message)
+
 
 if __name__ == "__main__":
     unittest.main()  # pragma: no cover
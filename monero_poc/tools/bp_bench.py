@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+#
+# Bulletproof benchmark: prove / verify / batch verify timing and peak memory
+# per EC backend and aggregation size. Results are emitted as JSON, optionally
+# compared against a stored baseline to catch performance regressions.
+#
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import coloredlogs
+
+logger = logging.getLogger(__name__)
+coloredlogs.CHROOT_FILES = []
+coloredlogs.install(level=logging.INFO, use_chroot=False)
+
+BACKENDS = {"py": 0, "trezor": 1, "sodium": 2}
+DEFAULT_MS = [1, 2, 4, 8, 16]
+DEFAULT_BATCHES = [1, 8, 64]
+
+
+def parse_ints(val):
+    return [int(x) for x in val.split(",") if x]
+
+
+def result_key(res):
+    return res["backend"], res["op"], res["m"], res["batch"]
+
+
+def measure(fnc, reps, mem=True):
+    """
+    Runs fnc reps times, returns timing stats and peak of the python heap
+    allocations of one extra traced run (None if mem is False).
+
+    Note tracemalloc does not see native allocations (e.g., trezor-crypto),
+    ru_maxrss of the process is reported separately.
+    """
+    times = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fnc()
+        times.append(time.perf_counter() - t0)
+
+    peak = None
+    if mem:
+        tracemalloc.start()
+        try:
+            fnc()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "reps": reps,
+        "time_min": min(times),
+        "time_mean": sum(times) / len(times),
+        "peak_mem": peak,
+    }
+
+
+def bench_current(ms, batches, reps=1, pool=2, mem=True):
+    """
+    Benchmarks the EC backend loaded in this process.
+
+    Batches are built by repeating a pool of distinct proofs, the verifier
+    cost does not depend on proofs being unique (random weights per proof).
+
+    :param ms: aggregation sizes (number of amounts per proof)
+    :param batches: batch sizes for verify_batch
+    :param reps: timing repetitions
+    :param pool: number of distinct proofs generated per aggregation size
+    :param mem: measure peak memory
+    :return: list of result dicts
+    """
+    from monero_glue.xmr import bulletproof as bp
+    from monero_glue.xmr import crypto
+
+    backend_id = crypto.get_backend().backend_id()
+    bpi = bp.BulletProofBuilder()
+    results = []
+
+    def add(op, m, batch, stats):
+        stats.update({"backend": backend_id, "op": op, "m": m, "batch": batch})
+        stats["maxrss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info(
+            "backend %s %s m=%s batch=%s: %.4f s"
+            % (backend_id, op, m, batch, stats["time_min"])
+        )
+        results.append(stats)
+
+    for m in ms:
+        amounts = [crypto.sc_init(1000 + i) for i in range(m)]
+        masks = [crypto.random_scalar() for _ in range(m)]
+
+        add("prove", m, 1, measure(lambda: bpi.prove_batch(amounts, masks), reps, mem))
+
+        proofs = [bpi.prove_batch(amounts, masks) for _ in range(max(1, pool))]
+        add("verify", m, 1, measure(lambda: bpi.verify(proofs[0]), reps, mem))
+
+        for batch in batches:
+            if batch <= 1:
+                continue
+            to_verify = [proofs[i % len(proofs)] for i in range(batch)]
+            add(
+                "verify_batch",
+                m,
+                batch,
+                measure(lambda: bpi.verify_batch(to_verify), reps, mem),
+            )
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compares time_min of the results with the baseline.
+
+    :param results: list of result dicts
+    :param baseline: list of result dicts
+    :param tolerance: allowed relative slowdown
+    :return: list of (key, baseline time, current time) regressions
+    """
+    base = {result_key(x): x for x in baseline}
+    regressions = []
+    for res in results:
+        old = base.get(result_key(res))
+        if old is None or not old["time_min"]:
+            continue
+        if res["time_min"] > old["time_min"] * (1 + tolerance):
+            regressions.append((result_key(res), old["time_min"], res["time_min"]))
+    return regressions
+
+
+class BpBench(object):
+    def __init__(self):
+        self.args = None
+
+    def bench_backend(self, name):
+        """
+        Runs the benchmark in a subprocess with the given EC backend,
+        the backend is selected on the crypto module import.
+        """
+        env = dict(os.environ)
+        env["EC_BACKEND"] = str(BACKENDS[name])
+        env["EC_BACKEND_FORCE"] = "1"
+        cmd = [
+            sys.executable,
+            "-m",
+            "monero_poc.tools.bp_bench",
+            "--worker",
+            "--m",
+            ",".join(str(x) for x in self.args.m),
+            "--batch",
+            ",".join(str(x) for x in self.args.batch),
+            "--reps",
+            str(self.args.reps),
+            "--pool",
+            str(self.args.pool),
+        ]
+        if self.args.no_mem:
+            cmd.append("--no-mem")
+
+        proc = subprocess.run(cmd, env=env, stdout=subprocess.PIPE)
+        if proc.returncode != 0:
+            logger.warning("Backend %s not usable, skipping" % name)
+            return []
+        return json.loads(proc.stdout.decode("utf8"))
+
+    def work(self):
+        if self.args.worker:
+            res = bench_current(
+                self.args.m,
+                self.args.batch,
+                self.args.reps,
+                self.args.pool,
+                not self.args.no_mem,
+            )
+            sys.stdout.write(json.dumps(res))
+            return 0
+
+        results = []
+        for name in self.args.backend:
+            results += self.bench_backend(name)
+
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "time": int(time.time()),
+            },
+            "results": results,
+        }
+        data = json.dumps(report, indent=2)
+        if self.args.output:
+            with open(self.args.output, "w") as fh:
+                fh.write(data)
+        else:
+            print(data)
+
+        if self.args.baseline:
+            with open(self.args.baseline) as fh:
+                baseline = json.load(fh)["results"]
+            regressions = compare(results, baseline, self.args.tolerance)
+            for key, old, new in regressions:
+                logger.error("Regression %s: %.4f s -> %.4f s" % (key, old, new))
+            return 1 if regressions else 0
+        return 0
+
+    def main(self):
+        parser = argparse.ArgumentParser(description="Bulletproof benchmark")
+        parser.add_argument(
+            "--backend",
+            default="py,trezor",
+            type=lambda x: [y for y in x.split(",") if y],
+            help="EC backends to benchmark: py, trezor, sodium",
+        )
+        parser.add_argument(
+            "--m",
+            default=DEFAULT_MS,
+            type=parse_ints,
+            help="Aggregation sizes, comma separated",
+        )
+        parser.add_argument(
+            "--batch",
+            default=DEFAULT_BATCHES,
+            type=parse_ints,
+            help="Batch verification sizes, comma separated",
+        )
+        parser.add_argument(
+            "--reps", default=1, type=int, help="Timing repetitions"
+        )
+        parser.add_argument(
+            "--pool",
+            default=2,
+            type=int,
+            help="Distinct proofs per aggregation size used to fill batches",
+        )
+        parser.add_argument(
+            "--no-mem",
+            dest="no_mem",
+            default=False,
+            action="store_const",
+            const=True,
+            help="Skip peak memory measurement",
+        )
+        parser.add_argument(
+            "--output", default=None, help="JSON output file, stdout by default"
+        )
+        parser.add_argument(
+            "--baseline", default=None, help="Baseline JSON to compare with"
+        )
+        parser.add_argument(
+            "--tolerance",
+            default=0.2,
+            type=float,
+            help="Allowed relative slowdown against the baseline",
+        )
+        parser.add_argument(
+            "--worker",
+            default=False,
+            action="store_const",
+            const=True,
+            help=argparse.SUPPRESS,
+        )
+        self.args = parser.parse_args()
+        for name in self.args.backend:
+            if name not in BACKENDS:
+                parser.error("Unknown backend: %s" % name)
+        return self.work()
+
+
+def main():
+    bench = BpBench()
+    sys.exit(bench.main())
+
+
+if __name__ == "__main__":
+    main()
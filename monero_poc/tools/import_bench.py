@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+#
+# Import time benchmark of the crypto facade. Each scenario runs in a fresh
+# interpreter, wall time of the whole process and the cumulative import time
+# of monero_glue.xmr.crypto reported by -X importtime are measured.
+#
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import coloredlogs
+
+logger = logging.getLogger(__name__)
+coloredlogs.CHROOT_FILES = []
+coloredlogs.install(level=logging.INFO, use_chroot=False)
+
+SCENARIOS = {
+    "import": "from monero_glue.xmr import crypto",
+    "address": "from monero_glue.xmr import crypto\n"
+    "crypto.xmr_base58_addr_decode_check(crypto.xmr_base58_addr_encode_check("
+    "18, bytes(64)))",
+    "primitive": "from monero_glue.xmr import crypto\n"
+    "crypto.scalarmult_base(crypto.sc_init(1))",
+}
+BASELINE = "import sys"
+
+
+def parse_importtime(stderr, module="monero_glue.xmr.crypto"):
+    """
+    Cumulative import time of the module in seconds from -X importtime output
+    """
+    for line in stderr.splitlines():
+        parts = [x.strip() for x in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) * 1e-6
+    return None
+
+
+def run_scenario(code, env=None):
+    """
+    Runs the code in a fresh interpreter
+    :return: (wall time, import time of the crypto module)
+    """
+    cmd = [sys.executable, "-X", "importtime", "-c", code]
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    el = time.perf_counter() - t0
+    stderr = proc.stderr.decode("utf8")
+    if proc.returncode != 0:
+        raise ValueError("Scenario failed: %s" % stderr[-500:])
+    return el, parse_importtime(stderr)
+
+
+def bench(scenarios, reps, env=None):
+    """
+    Benchmarks the scenarios, interpreter start-up is measured separately
+    :return: list of result dicts
+    """
+    results = []
+    for name in ["startup"] + scenarios:
+        code = BASELINE if name == "startup" else SCENARIOS[name]
+        runs = [run_scenario(code, env) for _ in range(reps)]
+        walls = sorted(x[0] for x in runs)
+        imports = sorted(x[1] for x in runs if x[1] is not None)
+        res = {
+            "scenario": name,
+            "reps": reps,
+            "wall_min": walls[0],
+            "wall_median": walls[len(walls) // 2],
+            "import_min": imports[0] if imports else None,
+        }
+        logger.info(
+            "%s: wall %.4f s, crypto import %s"
+            % (
+                name,
+                res["wall_min"],
+                "%.4f s" % res["import_min"] if imports else "-",
+            )
+        )
+        results.append(res)
+    return results
+
+
+class ImportBench(object):
+    def __init__(self):
+        self.args = None
+
+    def work(self):
+        env = dict(os.environ)
+        if self.args.backend is not None:
+            env["EC_BACKEND"] = self.args.backend
+
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "backend": env.get("EC_BACKEND"),
+                "time": int(time.time()),
+            },
+            "results": bench(self.args.scenario, self.args.reps, env),
+        }
+        data = json.dumps(report, indent=2)
+        if self.args.output:
+            with open(self.args.output, "w") as fh:
+                fh.write(data)
+        else:
+            print(data)
+        return 0
+
+    def main(self):
+        parser = argparse.ArgumentParser(description="Crypto import benchmark")
+        parser.add_argument(
+            "--scenario",
+            default=sorted(SCENARIOS),
+            type=lambda x: [y for y in x.split(",") if y],
+            help="Scenarios, comma separated: %s" % ", ".join(sorted(SCENARIOS)),
+        )
+        parser.add_argument(
+            "--backend", default=None, help="EC_BACKEND value for the workers"
+        )
+        parser.add_argument(
+            "--reps", default=5, type=int, help="Fresh interpreter runs"
+        )
+        parser.add_argument(
+            "--output", default=None, help="JSON output file, stdout by default"
+        )
+        self.args = parser.parse_args()
+        for name in self.args.scenario:
+            if name not in SCENARIOS:
+                parser.error("Unknown scenario: %s" % name)
+        return self.work()
+
+
+def main():
+    bench_tool = ImportBench()
+    sys.exit(bench_tool.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Author: Dusan Klinec, ph4r05, 2018
+#
+# Borromean range proof benchmark of the ring_ct.prove_range strategies.
+# Wall time per proof and the peak of Python allocations (tracemalloc)
+# are measured, the output has the ring_ct.RANGE_STRATEGY_PROFILES format.
+#
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+
+import coloredlogs
+from monero_glue.xmr import crypto, ring_ct
+
+logger = logging.getLogger(__name__)
+coloredlogs.CHROOT_FILES = []
+coloredlogs.install(level=logging.INFO, use_chroot=False)
+
+
+def measure(strategy, reps, amount=(1 << 63) + 12345):
+    """
+    Measures the strategy
+    :return: (peak memory in bytes, median time in seconds)
+    """
+    fnc = ring_ct.RANGE_STRATEGY_FNC[strategy]
+    fnc(amount)  # warm-up, lazy tables
+
+    times = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fnc(amount)
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fnc(amount)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, sorted(times)[len(times) // 2]
+
+
+class RangeBench(object):
+    def __init__(self):
+        self.args = None
+
+    def work(self):
+        strategies = ring_ct.get_range_strategies()
+        profile = {}
+        for name in self.args.strategy or strategies:
+            if name not in strategies:
+                raise ValueError("Strategy not available: %s" % name)
+            peak, el = measure(name, self.args.reps)
+            logger.info("%s: %.4f s, peak %d B" % (name, el, peak))
+            profile[name] = [peak, el]
+
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "backend": crypto.get_backend().__class__.__name__,
+                "fast": crypto.get_backend().is_fast(),
+                "time": int(time.time()),
+            },
+            "profile": profile,
+        }
+        data = json.dumps(report, indent=2)
+        if self.args.output:
+            with open(self.args.output, "w") as fh:
+                fh.write(data)
+        else:
+            print(data)
+        return 0
+
+    def main(self):
+        parser = argparse.ArgumentParser(description="Range proof strategy benchmark")
+        parser.add_argument(
+            "--strategy",
+            default=None,
+            type=lambda x: [y for y in x.split(",") if y],
+            help="Strategies, comma separated: %s"
+            % ", ".join(ring_ct.RANGE_STRATEGIES),
+        )
+        parser.add_argument("--reps", default=5, type=int, help="Proofs per strategy")
+        parser.add_argument(
+            "--output", default=None, help="JSON output file, stdout by default"
+        )
+        self.args = parser.parse_args()
+        return self.work()
+
+
+def main():
+    bench_tool = RangeBench()
+    sys.exit(bench_tool.main())
+
+
+if __name__ == "__main__":
+    main()
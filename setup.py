@@ -59,6 +59,11 @@ tcry_extras = [
     "py_trezor_crypto_ph4==0.1.1",
 ]
 
+# batched Keccak hashing
+numpy_extras = [
+    "numpy",
+]
+
 docs_extras = [
     "Sphinx>=1.0",  # autodoc_member_order = 'bysource', autodoc_default_flags
     "sphinx_rtd_theme",
@@ -205,6 +210,7 @@ setup(
         "poc": poc_extras,
         "docs": docs_extras,
         "tcry": tcry_extras,
+        "numpy": numpy_extras,
         "trezor": trezor_extras,
     },
     cmdclass={
@@ -219,6 +225,7 @@ setup(
             'monero-trezor-init = monero_poc.trezor_init:main',
             'monero-trezor-log = monero_poc.log_aux:main',
             'monero-test-gen = monero_poc.tools.test_gen:main',
+            'monero-bp-bench = monero_poc.tools.bp_bench:main',
         ],
     }
 
@@ -6,7 +6,7 @@
 # you would probably not want to install it like this.
 
 set -e
-export LIBSODIUM_VER="1.0.16"
+export LIBSODIUM_VER="1.0.18"
 
 # check if libsodium is already installed
 if [ ! -d "$HOME/libsodium/lib" ]; then